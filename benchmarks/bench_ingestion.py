@@ -0,0 +1,99 @@
+"""
+Benchmark of the B3 report ingestion on synthetic monthly reports.
+
+Compares the previous serial openpyxl loader of `3. treat_b3.ipynb` (kept here as
+reference) with `carregar_relatorios_b3` on a cold cache (reports parsed by the
+process pool) and on a warm cache (nothing to parse).
+
+Usage:
+    python -m benchmarks.bench_ingestion [--reports N] [--trades N] [--workers N]
+"""
+import os
+import argparse
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.wallet.ingestion import ENGINE_EXCEL, carregar_relatorios_b3
+
+
+def write_reports(folder: str, reports: int, trades: int, seed: int = 0) -> None:
+    """
+    Writes monthly B3 trade reports (newest trades first, as exported by the B3).
+
+    Args:
+        folder (str): Folder where the .xlsx files are written.
+        reports (int): Number of monthly reports.
+        trades (int): Number of trades per report.
+        seed (int): Random seed.
+    """
+    rng = np.random.default_rng(seed)
+    for month in pd.period_range("2015-01", periods=reports, freq="M"):
+        days = pd.bdate_range(month.start_time, month.end_time)
+        df = pd.DataFrame(
+            {
+                "Data do Negócio": rng.choice(days, trades),
+                "Tipo de Movimentação": rng.choice(["Compra", "Venda"], trades),
+                "Mercado": "Mercado à Vista",
+                "Prazo/Vencimento": "-",
+                "Instituição": "CORRETORA",
+                "Código de Negociação": rng.choice(["MXRF11", "KNCR11", "PETR4F", "ABEV3F"], trades),
+                "Quantidade": rng.integers(1, 100, trades),
+                "Preço": rng.uniform(5, 100, trades).round(2),
+            }
+        )
+        df["Valor"] = (df["Quantidade"] * df["Preço"]).round(2)
+        df = df.sort_values("Data do Negócio", ascending=False)
+        df["Data do Negócio"] = df["Data do Negócio"].dt.strftime("%d/%m/%Y")
+        df.to_excel(os.path.join(folder, f"negociacao-{month}.xlsx"), index=False)
+
+
+def legacy_join_dataframes_from_directory(directory: str) -> pd.DataFrame:
+    """
+    The loader previously inlined in `3. treat_b3.ipynb`.
+    """
+    dfs = []
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".xlsx"):
+                df = pd.read_excel(os.path.join(root, file), engine="openpyxl")
+                df = df.sort_index(ascending=False)
+                dfs.append(df)
+    return pd.concat(dfs, ignore_index=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=120)
+    parser.add_argument("--trades", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_folder:
+        reports_folder = os.path.join(temp_folder, "reports")
+        cache_folder = os.path.join(temp_folder, "cache")
+        os.makedirs(reports_folder)
+        write_reports(reports_folder, args.reports, args.trades)
+
+        start = time.perf_counter()
+        legacy = legacy_join_dataframes_from_directory(reports_folder)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cold = carregar_relatorios_b3(reports_folder, cache_folder, args.workers)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = carregar_relatorios_b3(reports_folder, cache_folder, args.workers)
+        warm_seconds = time.perf_counter() - start
+
+    assert len(cold) == len(warm) == len(legacy)
+    print(f"Reports: {args.reports} x {args.trades} trades, engine: {ENGINE_EXCEL}, "
+          f"workers: {args.workers or os.cpu_count()}")
+    print(f"legacy (serial openpyxl)   {legacy_seconds:8.3f} s")
+    print(f"carregar_relatorios (cold) {cold_seconds:8.3f} s  {legacy_seconds / cold_seconds:6.1f}x")
+    print(f"carregar_relatorios (warm) {warm_seconds:8.3f} s  {legacy_seconds / warm_seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark of the average-cost ledger on synthetic B3 trade histories.
+
+Compares the previous `groupby("Ativo").apply` + iterrows calculation of
+`3. treat_b3.ipynb` (kept here as reference, run on a sample since it is slow)
+with `calcular_valores_negociados`, checks that both return identical values,
+and times the ledger on the full synthetic history.
+
+Usage:
+    python -m benchmarks.bench_ledger [--trades N] [--assets N] [--sample N]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.wallet import ledger
+from src.wallet.ledger import calcular_valores_negociados
+
+
+def synthetic_ledger(trades: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a trade history where sales never exceed the position of the asset.
+
+    Args:
+        trades (int): Number of trades.
+        assets (int): Number of distinct assets.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Trades with "Ativo", "Tipo de Movimentacao", "Quantidade",
+        "Preco" and "Valor", in chronological order.
+    """
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, assets, trades)
+    draws = rng.random(trades)
+    quantities = rng.integers(1, 200, trades)
+    prices = rng.uniform(5, 150, trades).round(2)
+
+    positions = [0] * assets
+    kinds = list()
+    for code, draw, quantity in zip(codes.tolist(), draws.tolist(), quantities.tolist()):
+        if draw < 0.05:
+            kinds.append("Rendimento")
+        elif draw < 0.35 and positions[code] > 0:
+            kinds.append("Venda")
+            quantity = min(quantity, positions[code])
+            positions[code] -= quantity
+        else:
+            kinds.append("Compra")
+            positions[code] += quantity
+        quantities[len(kinds) - 1] = quantity
+
+    df = pd.DataFrame(
+        {
+            "Ativo": [f"ATV{code:04d}11" for code in codes.tolist()],
+            "Tipo de Movimentacao": kinds,
+            "Quantidade": quantities,
+            "Preco": prices,
+        }
+    )
+    df["Valor"] = (df["Quantidade"] * df["Preco"]).round(2)
+    return df
+
+
+def legacy_calcular_valores_negociados(group: pd.DataFrame) -> pd.DataFrame:
+    """
+    The calculation previously inlined in `3. treat_b3.ipynb`, applied to each asset group.
+    """
+    investimento_acumulado = 0
+    quantidade_acumulada = 0
+    preco_medio = 0
+
+    for index, row in group.iterrows():
+        if row["Tipo de Movimentacao"] == "Compra":
+            investimento_acumulado += row["Valor"]
+            quantidade_acumulada += row["Quantidade"]
+            preco_medio = investimento_acumulado / quantidade_acumulada
+
+        elif row["Tipo de Movimentacao"] == "Venda":
+            valor_investido = preco_medio * row["Quantidade"]
+            investimento_acumulado -= valor_investido
+            quantidade_acumulada -= row["Quantidade"]
+            if (investimento_acumulado == 0) & (quantidade_acumulada == 0):
+                preco_medio = 0
+            elif (investimento_acumulado > 0) & (quantidade_acumulada > 0):
+                preco_medio = investimento_acumulado / quantidade_acumulada
+
+        group.at[index, "Investimento Atual"] = investimento_acumulado
+        group.at[index, "Quantidade Atual"] = quantidade_acumulada
+        group.at[index, "Preco Medio Atual"] = preco_medio
+    return group
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trades", type=int, default=1_000_000)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    df = synthetic_ledger(args.trades, args.assets)
+    df = df.sort_values("Ativo", kind="stable").reset_index(drop=True)
+    sample = df.iloc[: args.sample]
+    columns = ["Investimento Atual", "Quantidade Atual", "Preco Medio Atual"]
+
+    # Warm up (and compile, when numba is installed)
+    calcular_valores_negociados(sample.iloc[:10])
+
+    start = time.perf_counter()
+    legacy = pd.concat(
+        [legacy_calcular_valores_negociados(group.copy()) for _, group in sample.groupby("Ativo")]
+    )
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = calcular_valores_negociados(sample)
+    sample_seconds = time.perf_counter() - start
+    assert (legacy[columns].to_numpy() == result[columns].to_numpy()).all()
+
+    start = time.perf_counter()
+    calcular_valores_negociados(df)
+    full_seconds = time.perf_counter() - start
+
+    print(f"Backend: {'numba' if ledger.numba is not None else 'python'}")
+    print(f"legacy (iterrows)      {len(sample):>9} trades {legacy_seconds:8.3f} s")
+    print(
+        f"calcular_valores       {len(sample):>9} trades {sample_seconds:8.3f} s"
+        f"  {legacy_seconds / sample_seconds:6.1f}x"
+    )
+    print(f"calcular_valores       {len(df):>9} trades {full_seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
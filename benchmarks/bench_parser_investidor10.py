@@ -0,0 +1,116 @@
+"""
+Micro-benchmark of the FII detail page parser against a saved HTML fixture.
+
+Compares the previous BeautifulSoup + if-chain extraction (kept here as reference)
+with `parse_fii_page` on each available backend, and checks that all of them
+return the same values.
+
+Usage:
+    python -m benchmarks.bench_parser_investidor10 [--repeat N]
+"""
+import os
+import argparse
+import timeit
+from bs4 import BeautifulSoup
+from src.scrappers.parser_investidor10 import (
+    BACKEND,
+    _SoupBackend,
+    parse_fii_page,
+)
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "investidor10_fii_detail.html"
+)
+
+
+def legacy_parse_fii_page(fii_name: str, content: str) -> tuple:
+    """
+    The extraction previously inlined in `ScraperInvestidor10.extract_fiis_details_properties`.
+    """
+    soup = BeautifulSoup(content, "html.parser")
+    details = dict()
+
+    cards = [
+        ("quote", soup.find("div", class_="_card cotacao")),
+        ("dividend_yield", soup.find_all("div", class_="_card dy")[0]),
+        ("price_book_ratio", soup.find("div", class_="_card vp")),
+        ("liquidity", soup.find("div", class_="_card val")),
+        ("appreciation_12months", soup.find_all("div", class_="_card dy")[1]),
+    ]
+    for field_name, card in cards:
+        span = card.find("div", class_="_card-body").find("span")
+        details[field_name] = span.text.strip() if span else None
+
+    labels = [
+        ("VACÂNCIA", "vacancy"),
+        ("NUMERO DE COTISTAS", "number_unit_holders"),
+        ("COTAS EMITIDAS", "issued_units"),
+        ("VAL. PATRIMONIAL P/ COTA", "net_asset_value_per_unit"),
+        ("VALOR PATRIMONIAL", "net_asset_value"),
+        ("ÚLTIMO RENDIMENTO", "last_dividend_payment"),
+        ("Razão Social", "corporate_name"),
+        ("CNPJ", "cnpj"),
+        ("PÚBLICO-ALVO", "target_audience"),
+        ("MANDATO", "invest_objective"),
+        ("SEGMENTO", "market_sector"),
+        ("TIPO DE FUNDO", "fund_type"),
+        ("PRAZO DE DURAÇÃO", "fund_term"),
+        ("TIPO DE GESTÃO", "management_type"),
+        ("TAXA DE ADMINISTRAÇÃO", "management_fee"),
+    ]
+    for div_desc in soup.find_all("div", class_="desc"):
+        for label, field_name in labels:
+            if label in div_desc.text:
+                details[field_name] = div_desc.find("div", class_="value").text.strip()
+
+    properties = list()
+    container = soup.find("div", id="container-properties")
+    if container is not None:
+        for card in container.find_all("div", class_="card-propertie"):
+            small = card.find_all("small")
+            properties.append(
+                [
+                    fii_name,
+                    card.find("h3").text.strip(),
+                    small[0].text.strip(),
+                    small[1].text.strip(),
+                    None,
+                ]
+            )
+    return details, properties
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r", encoding="utf-8") as fixture:
+        content = fixture.read()
+
+    legacy_details, legacy_properties = legacy_parse_fii_page("MXRF11", content)
+    candidates = {
+        "legacy (html.parser + if-chain)": lambda: legacy_parse_fii_page("MXRF11", content),
+        "parse_fii_page (html.parser)": lambda: parse_fii_page(
+            "MXRF11", content, backend=_SoupBackend
+        ),
+    }
+    if BACKEND is not _SoupBackend:
+        candidates["parse_fii_page (lxml)"] = lambda: parse_fii_page("MXRF11", content)
+
+    for backend in {BACKEND, _SoupBackend}:
+        fii_details, list_fii_properties = parse_fii_page("MXRF11", content, backend=backend)
+        for field_name, value in legacy_details.items():
+            assert getattr(fii_details, field_name) == value, field_name
+        assert [p.to_row() for p in list_fii_properties] == legacy_properties
+
+    print(f"Fixture: {os.path.basename(FIXTURE)} ({len(content.encode()) / 1024:.0f} KiB)")
+    baseline = None
+    for name, function in candidates.items():
+        seconds = min(timeit.repeat(function, number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:<35} {seconds * 1000:8.2f} ms/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
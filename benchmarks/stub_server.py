@@ -0,0 +1,123 @@
+"""
+A local stub of the Investidor10 website, serving recorded pages so the scraper can be
+benchmarked offline.
+
+The listing pages are rendered from the scraped FII names with the markup read by
+`ScraperInvestidor10.extract_main_values`, and every FII detail page is the recorded
+`fixtures/investidor10_fii_detail.html`.
+"""
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DETAIL_FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "investidor10_fii_detail.html"
+)
+
+LISTING_CARD = '<div class="actions-card"><h2 class="ticker-name">{}</h2></div>'
+LISTING_PAGE_LINK = '<li><a href="?page={0}">{0}</a></li>'
+
+
+class StubInvestidor10:
+    """
+    Serves the Investidor10 FII listing and detail pages from a local HTTP server.
+
+    Attributes:
+        fii_names (list): Names of the FIIs in the listing pages.
+        page_size (int): Number of FIIs per listing page.
+        pagination (bool): Whether the listing pages link the first and last pages.
+        latency (float): Seconds each response is delayed, to simulate the network.
+        url (str): Base URL of the stub, to be set as the scraper `url`.
+        requests (int): Number of requests served.
+    """
+
+    def __init__(
+        self, fii_names: list, page_size: int = 24, pagination: bool = True, latency: float = 0.0
+    ) -> None:
+        """
+        Args:
+            fii_names (list): Names of the FIIs in the listing pages.
+            page_size (int): Number of FIIs per listing page. Default is 24.
+            pagination (bool): Whether the listing pages link the first and last pages.
+                Default is True.
+            latency (float): Seconds each response is delayed. Default is 0.0.
+        """
+        self.fii_names = list(fii_names)
+        self.page_size = page_size
+        self.pagination = pagination
+        self.latency = latency
+        self.url = None
+        self.requests = 0
+        self._server = None
+        with open(DETAIL_FIXTURE, "rb") as fixture:
+            self._detail = fixture.read()
+
+    def render_listing(self, page: int) -> bytes:
+        """
+        Args:
+            page (int): One-based number of the listing page.
+
+        Returns:
+            bytes: The HTML of the page, without cards past the last FII.
+        """
+        names = self.fii_names[(page - 1) * self.page_size : page * self.page_size]
+        cards = "".join(LISTING_CARD.format(name) for name in names)
+        links = ""
+        if self.pagination and names:
+            last_page = -(-len(self.fii_names) // self.page_size)
+            numbers = sorted({*range(1, min(5, last_page) + 1), last_page})
+            links = "".join(LISTING_PAGE_LINK.format(number) for number in numbers)
+            links = f'<ul class="pagination">{links}</ul>'
+        return f"<html><body>{cards}{links}</body></html>".encode("utf-8")
+
+    def start(self):
+        """
+        Starts the server in a background thread.
+
+        Returns:
+            StubInvestidor10: The stub, with its `url` set.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                url = urlparse(self.path)
+                if url.path.rstrip("/") == "/fiis":
+                    page = int(parse_qs(url.query).get("page", ["1"])[0])
+                    body = stub.render_listing(page)
+                else:
+                    body = stub._detail
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_port}/"
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,349 @@
+"""
+Offline benchmark suite of the SmartFund pipeline steps.
+
+Runs each benchmark on recorded pages (served by a local stub of the Investidor10
+website) and synthetic inputs, records the best and median times, and optionally
+saves them as a named result or compares them against a saved baseline, so any
+performance change to `src/` can be measured.
+
+Usage:
+    python -m benchmarks.suite [--only ledger,tax] [--trades N] [--save NAME] [--compare NAME]
+
+    python -m benchmarks.suite --save baseline       # before a change
+    python -m benchmarks.suite --compare baseline    # after it; exits with 1 on regressions
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.stub_server import DETAIL_FIXTURE, StubInvestidor10
+from benchmarks.synthetic import (
+    INVESTIDOR10_FOLDER,
+    synthetic_b3_trades,
+    synthetic_categories,
+    synthetic_corporate_actions,
+    synthetic_fiis_details,
+)
+from src.analysis.normalization import normalize_fiis_details
+from src.analysis.scoring import load_rules, score_fiis
+from src.scrappers.parser_investidor10 import BACKEND, parse_fii_page, parse_fii_quotes
+from src.wallet import ledger
+from src.wallet.carryforward import CompensacaoImpostos
+from src.wallet.corporate_actions import aplicar_eventos_corporativos
+from src.wallet.daytrade import separar_day_trade
+from src.wallet.ledger import calcular_valores_negociados
+from src.wallet.positions import MotorPosicoes
+from src.wallet.schema import para_centavos
+from src.wallet.tax import (
+    calcular_imposto_renda_esperado,
+    calcular_lucro_bruto_prejuizo,
+    calcular_lucro_real,
+    definir_taxa_imposto_renda_dedo_duro,
+)
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+SCORING_RULES = os.path.join(os.path.dirname(__file__), "..", "scoring_rules.ini")
+
+
+def bench_scrape(args):
+    """Listing and detail pages scraped from the stub server, end to end."""
+    from src.scrappers.scrapper_investidor10 import ScraperInvestidor10
+
+    names = pd.read_csv(os.path.join(INVESTIDOR10_FOLDER, "investidor10_fiis_names.csv"))["fii_name"]
+    names = names.sample(args.fiis, replace=args.fiis > len(names), random_state=0).tolist()
+    stub = StubInvestidor10(names, latency=args.latency).start()
+    scraper = ScraperInvestidor10(
+        use_cache=False, requests_per_second=10_000, save_folder=tempfile.mkdtemp()
+    )
+    scraper.url = f"{stub.url}fiis/"
+
+    def run():
+        scraper.list_fiis = list()
+        list_fiis = scraper.extract_main_values()
+        scraper.extract_fiis_details_properties(list_fiis)
+
+    def teardown():
+        stub.stop()
+        shutil.rmtree(scraper.save_folder, ignore_errors=True)
+
+    return run, len(names), "pages", teardown
+
+
+def bench_parse(args):
+    """A recorded FII detail page parsed into typed records."""
+    with open(DETAIL_FIXTURE, "r", encoding="utf-8") as fixture:
+        content = fixture.read()
+    pages = 20
+
+    def run():
+        for _ in range(pages):
+            parse_fii_page("MXRF11", content)
+
+    return run, pages, "pages", None
+
+
+def bench_parse_quotes(args):
+    """Only the quote cards of a recorded FII detail page, as in quote refreshes."""
+    with open(DETAIL_FIXTURE, "r", encoding="utf-8") as fixture:
+        content = fixture.read()
+    pages = 20
+
+    def run():
+        for _ in range(pages):
+            parse_fii_quotes("MXRF11", content)
+
+    return run, pages, "pages", None
+
+
+def bench_normalization(args):
+    """The raw FIIs details normalized into typed columns."""
+    df = synthetic_fiis_details(args.details)
+    return lambda: normalize_fiis_details(df), len(df), "rows", None
+
+
+def bench_scoring(args):
+    """The "Score Padrao" and "Score Extra" rules of scoring_rules.ini."""
+    df = normalize_fiis_details(synthetic_fiis_details(args.details))
+    df["Quant. Imoveis"] = np.random.default_rng(0).integers(0, 30, len(df))
+    rules = load_rules(SCORING_RULES)
+
+    def run():
+        df_fiis = score_fiis(df, rules["Score Padrao"], "Score Padrao")
+        score_fiis(df_fiis, rules["Score Extra"], "Score Extra")
+
+    return run, len(df), "rows", None
+
+
+def prepare_trades(args):
+    if not hasattr(args, "_trades"):
+        df = synthetic_b3_trades(args.trades, args.assets)
+        args._trades = df, synthetic_corporate_actions(df), synthetic_categories(df)
+    return args._trades
+
+
+def bench_corporate_actions(args):
+    """Splits and groupings applied to the synthetic ledger."""
+    df, eventos, _ = prepare_trades(args)
+    return lambda: aplicar_eventos_corporativos(df, eventos), len(df), "trades", None
+
+
+def bench_day_trade(args):
+    """Day Trade and Long Trade quantities split in the synthetic ledger."""
+    df, _, _ = prepare_trades(args)
+    return lambda: separar_day_trade(df), len(df), "trades", None
+
+
+def bench_ledger(args):
+    """Average price, quantity and investment of every trade of the synthetic ledger."""
+    df, eventos, categorias = prepare_trades(args)
+    df = separar_day_trade(aplicar_eventos_corporativos(df, eventos))
+    df = df.sort_values("Ativo", kind="stable").reset_index(drop=True)
+    calcular_valores_negociados(df.iloc[:10])
+    return lambda: calcular_valores_negociados(df), len(df), "trades", None
+
+
+def bench_tax(args):
+    """Taxes of each sale, monthly aggregation and loss / IR carry forward."""
+    df, eventos, categorias = prepare_trades(args)
+    df = separar_day_trade(aplicar_eventos_corporativos(df, eventos)).merge(categorias, on="Ativo", how="left")
+    df = calcular_valores_negociados(df.sort_values("Ativo", kind="stable").reset_index(drop=True))
+    df["Preco Medio Anterior"] = df.groupby("Ativo")["Preco Medio Atual"].shift().fillna(0)
+    df_darfs = pd.DataFrame(columns=["Tipo Ativo", "Data Mensal", "IR Pago"])
+
+    def run():
+        df_tax = definir_taxa_imposto_renda_dedo_duro(df)
+        df_tax = calcular_lucro_bruto_prejuizo(df_tax)
+        df_tax = calcular_imposto_renda_esperado(df_tax)
+        df_tax = calcular_lucro_real(df_tax)
+        df_venda_mensal = (
+            df_tax[df_tax["Tipo de Movimentacao"] == "Venda"]
+            .groupby(["Tipo Ativo", "Data Mensal", "Taxa IR", "Tipo Estrategia"])[
+                ["Valor", "IR Esperado", "Dedo Duro", "Lucro Bruto", "Prejuizo", "Lucro Real"]
+            ]
+            .sum()
+            .reset_index()
+        )
+        CompensacaoImpostos(df_darfs).processar(df_venda_mensal)
+
+    return run, len(df), "trades", None
+
+
+def bench_positions(args):
+    """Daily position and valuation matrices of the synthetic ledger, built from scratch."""
+    df, eventos, categorias = prepare_trades(args)
+    df = separar_day_trade(aplicar_eventos_corporativos(df, eventos)).merge(categorias, on="Ativo", how="left")
+    df = calcular_valores_negociados(df.sort_values("Ativo", kind="stable").reset_index(drop=True))
+    for column in ["Quantidade", "Investimento"]:
+        df[f"{column} Anterior"] = df.groupby("Ativo")[f"{column} Atual"].shift().fillna(0)
+    for column in ["Investimento Atual", "Investimento Anterior"]:
+        df[column] = para_centavos(df[column])
+
+    # Weekly quotes of every FII
+    rng = np.random.default_rng(0)
+    fiis = categorias.loc[categorias["Tipo Ativo"] == "Fii", "Ativo"].to_numpy()
+    dates = pd.date_range(df["Data Negociacao"].min(), df["Data Negociacao"].max(), freq="7D")
+    df_quotes = pd.DataFrame(
+        {
+            "Data": np.repeat(dates, len(fiis)),
+            "Ativo": np.tile(fiis, len(dates)),
+            "Cotacao": rng.uniform(5, 150, len(dates) * len(fiis)).round(2),
+        }
+    )
+    folder = tempfile.mkdtemp()
+
+    def run():
+        shutil.rmtree(folder, ignore_errors=True)
+        MotorPosicoes(folder).atualizar(df, df_quotes).calcular_valores()
+
+    return run, len(df), "trades", lambda: shutil.rmtree(folder, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "scrape": bench_scrape,
+    "parse": bench_parse,
+    "parse_quotes": bench_parse_quotes,
+    "normalization": bench_normalization,
+    "scoring": bench_scoring,
+    "corporate_actions": bench_corporate_actions,
+    "day_trade": bench_day_trade,
+    "ledger": bench_ledger,
+    "tax": bench_tax,
+    "positions": bench_positions,
+}
+
+
+def run_benchmark(name: str, args) -> dict:
+    """
+    Prepares a benchmark and times `args.repeat` runs of it.
+
+    Args:
+        name (str): Name of the benchmark in `BENCHMARKS`.
+        args (argparse.Namespace): Sizes and repetitions of the suite.
+
+    Returns:
+        dict: The size, unit, best and median seconds and throughput of the benchmark.
+    """
+    function, size, unit, teardown = BENCHMARKS[name](args)
+    try:
+        seconds = list()
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            function()
+            seconds.append(time.perf_counter() - start)
+    finally:
+        if teardown is not None:
+            teardown()
+
+    return {
+        "size": size,
+        "unit": unit,
+        "best": min(seconds),
+        "median": statistics.median(seconds),
+        "per_second": size / min(seconds),
+    }
+
+
+def environment(args) -> dict:
+    """
+    Returns:
+        dict: The commit, versions and sizes the results were measured with.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numba": ledger.numba is not None,
+        "parser_backend": BACKEND.__name__,
+        "cpus": os.cpu_count(),
+        "trades": args.trades,
+        "assets": args.assets,
+        "fiis": args.fiis,
+        "details": args.details,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Prints the time of each benchmark relative to the baseline.
+
+    Args:
+        results (dict): Results of the current run.
+        baseline (dict): Results of the baseline run.
+        tolerance (float): Relative slowdown above which a benchmark is a regression.
+
+    Returns:
+        list: Names of the regressed benchmarks.
+    """
+    regressions = list()
+    print(f"\n{'benchmark':<18} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["best"] / baseline[name]["best"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<18} {baseline[name]['best']:>9.4f}s {result['best']:>9.4f}s {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", help=f"Comma-separated benchmarks. Available: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--trades", type=int, default=100_000, help="Trades of the synthetic ledger (10k to 5M).")
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--fiis", type=int, default=100, help="FIIs scraped from the stub server.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stub server delays each page.")
+    parser.add_argument("--details", type=int, default=20_000, help="Rows of the synthetic FIIs details.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Save the results as benchmarks/results/NAME.json.")
+    parser.add_argument("--compare", help="Compare with benchmarks/results/NAME.json.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Slowdown reported as regression.")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {unknown}")
+
+    results = dict()
+    print(f"{'benchmark':<18} {'size':>10} {'best':>10} {'median':>10} {'throughput':>18}")
+    for name in names:
+        result = run_benchmark(name, args)
+        results[name] = result
+        print(
+            f"{name:<18} {result['size']:>10} {result['best']:>9.4f}s {result['median']:>9.4f}s "
+            f"{result['per_second']:>11.0f} {result['unit']}/s"
+        )
+
+    if args.save:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        with open(os.path.join(RESULTS_FOLDER, f"{args.save}.json"), "w", encoding="utf-8") as results_file:
+            json.dump({"environment": environment(args), "results": results}, results_file, indent=1)
+
+    if args.compare:
+        with open(os.path.join(RESULTS_FOLDER, f"{args.compare}.json"), "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline["results"], args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Synthetic inputs for the benchmarks: B3 trade ledgers with splits and day trades,
+their categories and corporate actions, and FII details of any size.
+"""
+import os
+import numpy as np
+import pandas as pd
+from benchmarks.bench_ledger import synthetic_ledger
+
+INVESTIDOR10_FOLDER = os.path.join(
+    os.path.dirname(__file__), "..", "Datasets", "Ingest", "Investidor10"
+)
+
+
+def synthetic_b3_trades(
+    trades: int, assets: int, days: int = 2500, seed: int = 0
+) -> pd.DataFrame:
+    """
+    Generates a treated B3 trade history (the columns of `3. treat_b3.ipynb` after the
+    renames) where sales never exceed the position of the asset.
+
+    Trades are spread over `days` consecutive days in chronological order, so assets
+    traded more than once a day produce day trades. Assets ending in "11" are FIIs and
+    the others are stocks.
+
+    Args:
+        trades (int): Number of trades.
+        assets (int): Number of distinct assets.
+        days (int): Number of days covered by the history. Default is 2500.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Trades with "Ativo", "Data Negociacao", "Tipo de Movimentacao",
+        "Quantidade", "Preco", "Valor" and "Data Mensal".
+    """
+    rng = np.random.default_rng(seed)
+    df = synthetic_ledger(trades, assets, seed)
+    df = df[df["Tipo de Movimentacao"] != "Rendimento"].reset_index(drop=True)
+
+    # Half of the assets are stocks
+    codes = df["Ativo"].str.slice(3, 7).astype(int)
+    df["Ativo"] = df["Ativo"].where(codes % 2 == 0, df["Ativo"].str.slice(0, 7) + "F")
+
+    offsets = np.sort(rng.integers(0, days, len(df)))
+    df.insert(1, "Data Negociacao", pd.Timestamp("2015-01-01") + pd.to_timedelta(offsets, unit="D"))
+    df["Data Mensal"] = df["Data Negociacao"].dt.to_period("M")
+    return df
+
+
+def synthetic_categories(df_trades: pd.DataFrame) -> pd.DataFrame:
+    """
+    Args:
+        df_trades (pd.DataFrame): Trades returned by `synthetic_b3_trades`.
+
+    Returns:
+        pd.DataFrame: "Ativo" and "Tipo Ativo" of each traded asset.
+    """
+    ativos = pd.Series(df_trades["Ativo"].unique(), name="Ativo")
+    return pd.DataFrame({"Ativo": ativos, "Tipo Ativo": np.where(ativos.str.endswith("11"), "Fii", "Acao")})
+
+
+def synthetic_corporate_actions(df_trades: pd.DataFrame, share: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates splits and groupings for a share of the traded assets, on dates inside the
+    history, in the format of `carregar_eventos_corporativos`.
+
+    Args:
+        df_trades (pd.DataFrame): Trades returned by `synthetic_b3_trades`.
+        share (float): Share of the assets with an event. Default is 0.1.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Events with "Ativo", "Data Com", "Tipo" and "Proporcao".
+    """
+    rng = np.random.default_rng(seed)
+    ativos = df_trades["Ativo"].unique()
+    ativos = rng.choice(ativos, max(1, int(len(ativos) * share)), replace=False)
+    inicio, fim = df_trades["Data Negociacao"].min(), df_trades["Data Negociacao"].max()
+    return pd.DataFrame(
+        {
+            "Ativo": ativos,
+            "Data Com": inicio + (fim - inicio) * rng.random(len(ativos)),
+            "Tipo": rng.choice(["Desdobramento", "Grupamento"], len(ativos), p=[0.8, 0.2]),
+            "Proporcao": rng.choice([2, 4, 10], len(ativos)),
+        }
+    ).assign(**{"Data Com": lambda df: df["Data Com"].dt.normalize()})
+
+
+def synthetic_fiis_details(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Samples the scraped FIIs details CSV (raw, before normalization) up to `rows` rows,
+    renaming the repeated FIIs so every row is a distinct FII.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Raw details in the format of `investidor10_fiis_details.csv`.
+    """
+    df = pd.read_csv(os.path.join(INVESTIDOR10_FOLDER, "investidor10_fiis_details.csv"), sep=",")
+    df = df.sample(rows, replace=rows > len(df), random_state=seed).reset_index(drop=True)
+    df["fii_name"] = df["fii_name"] + "_" + df.index.astype(str)
+    return df
@@ -0,0 +1,51 @@
+"""
+SmartFund pipeline runner.
+
+Runs the collect, analysis, B3 treatment, wallet and dashboard stages as a DAG,
+passing the DataFrames in memory and skipping the stages whose inputs did not change.
+
+Usage:
+    python smartfund.py [--stages fiis,analysis,b3,wallet] [--force] [--config config.ini]
+    python smartfund.py --stages collect,analysis,wallet --metrics metrics.prom --profile run.prof
+    python smartfund.py --stages quotes,wallet
+    python smartfund.py --stages dashboard
+"""
+import argparse
+from src.monitoring.metrics import METRICS
+from src.monitoring.profiling import profiled
+from src.pipeline.runner import Pipeline, load_paths
+from src.pipeline.stages import STAGES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--stages",
+        help="Comma-separated stages to run with their dependencies. "
+        f"Available: {', '.join(stage.name for stage in STAGES)}. "
+        "Default is every stage except collect and quotes.",
+    )
+    parser.add_argument("--force", action="store_true", help="Run the stages even if they are cached.")
+    parser.add_argument("--config", default="config.ini", help="Path to the config file.")
+    parser.add_argument(
+        "--metrics",
+        help="Write the run metrics to this file (Prometheus text for .prom/.txt, JSON otherwise).",
+    )
+    parser.add_argument("--profile", help="Write a cProfile output of the run to this file.")
+    args = parser.parse_args()
+
+    paths = load_paths(args.config)
+    pipeline = Pipeline(STAGES, paths, paths["path_pipeline_cache"])
+    selected = args.stages.split(",") if args.stages else None
+    with profiled(args.profile):
+        pipeline.run(selected, force=args.force)
+    if args.metrics:
+        METRICS.dump(args.metrics)
+
+    for stage_run in pipeline.runs:
+        print(f"{stage_run.name:<10} {stage_run.status:<7} {stage_run.seconds:8.3f} s")
+    print(f"{'total':<10} {'':<7} {sum(run.seconds for run in pipeline.runs):8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
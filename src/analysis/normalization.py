@@ -0,0 +1,131 @@
+import pandas as pd
+
+# Scraped detail columns -> names used by the analysis and wallet notebooks
+DETAILS_RENAME = {
+    "fii_name": "Ativo",
+    "quote": "Preco Atual",
+    "dividend_yield": "DY",
+    "price_book_ratio": "P/VP",
+    "liquidity": "Negociacao diaria",
+    "appreciation_12months": "Variacao 12M",
+    "number_unit_holders": "N/Cotistas",
+    "vacancy": "Vacancia",
+    "fund_type": "Tipo Fundo",
+    "net_asset_value": "Valor Patrimonial",
+    "management_fee": "Taxa Gerencia",
+    "issued_units": "Cotas Emitidas",
+    "market_sector": "Setor",
+    "net_asset_value_per_unit": "VP/C",
+}
+
+# Magnitude suffixes written by the website (upper case) -> multiplier
+MAGNITUDES = {
+    "": 1.0,
+    "K": 1e3,
+    "MIL": 1e3,
+    "M": 1e6,
+    "MILHÃO": 1e6,
+    "MILHÕES": 1e6,
+    "B": 1e9,
+    "BILHÃO": 1e9,
+    "BILHÕES": 1e9,
+}
+
+# Value shown by the website when an indicator is not available (possibly as "R$ -" or "-%")
+MISSING = "-"
+
+
+def _is_missing(text: pd.Series) -> pd.Series:
+    return text.str.replace(r"[R$%\s]", "", regex=True).eq(MISSING).fillna(False)
+
+
+def parse_number(series: pd.Series) -> pd.Series:
+    """
+    Parses Brazilian-formatted numbers such as "R$ 1.234,56", "12,77%" or "-3,22%".
+
+    Currency symbols, percent signs and spaces are dropped, "." is read as the thousands
+    separator and "," as the decimal separator. The "-" placeholder (also as "R$ -")
+    becomes 0 and values that are not numbers become NaN.
+
+    Args:
+        series (pd.Series): The raw strings.
+
+    Returns:
+        pd.Series: The parsed values as float64.
+    """
+    text = series.astype("string").str.strip()
+    numbers = (
+        text.str.replace(r"[^\d,.\-]", "", regex=True)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    values = pd.to_numeric(numbers, errors="coerce").astype("float64")
+    return values.mask(_is_missing(text), 0.0)
+
+
+def parse_magnitude(series: pd.Series) -> pd.Series:
+    """
+    Parses Brazilian-formatted amounts followed by a magnitude, such as "R$ 16,84 M",
+    "R$ 850,5 K", "R$ 500 Mil" or "R$ 4,22 Bilhões".
+
+    Args:
+        series (pd.Series): The raw strings.
+
+    Returns:
+        pd.Series: The parsed amounts as float64. The "-" placeholder becomes 0 and
+        unknown magnitudes become NaN.
+    """
+    text = series.astype("string").str.strip()
+    parts = text.str.extract(r"(?P<number>-?[\d.,]+)\s*(?P<unit>\D*?)\s*$")
+    factor = parts["unit"].str.upper().map(MAGNITUDES).astype("float64")
+    values = parse_number(parts["number"]) * factor
+    return values.mask(_is_missing(text), 0.0)
+
+
+def parse_management_fee(series: pd.Series) -> pd.Series:
+    """
+    Extracts the yearly management fee (in %) from texts such as
+    "0,90% a.a (mínimo de R$ 60 mil mensais)".
+
+    Args:
+        series (pd.Series): The raw strings.
+
+    Returns:
+        pd.Series: The fee as float64, or 0 when the text does not start with a number.
+    """
+    fee = series.astype("string").str.extract(r"^\s*(\d+(?:[.,]\d+)?)", expand=False)
+    fee = pd.to_numeric(fee.str.replace(",", ".", regex=False), errors="coerce")
+    return fee.astype("float64").fillna(0.0)
+
+
+def normalize_fiis_details(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cleans the scraped Investidor10 details into a typed DataFrame.
+
+    Selects and renames the columns in `DETAILS_RENAME`, drops FIIs without quote,
+    dividend yield or liquidity (not found on the website) and parses every numeric
+    indicator with vectorized string operations.
+
+    Args:
+        df (pd.DataFrame): The details as saved by `ScraperInvestidor10`.
+
+    Returns:
+        pd.DataFrame: The normalized details, with float64 indicators, int64 "N/Cotistas"
+        and "Cotas Emitidas", and string "Ativo", "Tipo Fundo" and "Setor".
+    """
+    df = df[list(DETAILS_RENAME)].rename(columns=DETAILS_RENAME)
+    df = df.dropna(subset=["Preco Atual", "DY", "Negociacao diaria"], axis=0)
+
+    normalized = pd.DataFrame(index=df.index)
+    normalized["Ativo"] = df["Ativo"].astype("string").str.upper()
+    for column in ["Preco Atual", "DY", "P/VP", "Variacao 12M", "Vacancia", "VP/C"]:
+        normalized[column] = parse_number(df[column])
+    for column in ["Negociacao diaria", "Valor Patrimonial"]:
+        normalized[column] = parse_magnitude(df[column])
+    for column in ["N/Cotistas", "Cotas Emitidas"]:
+        normalized[column] = parse_number(df[column]).fillna(0).astype("int64")
+    normalized["Taxa Gerencia"] = parse_management_fee(df["Taxa Gerencia"])
+    normalized["Tipo Fundo"] = df["Tipo Fundo"].astype("string")
+    normalized["Setor"] = df["Setor"].astype("string")
+
+    return normalized[list(DETAILS_RENAME.values())]
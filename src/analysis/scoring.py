@@ -0,0 +1,222 @@
+import re
+import configparser
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Comparison operators accepted in the `where` conditions of a rule
+OPERATORS = {
+    ">=": lambda values, limit: values >= limit,
+    "<=": lambda values, limit: values <= limit,
+    ">": lambda values, limit: values > limit,
+    "<": lambda values, limit: values < limit,
+    "==": lambda values, limit: values == limit,
+    "in": lambda values, limit: values.isin(limit),
+}
+
+# Selections accepted in the `select` option of a rule
+SELECTIONS = ("largest", "smallest", "closest_to_mean")
+
+CONDITION_PATTERN = re.compile(r"^(?P<column>.+?)\s+(?P<operator>>=|<=|==|>|<|in)\s+(?P<value>.+)$")
+
+
+@dataclass
+class Condition:
+    """
+    A comparison between a column and a value, such as "DY >= 8".
+    """
+
+    column: str
+    operator: str
+    value: object
+
+    @classmethod
+    def parse(cls, text: str) -> "Condition":
+        """
+        Parses a condition written as "<column> <operator> <value>".
+
+        Args:
+            text (str): The condition, e.g. "P/VP <= 1.10" or "Tipo Fundo in Fundo de Tijolo, Fundo de papel".
+
+        Returns:
+            Condition: The parsed condition.
+
+        Raises:
+            ValueError: If the text is not a valid condition.
+        """
+        match = CONDITION_PATTERN.match(text.strip())
+        if match is None:
+            raise ValueError(f"Invalid condition: {text!r}")
+
+        operator, value = match["operator"], match["value"].strip()
+        if operator == "in":
+            value = [item.strip() for item in value.split(",")]
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        return cls(match["column"], operator, value)
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: A boolean array, True for the rows meeting the condition.
+                Missing values never meet it.
+        """
+        return OPERATORS[self.operator](df[self.column], self.value).fillna(False).to_numpy(bool)
+
+
+@dataclass
+class Rule:
+    """
+    A scoring rule: the rows meeting every condition in `where` (or, when `select` is set,
+    the `n` rows among them chosen by `select` over the column `by`) score one point.
+    """
+
+    label: str
+    score: str
+    where: list = field(default_factory=list)
+    select: Optional[str] = None
+    by: Optional[str] = None
+    n: Optional[int] = None
+
+
+def load_rules(file_path: str) -> dict:
+    """
+    Loads the scoring rules declared in an INI file (see `scoring_rules.ini`).
+
+    Args:
+        file_path (str): Path to the rules file.
+
+    Returns:
+        dict: The rules of each score, keyed by score name, in the order they are declared.
+
+    Raises:
+        ValueError: If a rule has an unknown selection or misses `by`/`n` for its selection.
+    """
+    config = configparser.ConfigParser(interpolation=None)
+    config.optionxform = str
+    with open(file_path, "r", encoding="utf-8") as file:
+        config.read_file(file)
+
+    rules = dict()
+    for label in config.sections():
+        section = config[label]
+        rule = Rule(
+            label=label,
+            score=section["score"],
+            where=[
+                Condition.parse(line)
+                for line in section.get("where", "").splitlines()
+                if line.strip()
+            ],
+            select=section.get("select"),
+            by=section.get("by"),
+            n=section.getint("n"),
+        )
+        if rule.select is not None and (
+            rule.select not in SELECTIONS or rule.by is None or rule.n is None
+        ):
+            raise ValueError(
+                f"Rule {label!r}: `select` must be one of {SELECTIONS} and needs `by` and `n`"
+            )
+        rules.setdefault(rule.score, list()).append(rule)
+    return rules
+
+
+def evaluate_rules(df: pd.DataFrame, rules: list, group_by=None) -> np.ndarray:
+    """
+    Evaluates every rule over a DataFrame.
+
+    Selections (top-N, closest to the mean) are ranked inside each group of `group_by`, so
+    several snapshots stacked in one DataFrame are scored as if each one was scored alone.
+
+    Args:
+        df (pd.DataFrame): The FIIs to score.
+        rules (list): The rules to evaluate.
+        group_by: Column name(s) or array of keys splitting `df` into independent snapshots.
+            Default is a single snapshot.
+
+    Returns:
+        np.ndarray: A boolean matrix of shape (len(df), len(rules)), True where a row scores
+        the point of a rule.
+    """
+    if group_by is None:
+        keys = np.zeros(len(df), dtype=int)
+    elif isinstance(group_by, str):
+        keys = df[group_by]
+    elif isinstance(group_by, list):
+        keys = [df[column] for column in group_by]
+    else:
+        keys = group_by
+    matrix = np.ones((len(df), len(rules)), dtype=bool)
+
+    for position, rule in enumerate(rules):
+        for condition in rule.where:
+            matrix[:, position] &= condition.evaluate(df)
+
+        if rule.select is not None:
+            values = df[rule.by]
+            if rule.select == "closest_to_mean":
+                values = (values - values.groupby(keys).transform("mean")).abs()
+            candidates = values.where(matrix[:, position])
+            ranks = candidates.groupby(keys).rank(
+                method="first", ascending=rule.select != "largest"
+            )
+            matrix[:, position] = (ranks <= rule.n).to_numpy(bool)
+
+    return matrix
+
+
+def describe_matrix(matrix: np.ndarray, labels: list) -> np.ndarray:
+    """
+    Builds the "Detalhado" description of each row from a rule matrix: the labels of the
+    rules scored by the row, separated by ";".
+
+    Rows are encoded as bit patterns so each distinct combination of rules is described
+    only once, whatever the number of rows.
+
+    Args:
+        matrix (np.ndarray): The boolean matrix returned by `evaluate_rules`.
+        labels (list): The label of each rule (matrix column).
+
+    Returns:
+        np.ndarray: The description of each row.
+    """
+    if matrix.shape[1] == 0:
+        return np.full(matrix.shape[0], "", dtype=object)
+
+    patterns = np.packbits(matrix, axis=1, bitorder="little")
+    unique_patterns, inverse = np.unique(patterns, axis=0, return_inverse=True)
+    flags = np.unpackbits(unique_patterns, axis=1, count=len(labels), bitorder="little")
+    descriptions = np.array(
+        [";".join(label for label, flag in zip(labels, row) if flag) for row in flags],
+        dtype=object,
+    )
+    return descriptions[inverse.reshape(-1)]
+
+
+def score_fiis(df: pd.DataFrame, rules: list, score_name: str, group_by=None) -> pd.DataFrame:
+    """
+    Scores the FIIs with a list of rules.
+
+    Args:
+        df (pd.DataFrame): The FIIs to score.
+        rules (list): The rules of the score, e.g. `load_rules(path)["Score Padrao"]`.
+        score_name (str): The name of the score column.
+        group_by: Column name(s) or array of keys splitting `df` into independent snapshots
+            (e.g. "date_process" to backtest the rules over the history). Default is a
+            single snapshot.
+
+    Returns:
+        pd.DataFrame: A copy of `df` with the columns `score_name` (the number of rules met)
+        and `score_name + " Detalhado"` (their labels, separated by ";").
+    """
+    matrix = evaluate_rules(df, rules, group_by)
+
+    df = df.copy()
+    df[score_name] = matrix.sum(axis=1)
+    df[f"{score_name} Detalhado"] = describe_matrix(matrix, [rule.label for rule in rules])
+    return df
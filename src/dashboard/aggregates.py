@@ -0,0 +1,143 @@
+import os
+import json
+import pandas as pd
+
+# Version of the aggregates file; files of other versions must be rebuilt by the wallet stage
+AGGREGATES_VERSION = 1
+
+
+def allocation_by_asset(df_portfolio: pd.DataFrame) -> pd.DataFrame:
+    """
+    Args:
+        df_portfolio (pd.DataFrame): Portfolio returned by the wallet stage (`build_portfolio`).
+
+    Returns:
+        pd.DataFrame: The investment, share of its asset type and profit of each asset held,
+        ordered by asset type and share.
+    """
+    df = df_portfolio.loc[
+        df_portfolio["Investimento"] > 0,
+        ["Tipo Ativo", "Ativo", "Investimento", "% Carteira", "Saldo", "Lucro", "Prejuizo"],
+    ]
+    return df.sort_values(["Tipo Ativo", "% Carteira"], ascending=[True, False]).reset_index(drop=True)
+
+
+def allocation_by_type(df_assets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Args:
+        df_assets (pd.DataFrame): Output of `allocation_by_asset`.
+
+    Returns:
+        pd.DataFrame: The investment, number of assets, profit and share of the whole
+        portfolio of each asset type. The profit is unknown (NaN) if the profit of any
+        asset of the type is unknown.
+    """
+    df = (
+        df_assets.groupby("Tipo Ativo", sort=True)
+        .agg(
+            Ativos=("Ativo", "size"),
+            Investimento=("Investimento", "sum"),
+            Saldo=("Saldo", "sum"),
+            Lucro=("Lucro", lambda values: values.sum(skipna=False)),
+            Prejuizo=("Prejuizo", "sum"),
+        )
+        .reset_index()
+    )
+    df["% Carteira"] = round(df["Investimento"] * 100 / df["Investimento"].sum(), 2)
+    return df
+
+
+def tax_by_month(df_monthly: pd.DataFrame) -> pd.DataFrame:
+    """
+    Args:
+        df_monthly (pd.DataFrame): Monthly sales report of the B3 stage (`treat_b3`), in reais.
+
+    Returns:
+        pd.DataFrame: The real profit and the expected, paid and pending income tax of each
+        month and asset type, oldest month first. They are unknown (NaN) for the months
+        with sales without IR rate ("Sem Taxa IR").
+    """
+    df = (
+        df_monthly.assign(**{"Data Mensal": df_monthly["Data Mensal"].astype("str")})
+        .groupby(["Data Mensal", "Tipo Ativo"], sort=True, observed=True)
+        .agg(
+            {
+                "Valor": "sum",
+                "Lucro Real": lambda values: values.sum(skipna=False),
+                "IR Esperado": lambda values: values.sum(skipna=False),
+                "IR Pago": "sum",
+                "IR Pendente": lambda values: values.sum(skipna=False),
+                "Sem Taxa IR": "any",
+            }
+        )
+        .reset_index()
+    )
+    df["Tipo Ativo"] = df["Tipo Ativo"].astype("str")
+    return df
+
+
+def build_aggregates(df_portfolio: pd.DataFrame, df_monthly: pd.DataFrame) -> dict:
+    """
+    Precomputes every table drawn by the dashboard, so it does not need to read and group
+    the full reports.
+
+    Args:
+        df_portfolio (pd.DataFrame): Portfolio returned by the wallet stage (`build_portfolio`).
+        df_monthly (pd.DataFrame): Monthly sales report of the B3 stage, in reais.
+
+    Returns:
+        dict: The "allocation_by_type", "allocation_by_asset" and "tax_by_month" tables.
+    """
+    df_assets = allocation_by_asset(df_portfolio)
+    return {
+        "allocation_by_type": allocation_by_type(df_assets),
+        "allocation_by_asset": df_assets,
+        "tax_by_month": tax_by_month(df_monthly),
+    }
+
+
+def save_aggregates(aggregates: dict, path: str) -> None:
+    """
+    Writes the aggregates to a compact JSON file (columns, types and rows of each table),
+    replacing the previous file atomically.
+
+    Args:
+        aggregates (dict): Output of `build_aggregates`.
+        path (str): Path to the JSON file.
+    """
+    tables = {
+        name: {
+            "columns": list(df.columns),
+            "dtypes": [str(dtype) for dtype in df.dtypes],
+            "data": df.astype("object").where(df.notna(), None).to_numpy().tolist(),
+        }
+        for name, df in aggregates.items()
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as aggregates_file:
+        json.dump({"version": AGGREGATES_VERSION, "tables": tables}, aggregates_file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(f"{path}.tmp", path)
+
+
+def load_aggregates(path: str) -> dict:
+    """
+    Args:
+        path (str): Path to the JSON file written by `save_aggregates`.
+
+    Returns:
+        dict: The aggregate tables, by name.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file was written by another version.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No dashboard aggregates in {path}, run the wallet stage first")
+    with open(path, "r", encoding="utf-8") as aggregates_file:
+        content = json.load(aggregates_file)
+    if content.get("version") != AGGREGATES_VERSION:
+        raise ValueError(f"Dashboard aggregates in {path} are outdated, run the wallet stage with --force")
+    return {
+        name: pd.DataFrame(table["data"], columns=table["columns"]).astype(dict(zip(table["columns"], table["dtypes"])))
+        for name, table in content["tables"].items()
+    }
@@ -0,0 +1,170 @@
+import os
+import io
+import base64
+import html
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+POSITIVE_COLOR = "tab:green"
+NEGATIVE_COLOR = "tab:red"
+
+
+def _type_colors(types) -> dict:
+    palette = colormaps["tab10"]
+    return {tipo: palette(index % palette.N) for index, tipo in enumerate(sorted(set(types)))}
+
+
+def _asset_figure(df_assets, width_per_asset: float = 0.25) -> Figure:
+    return Figure(figsize=(max(8, width_per_asset * len(df_assets)), 6), dpi=100, layout="constrained")
+
+
+def plot_allocation_by_type(aggregates: dict) -> Figure:
+    """
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+
+    Returns:
+        Figure: The share of the portfolio of each asset type.
+    """
+    df = aggregates["allocation_by_type"]
+    colors = _type_colors(df["Tipo Ativo"])
+    figure = Figure(figsize=(8, 4), dpi=100, layout="constrained")
+    ax = figure.add_subplot()
+    ax.barh(df["Tipo Ativo"], df["% Carteira"], color=[colors[tipo] for tipo in df["Tipo Ativo"]])
+    ax.bar_label(ax.containers[0], labels=[f"{value:.2f}%" for value in df["% Carteira"]])
+    ax.margins(x=0.15)
+    ax.set_xlabel("% Carteira")
+    ax.set_title("Distribuição por Tipo de Ativo")
+    return figure
+
+
+def plot_allocation_by_asset(aggregates: dict) -> Figure:
+    """
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+
+    Returns:
+        Figure: The share of its asset type of each asset, colored by type.
+    """
+    df = aggregates["allocation_by_asset"]
+    colors = _type_colors(df["Tipo Ativo"])
+    figure = _asset_figure(df)
+    ax = figure.add_subplot()
+    ax.bar(df["Ativo"], df["% Carteira"], color=[colors[tipo] for tipo in df["Tipo Ativo"]])
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_ylabel("% Carteira")
+    ax.set_title("Distribuição Percentual da Carteira")
+    ax.legend(handles=[Patch(color=color, label=tipo) for tipo, color in colors.items()])
+    return figure
+
+
+def plot_profit_by_asset(aggregates: dict) -> Figure:
+    """
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+
+    Returns:
+        Figure: The unrealized profit ("Saldo") of each asset with a known quote.
+    """
+    df = aggregates["allocation_by_asset"].dropna(subset=["Saldo"])
+    figure = _asset_figure(df)
+    ax = figure.add_subplot()
+    ax.bar(df["Ativo"], df["Saldo"], color=[POSITIVE_COLOR if value >= 0 else NEGATIVE_COLOR for value in df["Saldo"]])
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_ylabel("Saldo (R$)")
+    ax.set_title("Lucro / Prejuízo Não Realizado por Ativo")
+    return figure
+
+
+def plot_tax_by_month(aggregates: dict) -> Figure:
+    """
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+
+    Returns:
+        Figure: The expected and paid income tax of each month, side by side, and the
+        pending income tax carried to the month. Months with sales without IR rate are
+        marked with "*".
+    """
+    df = (
+        aggregates["tax_by_month"]
+        .groupby("Data Mensal", sort=True)
+        .agg({"IR Esperado": "sum", "IR Pago": "sum", "IR Pendente": "sum", "Sem Taxa IR": "any"})
+    )
+    # Months with sales without IR rate have unknown taxes, left out of the bars
+    labels = [f"{month} *" if unknown else month for month, unknown in zip(df.index, df["Sem Taxa IR"])]
+    positions = np.arange(len(df))
+    figure = Figure(figsize=(max(8, 0.3 * len(df)), 5), dpi=100, layout="constrained")
+    ax = figure.add_subplot()
+    ax.bar(positions - 0.2, df["IR Esperado"], width=0.4, label="IR Esperado", color=NEGATIVE_COLOR)
+    ax.bar(positions + 0.2, df["IR Pago"], width=0.4, label="IR Pago", color=POSITIVE_COLOR)
+    ax.step(positions, df["IR Pendente"], where="mid", label="IR Pendente", color="black")
+    ax.set_xticks(positions, labels, rotation=90)
+    ax.set_ylabel("R$")
+    ax.set_title("Imposto de Renda por Mês" + (" (* vendas sem taxa de IR)" if df["Sem Taxa IR"].any() else ""))
+    ax.legend()
+    return figure
+
+
+# Charts of the dashboard: file name -> plot function
+CHARTS = {
+    "allocation_by_type": plot_allocation_by_type,
+    "allocation_by_asset": plot_allocation_by_asset,
+    "profit_by_asset": plot_profit_by_asset,
+    "tax_by_month": plot_tax_by_month,
+}
+
+
+def build_figures(aggregates: dict) -> dict:
+    """
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+
+    Returns:
+        dict: The figure of each chart in `CHARTS`, by name.
+    """
+    return {name: plot(aggregates) for name, plot in CHARTS.items()}
+
+
+def render_dashboard(aggregates: dict, output_folder: str) -> list:
+    """
+    Renders the dashboard without a display: every chart is drawn on a pyplot-free
+    figure, with one batched matplotlib call per series, and written as a PNG file and
+    in an `index.html` page with the allocation by asset type table.
+
+    Args:
+        aggregates (dict): Output of `load_aggregates`.
+        output_folder (str): Folder of the rendered files.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = list()
+    images = list()
+    for name, figure in build_figures(aggregates).items():
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png")
+        path = os.path.join(output_folder, f"{name}.png")
+        with open(path, "wb") as image_file:
+            image_file.write(buffer.getvalue())
+        paths.append(path)
+        images.append(
+            f'<img alt="{html.escape(name)}" src="data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}">'
+        )
+
+    table = aggregates["allocation_by_type"].to_html(index=False, float_format="{:,.2f}".format, border=0)
+    page = (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>SmartFund</title></head>'
+        f"<body><h1>SmartFund</h1>{table}{''.join(images)}</body></html>"
+    )
+    path = os.path.join(output_folder, "index.html")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as html_file:
+        html_file.write(page)
+    os.replace(f"{path}.tmp", path)
+    paths.append(path)
+    return paths
+
@@ -0,0 +1,253 @@
+import os
+import json
+import math
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+class Histogram:
+    """
+    A cumulative histogram of observed values, in the Prometheus format.
+
+    Attributes:
+        buckets (tuple): Upper bound of each bucket, ending with infinity.
+        counts (list): Number of observations in each bucket (non-cumulative).
+        sum (float): Sum of the observed values.
+        count (int): Number of observations.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        """
+        Args:
+            buckets (tuple): Upper bound of each bucket. Default is `LATENCY_BUCKETS`.
+        """
+        self.buckets = tuple(buckets) if buckets[-1] == math.inf else tuple(buckets) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Args:
+            value (float): The observed value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list:
+        """
+        Returns:
+            list: Number of observations less than or equal to each bucket bound.
+        """
+        total = 0
+        cumulative = list()
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class Metrics:
+    """
+    A thread-safe registry of counters, gauges and histograms.
+
+    Each metric is identified by its name and labels (keyword arguments), and the registry
+    can be written as JSON or in the Prometheus text exposition format.
+
+    Attributes:
+        counters (dict): Value of each counter, by (name, labels).
+        gauges (dict): Last value of each gauge, by (name, labels).
+        histograms (dict): `Histogram` of each histogram, by (name, labels).
+    """
+
+    def __init__(self) -> None:
+        self.counters = dict()
+        self.gauges = dict()
+        self.histograms = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Adds a value to a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (float): Value added. Default is 1.
+            **labels: Labels of the counter.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """
+        Sets the value of a gauge.
+
+        Args:
+            name (str): Name of the gauge.
+            value (float): The new value.
+            **labels: Labels of the gauge.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+        """
+        Adds an observation to a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            value (float): The observed value.
+            buckets (tuple): Bucket bounds, used when the histogram is created. Default is `LATENCY_BUCKETS`.
+            **labels: Labels of the histogram.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Observes the seconds spent in the `with` block in a histogram, even if it raises.
+
+        Args:
+            name (str): Name of the histogram.
+            **labels: Labels of the histogram.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """
+        Decorator observing the seconds spent in each call of the function in a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            **labels: Labels of the histogram.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        """
+        Removes every metric.
+        """
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The counters, gauges and histograms, each as a list of {name, labels, ...}.
+        """
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.gauges.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "buckets": [str(bound) for bound in histogram.buckets],
+                        "counts": histogram.cumulative_counts(),
+                        "sum": histogram.sum,
+                        "count": histogram.count,
+                    }
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+
+        def format_labels(labels):
+            if not labels:
+                return ""
+            escaped = [
+                key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for key, value in labels
+            ]
+            return "{" + ",".join(escaped) + "}"
+
+        lines = list()
+        types = dict()
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                types.setdefault(name, "counter")
+                lines.append((name, f"{name}{format_labels(labels)} {value}"))
+            for (name, labels), value in sorted(self.gauges.items()):
+                types.setdefault(name, "gauge")
+                lines.append((name, f"{name}{format_labels(labels)} {value}"))
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                types.setdefault(name, "histogram")
+                for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    bound = "+Inf" if bound == math.inf else str(bound)
+                    lines.append((name, f"{name}_bucket{format_labels(labels + (('le', bound),))} {count}"))
+                lines.append((name, f"{name}_sum{format_labels(labels)} {histogram.sum}"))
+                lines.append((name, f"{name}_count{format_labels(labels)} {histogram.count}"))
+
+        text = list()
+        for name in types:
+            text.append(f"# TYPE {name} {types[name]}")
+            text.extend(line for line_name, line in lines if line_name == name)
+        return "\n".join(text) + "\n"
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the metrics to a file: Prometheus text for ".prom" or ".txt" files,
+        JSON otherwise.
+
+        Args:
+            path (str): Path to the metrics file.
+        """
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=1)
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(content)
+        os.replace(f"{path}.tmp", path)
+
+
+# Registry shared by the scrapers, the wallet functions and the pipeline
+METRICS = Metrics()
@@ -0,0 +1,66 @@
+import os
+import time
+import cProfile
+import functools
+from contextlib import contextmanager
+import pandas as pd
+from src.monitoring.metrics import METRICS
+
+
+def profile_stage(name: str = None, metrics=METRICS):
+    """
+    Decorator profiling a DataFrame step: the seconds of each call (histogram
+    "stage_seconds") and the rows of the first DataFrame argument and of the returned
+    DataFrame (gauges "stage_rows_in" and "stage_rows_out"), labeled by stage.
+
+    A step whose time grows much faster than its rows (e.g. a quadratic apply) stands
+    out when the metrics of runs with different sizes are compared.
+
+    Args:
+        name (str): Name of the stage. Default is the name of the function.
+        metrics (Metrics): Registry where the metrics are recorded. Default is `METRICS`.
+    """
+
+    def decorator(function):
+        stage = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            frames = [arg for arg in args if isinstance(arg, pd.DataFrame)]
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            metrics.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+            if frames:
+                metrics.set("stage_rows_in", len(frames[0]), stage=stage)
+            if isinstance(result, pd.DataFrame):
+                metrics.set("stage_rows_out", len(result), stage=stage)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profiled(path: str = None):
+    """
+    Runs the `with` block under cProfile and writes the statistics to `path`
+    (readable with `pstats` or snakeviz). Does nothing when `path` is None.
+
+    Args:
+        path (str): Path to the cProfile output file. Default is None.
+    """
+    if path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(path)
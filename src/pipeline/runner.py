@@ -0,0 +1,310 @@
+import os
+import json
+import glob
+import time
+import pickle
+import hashlib
+import configparser
+from dataclasses import dataclass
+from typing import Callable
+import pandas as pd
+from src.monitoring.metrics import METRICS
+
+# Version of the cache format; entries of other versions are recomputed
+CACHE_VERSION = 1
+
+# Python sources whose changes invalidate every cached stage
+SOURCE_FOLDER = os.path.join(os.path.dirname(__file__), "..")
+
+
+def load_paths(config_path: str = "config.ini") -> dict:
+    """
+    Loads the `[paths]` section of the config file, converting the separators of every
+    path to the ones of the running system (the file may use Windows "\\" paths).
+
+    Args:
+        config_path (str): Path to the config file. Default is "config.ini".
+
+    Returns:
+        dict: The normalized paths, by config key.
+
+    Raises:
+        FileNotFoundError: If the config file does not exist.
+    """
+    config = configparser.ConfigParser()
+    if not config.read(config_path, encoding="utf-8"):
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+
+    folder = os.path.dirname(os.path.abspath(config_path))
+    return {
+        key: os.path.normpath(os.path.join(folder, value.replace("\\", "/")))
+        for key, value in config["paths"].items()
+    }
+
+
+def fingerprint_path(path: str) -> str:
+    """
+    Fingerprints an input of a stage: the SHA-256 of a file, or the names, sizes and
+    modification times of every file of a folder.
+
+    Args:
+        path (str): Path to a file or folder.
+
+    Returns:
+        str: The fingerprint, or "missing" when the path does not exist.
+    """
+    if os.path.isfile(path):
+        with open(path, "rb") as input_file:
+            return hashlib.file_digest(input_file, "sha256").hexdigest()
+
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, _, files in sorted(os.walk(path)):
+            for file_name in sorted(files):
+                status = os.stat(os.path.join(root, file_name))
+                relative_path = os.path.relpath(os.path.join(root, file_name), path)
+                digest.update(f"{relative_path}\0{status.st_size}\0{status.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    return "missing"
+
+
+def fingerprint_sources(folder: str = SOURCE_FOLDER) -> str:
+    """
+    Args:
+        folder (str): Folder of the Python sources. Default is the `src` package.
+
+    Returns:
+        str: The SHA-256 of the content of every .py file of the folder.
+    """
+    digest = hashlib.sha256()
+    for file_path in sorted(glob.glob(os.path.join(folder, "**", "*.py"), recursive=True)):
+        with open(file_path, "rb") as source_file:
+            digest.update(os.path.relpath(file_path, folder).encode())
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+def hash_output(output) -> str:
+    """
+    Hashes the content of a stage output (a DataFrame, a dict of DataFrames or None).
+
+    Args:
+        output: The stage output.
+
+    Returns:
+        str: The SHA-256 of the values, index, columns and dtypes of the output.
+    """
+    digest = hashlib.sha256()
+    if isinstance(output, pd.DataFrame):
+        digest.update(repr(list(zip(output.columns, output.dtypes.astype(str)))).encode())
+        digest.update(pd.util.hash_pandas_object(output, index=True).to_numpy().tobytes())
+    elif isinstance(output, dict):
+        for key in sorted(output):
+            digest.update(f"{key}\0{hash_output(output[key])}\n".encode())
+    else:
+        digest.update(pickle.dumps(output))
+    return digest.hexdigest()
+
+
+@dataclass
+class Stage:
+    """
+    A step of the pipeline.
+
+    The function is called with the paths of the config file followed by the outputs of
+    the dependencies, in the order they are listed, and returns the stage output.
+
+    Attributes:
+        name (str): Name of the stage.
+        function (Callable): Function computing the stage output.
+        dependencies (tuple): Names of the stages whose outputs are passed to the function.
+        inputs (tuple): Config keys of the files and folders read by the function.
+        outputs (tuple): Config keys of the files written by the function. A cached run
+            is only reused while all of them exist.
+        cached (bool): If False, the stage always runs when selected and is never
+            run only as a dependency (e.g. stages with side effects, like scraping).
+    """
+
+    name: str
+    function: Callable
+    dependencies: tuple = ()
+    inputs: tuple = ()
+    outputs: tuple = ()
+    cached: bool = True
+
+
+@dataclass
+class StageRun:
+    """
+    The result of a stage in a pipeline run.
+
+    Attributes:
+        name (str): Name of the stage.
+        status (str): "run" when the function was executed, "cached" when the output
+            was loaded from the cache.
+        seconds (float): Time spent running or loading the stage.
+    """
+
+    name: str
+    status: str
+    seconds: float
+
+
+class Pipeline:
+    """
+    Runs stages as a DAG, passing their outputs in memory and caching them on disk.
+
+    Each cached stage is keyed by the content hash of its inputs: the fingerprints of
+    the files it reads, the content hashes of the outputs of its dependencies and the
+    fingerprint of the `src` sources. A stage whose key did not change since its last
+    run is loaded from the cache instead of being executed (unless some file it writes
+    is missing), so only the stages affected by a change are recomputed.
+
+    Attributes:
+        stages (dict): The stages, by name, in execution order.
+        paths (dict): Paths of the config file, passed to every stage.
+        cache_folder (str): Folder where the outputs of the stages are cached.
+        runs (list): The `StageRun` of each stage of the last run, also recorded in
+            `METRICS` as "pipeline_stage_seconds".
+    """
+
+    def __init__(self, stages: list, paths: dict, cache_folder: str) -> None:
+        """
+        Args:
+            stages (list): The stages, each listed after its dependencies.
+            paths (dict): Paths of the config file, passed to every stage.
+            cache_folder (str): Folder where the outputs of the stages are cached.
+
+        Raises:
+            ValueError: If a stage depends on a stage that is not listed before it.
+        """
+        self.stages = dict()
+        for stage in stages:
+            missing = [name for name in stage.dependencies if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+            self.stages[stage.name] = stage
+
+        self.paths = paths
+        self.cache_folder = cache_folder
+        self.runs = list()
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def _cache_path(self, name: str) -> str:
+        return os.path.join(self.cache_folder, f"{name}.pkl")
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_folder, "manifest.json"), "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, json.JSONDecodeError):
+            manifest = dict()
+
+        if manifest.get("version") != CACHE_VERSION:
+            manifest = {"version": CACHE_VERSION, "stages": dict()}
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        manifest_path = os.path.join(self.cache_folder, "manifest.json")
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def _save_output(self, name: str, output) -> None:
+        cache_path = self._cache_path(name)
+        with open(f"{cache_path}.tmp", "wb") as cache_file:
+            pickle.dump(output, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{cache_path}.tmp", cache_path)
+
+    def _load_output(self, name: str):
+        with open(self._cache_path(name), "rb") as cache_file:
+            return pickle.load(cache_file)
+
+    def resolve(self, selected: list = None) -> list:
+        """
+        Lists the stages needed to run the selected stages, in execution order.
+
+        Args:
+            selected (list): Names of the stages to run. Default is every cached stage.
+
+        Returns:
+            list: The selected stages and their dependencies.
+
+        Raises:
+            ValueError: If a selected stage does not exist.
+        """
+        if selected is None:
+            selected = [name for name, stage in self.stages.items() if stage.cached]
+
+        unknown = [name for name in selected if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stages: {unknown}. Available: {list(self.stages)}")
+
+        needed = set()
+        pending = list(selected)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].dependencies)
+        return [name for name in self.stages if name in needed]
+
+    def run(self, selected: list = None, force: bool = False) -> dict:
+        """
+        Runs the selected stages and their dependencies, skipping the ones whose inputs
+        did not change since their cached run.
+
+        Args:
+            selected (list): Names of the stages to run. Default is every cached stage.
+            force (bool): If True, every needed stage runs, ignoring the cache. Default is False.
+
+        Returns:
+            dict: The output of each needed stage, by name.
+        """
+        manifest = self._load_manifest()
+        sources = fingerprint_sources()
+        outputs = dict()
+        hashes = dict()
+        self.runs = list()
+
+        for name in self.resolve(selected):
+            stage = self.stages[name]
+            start = time.perf_counter()
+            key = hashlib.sha256(
+                json.dumps(
+                    {
+                        "stage": name,
+                        "sources": sources,
+                        "inputs": {key: fingerprint_path(self.paths[key]) for key in stage.inputs},
+                        "dependencies": {dependency: hashes[dependency] for dependency in stage.dependencies},
+                    },
+                    sort_keys=True,
+                ).encode()
+            ).hexdigest()
+
+            entry = manifest["stages"].get(name)
+            if (
+                stage.cached
+                and not force
+                and entry is not None
+                and entry["key"] == key
+                and os.path.exists(self._cache_path(name))
+                and all(os.path.exists(self.paths[key]) for key in stage.outputs)
+            ):
+                outputs[name] = self._load_output(name)
+                hashes[name] = entry["hash"]
+                status = "cached"
+            else:
+                outputs[name] = stage.function(self.paths, *(outputs[dependency] for dependency in stage.dependencies))
+                hashes[name] = hash_output(outputs[name])
+                status = "run"
+                if stage.cached:
+                    self._save_output(name, outputs[name])
+                    manifest["stages"][name] = {"key": key, "hash": hashes[name]}
+                    self._save_manifest(manifest)
+
+            seconds = time.perf_counter() - start
+            self.runs.append(StageRun(name, status, seconds))
+            METRICS.set("pipeline_stage_seconds", seconds, stage=name, status=status)
+        return outputs
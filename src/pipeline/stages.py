@@ -0,0 +1,405 @@
+import os
+import pandas as pd
+from src.analysis.normalization import normalize_fiis_details, parse_number
+from src.analysis.scoring import load_rules, score_fiis
+from src.dashboard.aggregates import build_aggregates, save_aggregates
+from src.pipeline.runner import Stage
+from src.wallet.carryforward import CompensacaoImpostos
+from src.wallet.corporate_actions import aplicar_eventos_corporativos, carregar_eventos_corporativos
+from src.wallet.daytrade import separar_day_trade
+from src.wallet.ingestion import carregar_relatorios_b3
+from src.wallet.ledger import (
+    calcular_valores_negociados,
+    listar_ativos_em_carteira,
+    verificar_inconsistencias,
+)
+from src.wallet.positions import MatrizPosicoes, MotorPosicoes
+from src.wallet.schema import (
+    CENTAVOS_POR_REAL,
+    arredondar_centavos,
+    categorizar,
+    exportar_negociacoes,
+    para_centavos,
+    tipar_negociacoes,
+)
+from src.wallet.tax import (
+    LIMITE_ISENCAO,
+    calcular_imposto_renda_esperado,
+    calcular_lucro_bruto_prejuizo,
+    calcular_lucro_real,
+    definir_taxa_imposto_renda_dedo_duro,
+)
+
+# Columns of the monthly sales report (`3. treat_b3.ipynb`)
+MONTHLY_COLUMNS = [
+    "Tipo Ativo", "Data Mensal", "Tipo Estrategia",
+    "Valor", "Taxa IR", "Dedo Duro", "Isento IR", "Sem Taxa IR",
+    "Lucro Real", "Lucro Bruto", "Prejuizo", "Lucro Bruto Compensado",
+    "Prejuizo Acumulado", "IR Esperado", "IR Compensado",
+    "IR Acumulado", "IR Pago", "IR Pendente",
+]
+
+# Columns of the portfolio report (`4. my_wallet.ipynb`)
+PORTFOLIO_COLUMNS = [
+    "Tipo Ativo", "Ativo", "Investimento", "Quantidade Total", "Preco Medio",
+    "Preco Atual", "Variacao 12M", "Saldo", "Lucro", "Prejuizo", "% Carteira",
+]
+
+
+def write_csv(df: pd.DataFrame, path: str) -> None:
+    """
+    Writes a stage output to CSV, creating its folder when needed.
+
+    Args:
+        df (pd.DataFrame): The data to write.
+        path (str): Path to the CSV file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+
+
+def create_scraper(paths: dict, **kwargs):
+    """
+    Creates the Investidor10 scraper saving to the folders of the config file, where
+    `load_fiis` and `build_positions` read the details and snapshots from, and caching
+    the fetched pages in `path_http_cache`.
+
+    Args:
+        paths (dict): Paths of the config file.
+        **kwargs: Options forwarded to `ScraperInvestidor10`.
+
+    Returns:
+        ScraperInvestidor10: The scraper.
+    """
+    from src.scrappers.scrapper_investidor10 import ScraperInvestidor10
+
+    scraper = ScraperInvestidor10(
+        save_folder=os.path.dirname(paths["path_investidor10_fiis_details"]),
+        cache_folder=paths["path_http_cache"],
+        **kwargs,
+    )
+    scraper.snapshot_path = paths["path_investidor10_snapshots"]
+    return scraper
+
+
+def collect_fiis(paths: dict) -> None:
+    """
+    Scrapes the FIIs of the Investidor10 website (`1. collect_fiis.py`).
+
+    Args:
+        paths (dict): Paths of the config file.
+    """
+    create_scraper(paths).run()
+
+
+def refresh_quotes(paths: dict, b3: dict) -> list:
+    """
+    Refreshes the quote, dividend yield and P/VP of the FIIs in the portfolio in the
+    scraped FIIs details and snapshots, fetching only their pages instead of the full
+    crawl. Cached pages are always revalidated, so a refresh right after a collect is
+    not stale.
+
+    Args:
+        paths (dict): Paths of the config file.
+        b3 (dict): Output of `treat_b3`.
+
+    Returns:
+        list: The details rows of the refreshed FIIs.
+    """
+    fii_names = listar_ativos_em_carteira(b3["negociacoes"], tipo_ativo="Fii")
+    return create_scraper(paths, cache_ttl=0).refresh_quotes(fii_names)
+
+
+def load_fiis(paths: dict) -> pd.DataFrame:
+    """
+    Loads the scraped FIIs details with their number of properties.
+
+    Args:
+        paths (dict): Paths of the config file.
+
+    Returns:
+        pd.DataFrame: The normalized details of each FII with "Quant. Imoveis".
+    """
+    df_details = normalize_fiis_details(pd.read_csv(paths["path_investidor10_fiis_details"], sep=","))
+
+    df_properties = pd.read_csv(paths["path_investidor10_fiis_properties"], sep=",")
+    df_count = df_properties["fii_name"].value_counts().rename("Quant. Imoveis").rename_axis("Ativo").reset_index()
+
+    df_fiis = df_details.merge(df_count, on="Ativo", how="left")
+    df_fiis["Quant. Imoveis"] = df_fiis["Quant. Imoveis"].fillna(0).astype("int")
+    return df_fiis
+
+
+def score_all_fiis(paths: dict, df_fiis: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scores the FIIs with the rules of the scoring rules file (`2. analysis_fiis.ipynb`).
+
+    Args:
+        paths (dict): Paths of the config file.
+        df_fiis (pd.DataFrame): Output of `load_fiis`.
+
+    Returns:
+        pd.DataFrame: The FIIs with their scores, best ranked first.
+    """
+    rules = load_rules(paths["path_scoring_rules"])
+    df_fiis = score_fiis(df_fiis, rules["Score Padrao"], "Score Padrao")
+    df_fiis = score_fiis(df_fiis, rules["Score Extra"], "Score Extra")
+    df_fiis["Score Final"] = df_fiis["Score Padrao"] + df_fiis["Score Extra"]
+    return df_fiis.sort_values(["Score Padrao", "Score Final"], ascending=False).reset_index(drop=True)
+
+
+def treat_b3(paths: dict) -> dict:
+    """
+    Treats the B3 trade reports and computes the taxes of each month (`3. treat_b3.ipynb`),
+    writing the treated and monthly reports.
+
+    The trades are kept in the ledger schema of `src/wallet/schema.py` (categorical
+    text columns, integer quantities and money in integer centavos) and converted to
+    reais only when the reports are written.
+
+    Args:
+        paths (dict): Paths of the config file.
+
+    Returns:
+        dict: The treated trades ("negociacoes") and the monthly sales ("vendas_mensais"),
+        in the ledger schema.
+
+    Raises:
+        ValueError: If there are no reports or if some traded asset has no category.
+    """
+    df = carregar_relatorios_b3(paths["path_b3_reports"], paths["path_b3_reports_cache"])
+    if df is None:
+        raise ValueError(f"No B3 reports found in {paths['path_b3_reports']}")
+
+    df = df.rename(
+        columns={
+            "Código de Negociação": "Ativo",
+            "Data do Negócio": "Data Negociacao",
+            "Tipo de Movimentação": "Tipo de Movimentacao",
+            "Preço": "Preco",
+        }
+    )
+    df = tipar_negociacoes(df)
+    df["Data Mensal"] = df["Data Negociacao"].dt.to_period("M")
+
+    df = aplicar_eventos_corporativos(df, carregar_eventos_corporativos(paths["path_corporate_actions"]))
+    df = separar_day_trade(df)
+    df["Movimentacao do Ativo"] = df.groupby("Ativo", observed=True).cumcount() + 1
+
+    df_depara_ativos = pd.read_csv(paths["path_categorizer_investments"], sep=",")
+    ativos_sem_categoria = set(df["Ativo"].unique()).difference(df_depara_ativos["Ativo"].unique())
+    if ativos_sem_categoria:
+        raise ValueError(f"Assets without category: {sorted(ativos_sem_categoria)}")
+    df = categorizar(df.merge(df_depara_ativos, on="Ativo", how="left"))
+
+    df = df.sort_values("Ativo", kind="stable").reset_index(drop=True)
+    df = calcular_valores_negociados(df)
+    for atual, anterior in [
+        ("Investimento Atual", "Investimento Anterior"),
+        ("Quantidade Atual", "Quantidade Anterior"),
+        ("Preco Medio Atual", "Preco Medio Anterior"),
+    ]:
+        df[anterior] = df.groupby("Ativo", observed=True)[atual].shift().fillna(0)
+    # Money is kept in integer centavos (src/wallet/schema.py) and rounded once, as
+    # each value is computed
+    df = arredondar_centavos(
+        df, ["Investimento Atual", "Preco Medio Atual", "Investimento Anterior", "Preco Medio Anterior"]
+    )
+    for coluna in ["Quantidade Atual", "Quantidade Anterior"]:
+        df[coluna] = df[coluna].astype("int")
+
+    df_inconsistencias = verificar_inconsistencias(df)
+    if len(df_inconsistencias) > 0:
+        print("Inconsistent sales:")
+        print(
+            exportar_negociacoes(df_inconsistencias)[
+                ["Ativo", "Data Negociacao", "Investimento Atual", "Quantidade Atual"]
+            ]
+        )
+
+    df = definir_taxa_imposto_renda_dedo_duro(df)
+    if df["Sem Taxa IR"].any():
+        print("Sales without IR rate (unknown IR in the reports):", set(df.loc[df["Sem Taxa IR"], "Ativo"]))
+    df = arredondar_centavos(df, ["Dedo Duro"])
+    df["Taxa IR"] = df["Taxa IR"].astype("float").round(2)
+
+    df = arredondar_centavos(calcular_lucro_bruto_prejuizo(df), ["Lucro Bruto", "Prejuizo"])
+    df = arredondar_centavos(calcular_imposto_renda_esperado(df), ["IR Esperado"])
+    df = arredondar_centavos(calcular_lucro_real(df), ["Lucro Real"])
+    write_csv(exportar_negociacoes(df), paths["path_treated_b3_report"])
+
+    # Sales without IR rate (NaN "Taxa IR") are kept in their own groups, flagged
+    # "Sem Taxa IR" and with unknown (NA) taxes, instead of being dropped
+    df_venda_mensal = (
+        df[df["Tipo de Movimentacao"] == "Venda"]
+        .groupby(["Tipo Ativo", "Data Mensal", "Taxa IR", "Tipo Estrategia"], observed=True, dropna=False)
+        .agg(
+            {
+                "Valor": "sum",
+                "IR Esperado": "sum",
+                "Dedo Duro": "sum",
+                "Lucro Bruto": "sum",
+                "Prejuizo": "sum",
+                "Lucro Real": "sum",
+                "Sem Taxa IR": "any",
+            }
+        )
+        .reset_index()
+    )
+    sem_taxa = df_venda_mensal["Sem Taxa IR"].to_numpy(bool)
+    for coluna in ["IR Esperado", "Dedo Duro", "Lucro Real"]:
+        df_venda_mensal[coluna] = df_venda_mensal[coluna].astype("Int64").mask(sem_taxa)
+
+    df_darfs_emitidas = pd.read_csv(paths["path_darfs_issued"], sep=",")
+    df_darfs_emitidas["Tipo Ativo"] = df_darfs_emitidas["Tipo Ativo"].astype("str")
+    df_darfs_emitidas["IR Pago"] = para_centavos(df_darfs_emitidas["IR Pago"])
+    df_darfs_emitidas["Data Mensal"] = pd.to_datetime(df_darfs_emitidas["Data"], format="%d/%m/%Y").dt.to_period("M")
+
+    compensacao = CompensacaoImpostos(df_darfs_emitidas, limite_isencao=LIMITE_ISENCAO * CENTAVOS_POR_REAL)
+    df_venda_mensal = arredondar_centavos(
+        compensacao.processar(df_venda_mensal),
+        ["Lucro Bruto Compensado", "Prejuizo Acumulado", "IR Compensado", "IR Acumulado", "IR Pago", "IR Pendente"],
+    )
+    df_venda_mensal = df_venda_mensal[MONTHLY_COLUMNS].sort_values(["Data Mensal"], ascending=False)
+    write_csv(exportar_negociacoes(df_venda_mensal), paths["path_treated_b3_report_monthly"])
+
+    return {"negociacoes": df, "vendas_mensais": df_venda_mensal}
+
+
+def build_portfolio(paths: dict, b3: dict, df_fiis: pd.DataFrame) -> dict:
+    """
+    Builds the current portfolio with the FIIs market data (`4. my_wallet.ipynb`),
+    writing the portfolio report and the aggregates drawn by the dashboard.
+
+    Args:
+        paths (dict): Paths of the config file.
+        b3 (dict): Output of `treat_b3`.
+        df_fiis (pd.DataFrame): Output of `load_fiis`.
+
+    Returns:
+        dict: Every traded asset with its position, market data and share of the portfolio
+        ("portfolio"), and the aggregates drawn by the dashboard ("aggregates").
+    """
+    df = exportar_negociacoes(
+        b3["negociacoes"][
+            ["Tipo Ativo", "Ativo", "Data Negociacao", "Quantidade Atual",
+             "Preco Medio Atual", "Investimento Atual", "Lucro Real", "Prejuizo"]
+        ]
+    ).rename(
+        columns={
+            "Investimento Atual": "Investimento",
+            "Quantidade Atual": "Quantidade Total",
+            "Preco Medio Atual": "Preco Medio",
+            "Lucro Real": "Lucro",
+        }
+    )
+
+    # Lucro unknown (NaN) for sales without IR rate is kept unknown instead of skipped
+    group_lucro_prej = df.groupby("Ativo")[["Lucro", "Prejuizo"]].agg(lambda values: values.sum(skipna=False))
+    df = df.drop_duplicates(subset="Ativo", keep="last")
+    df = df.loc[:, ["Tipo Ativo", "Ativo", "Quantidade Total", "Preco Medio", "Investimento"]]
+    df = df.merge(group_lucro_prej, on="Ativo", how="left")
+    df["Investimento"] = round(df["Investimento"], 2)
+    df["Preco Medio"] = round(df["Preco Medio"], 2)
+
+    df_quote = df_fiis.rename(columns={"DY": "Dividend Yield"})[
+        ["Ativo", "Preco Atual", "Dividend Yield", "P/VP",
+         "Negociacao diaria", "Variacao 12M", "N/Cotistas",
+         "Vacancia", "Tipo Fundo"]
+    ]
+
+    df_investiments = df.merge(df_quote, on="Ativo", how="left")
+    df_investiments["Saldo"] = round(
+        (df_investiments["Quantidade Total"] * df_investiments["Preco Atual"]) - df_investiments["Investimento"], 2
+    )
+    df_investiments["V/TA"] = df_investiments.groupby("Tipo Ativo")["Investimento"].transform("sum")
+    df_investiments["% Carteira"] = round((df_investiments["Investimento"] * 100) / df_investiments["V/TA"], 2)
+    df_investiments = df_investiments.drop(columns="V/TA").sort_values(["Tipo Ativo", "% Carteira"], ascending=False)
+
+    write_csv(df_investiments.loc[df_investiments["Investimento"] > 0, PORTFOLIO_COLUMNS], paths["path_portfolio_analysis"])
+    aggregates = build_aggregates(df_investiments, exportar_negociacoes(b3["vendas_mensais"]))
+    save_aggregates(aggregates, paths["path_dashboard_aggregates"])
+    return {"portfolio": df_investiments.reset_index(drop=True), "aggregates": aggregates}
+
+
+def build_positions(paths: dict, b3: dict) -> MatrizPosicoes:
+    """
+    Builds the daily position and valuation matrix of the wallet from the treated trades
+    and the quote history of the Investidor10 snapshots, extending the cached matrix with
+    the new trades and quotes, and writes the daily totals of each asset type.
+
+    Args:
+        paths (dict): Paths of the config file.
+        b3 (dict): Output of `treat_b3`.
+
+    Returns:
+        MatrizPosicoes: The quantity, cost and quote of every asset on every day.
+    """
+    from src.scrappers.snapshot_store import SnapshotStore
+
+    df_history = SnapshotStore(paths["path_investidor10_snapshots"]).history(["quote"])
+    df_quotes = pd.DataFrame(
+        {
+            "Data": df_history["date_process"],
+            "Ativo": df_history["fii_name"],
+            "Cotacao": parse_number(df_history["quote"]),
+        }
+    )
+    matriz = MotorPosicoes(paths["path_positions_cache"]).atualizar(b3["negociacoes"], df_quotes)
+    write_csv(matriz.resumo_diario(), paths["path_daily_positions"])
+    return matriz
+
+
+def build_dashboard(paths: dict, wallet: dict) -> list:
+    """
+    Renders the dashboard (`5. dashboard.ipynb`) from the aggregates of the wallet
+    stage, without a display.
+
+    Args:
+        paths (dict): Paths of the config file.
+        wallet (dict): Output of `build_portfolio`.
+
+    Returns:
+        list: Paths of the rendered charts and HTML page.
+    """
+    from src.dashboard.render import render_dashboard
+
+    return render_dashboard(wallet["aggregates"], paths["path_dashboard"])
+
+
+# The SmartFund pipeline: `1. collect_fiis.py` -> `2. analysis_fiis.ipynb` -> `3. treat_b3.ipynb` -> `4. my_wallet.ipynb`
+STAGES = [
+    Stage("collect", collect_fiis, cached=False),
+    Stage(
+        "b3",
+        treat_b3,
+        inputs=(
+            "path_b3_reports",
+            "path_categorizer_investments",
+            "path_corporate_actions",
+            "path_darfs_issued",
+        ),
+        outputs=("path_treated_b3_report", "path_treated_b3_report_monthly"),
+    ),
+    Stage("quotes", refresh_quotes, dependencies=("b3",), cached=False),
+    Stage(
+        "fiis",
+        load_fiis,
+        inputs=("path_investidor10_fiis_details", "path_investidor10_fiis_properties"),
+    ),
+    Stage("analysis", score_all_fiis, dependencies=("fiis",), inputs=("path_scoring_rules",)),
+    Stage(
+        "wallet",
+        build_portfolio,
+        dependencies=("b3", "fiis"),
+        outputs=("path_portfolio_analysis", "path_dashboard_aggregates"),
+    ),
+    Stage(
+        "positions",
+        build_positions,
+        dependencies=("b3",),
+        inputs=("path_investidor10_snapshots",),
+        outputs=("path_daily_positions",),
+    ),
+    Stage("dashboard", build_dashboard, dependencies=("wallet",), outputs=("path_dashboard",)),
+]
@@ -0,0 +1,82 @@
+import os
+import json
+import threading
+
+
+class CheckpointJournal:
+    """
+    An append-only JSONL journal that records each FII as soon as its page is scraped,
+    so an interrupted collection can resume without fetching the same pages again.
+
+    Each line holds one FII with its details row and its properties rows. Lines are
+    flushed and synced to disk on every append, and a partially written last line
+    (left behind by a crash) is ignored when the journal is loaded.
+
+    Attributes:
+        file_path (str): Path to the JSONL file of the journal.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Initializes the CheckpointJournal, creating its folder if needed.
+
+        Args:
+            file_path (str): Path to the JSONL file of the journal.
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    def load(self) -> dict:
+        """
+        Loads every FII already recorded in the journal.
+
+        Returns:
+            dict: A mapping of FII name to a tuple containing:
+                - fii_details (list): The details row of the FII.
+                - list_fii_properties (list): The properties rows of the FII.
+        """
+        completed = dict()
+        if not os.path.exists(self.file_path):
+            return completed
+
+        with open(self.file_path, "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Incomplete line written when the previous run was interrupted
+                    continue
+                completed[entry["fii_name"]] = (entry["details"], entry["properties"])
+        return completed
+
+    def append(self, fii_name: str, fii_details: list, list_fii_properties: list) -> None:
+        """
+        Records a scraped FII in the journal.
+
+        Args:
+            fii_name (str): The name (ticker) of the FII.
+            fii_details (list): The details row of the FII.
+            list_fii_properties (list): The properties rows of the FII.
+        """
+        entry = {
+            "fii_name": fii_name,
+            "details": fii_details,
+            "properties": list_fii_properties,
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as journal:
+                journal.write(line + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    def remove_stale(self) -> None:
+        """
+        Removes the journals of other dates left in the same folder.
+        """
+        folder, current_file_name = os.path.split(self.file_path)
+        for file_name in os.listdir(folder):
+            if file_name.endswith(".jsonl") and file_name != current_file_name:
+                os.remove(os.path.join(folder, file_name))
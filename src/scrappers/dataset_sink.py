@@ -0,0 +1,194 @@
+import os
+import csv
+from datetime import date, datetime
+import pandas as pd
+from src.analysis.normalization import parse_magnitude, parse_number
+
+# Parquet column types accepted in `dtypes`. "number", "magnitude" and "count" columns
+# hold Brazilian-formatted texts (such as "R$ 9,33", "12,77%", "R$ 4,22 Bilhões" or
+# "1.205.498"), parsed when written; the CSV keeps the texts as scraped.
+PARQUET_TYPES = ("string", "float", "int", "date", "number", "magnitude", "count")
+
+
+def _parse_count(series: pd.Series) -> pd.Series:
+    return parse_number(series).round().astype("Int64")
+
+
+# Parsers of the texts of each parsed Parquet type
+PARSERS = {"number": parse_number, "magnitude": parse_magnitude, "count": _parse_count}
+
+
+class DatasetSink:
+    """
+    A streaming writer that appends rows to a CSV file (and optionally to a typed Parquet
+    file) as they are produced, instead of buffering a whole dataset in memory.
+
+    Rows are written to temporary files next to the targets, which are renamed over the
+    targets only when the sink is closed successfully, so readers never see a partially
+    written dataset. Used as a context manager, the sink is committed on success and
+    discarded if an exception is raised.
+
+    Attributes:
+        csv_path (str): Path to the target CSV file.
+        parquet_path (str or None): Path to the target Parquet file, if Parquet output is enabled.
+        columns (list): The column headers.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        file_name: str,
+        columns: list,
+        parquet: bool = False,
+        dtypes: dict = None,
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Initializes the DatasetSink and opens its temporary files.
+
+        Args:
+            folder (str): Path to the folder where the files are saved.
+            file_name (str): The name of the files (without extension).
+            columns (list): The column headers.
+            parquet (bool): Whether a Parquet file is written next to the CSV. Default is False.
+            dtypes (dict): Parquet type of each column, one of `PARQUET_TYPES`.
+                Columns not listed are stored as strings.
+            batch_size (int): Number of rows buffered per Parquet row group. Default is 1000.
+
+        Raises:
+            ImportError: If Parquet output is requested and pyarrow is not installed.
+        """
+        os.makedirs(folder, exist_ok=True)
+        self.columns = list(columns)
+        self.csv_path = os.path.join(folder, f"{file_name}.csv")
+        self.parquet_path = None
+        self._batch = list()
+        self._batch_size = batch_size
+        self._parquet_writer = None
+
+        if parquet:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError as e:
+                raise ImportError("Parquet output requires pyarrow to be installed") from e
+
+            self._pa = pyarrow
+            types = {
+                "string": pyarrow.string(),
+                "float": pyarrow.float64(),
+                "int": pyarrow.int64(),
+                "date": pyarrow.date32(),
+                "number": pyarrow.float64(),
+                "magnitude": pyarrow.float64(),
+                "count": pyarrow.int64(),
+            }
+            dtypes = dtypes or dict()
+            self._parsers = [PARSERS.get(dtypes.get(column)) for column in self.columns]
+            self._schema = pyarrow.schema(
+                [(column, types[dtypes.get(column, "string")]) for column in self.columns]
+            )
+            self.parquet_path = os.path.join(folder, f"{file_name}.parquet")
+            self._parquet_writer = pyarrow.parquet.ParquetWriter(
+                f"{self.parquet_path}.tmp", self._schema
+            )
+
+        self._csv_file = open(f"{self.csv_path}.tmp", "w", newline="", encoding="utf-8")
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_writer.writerow(self.columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(self, row: list) -> None:
+        """
+        Writes a single row.
+
+        Args:
+            row (list): The values of the row, in the order of `columns`.
+        """
+        self._csv_writer.writerow(row)
+        if self._parquet_writer is not None:
+            self._batch.append(row)
+            if len(self._batch) >= self._batch_size:
+                self._flush_parquet()
+
+    def extend(self, rows: list) -> None:
+        """
+        Writes several rows.
+
+        Args:
+            rows (list): A list of rows, each in the order of `columns`.
+        """
+        for row in rows:
+            self.append(row)
+
+    def _flush_parquet(self) -> None:
+        """
+        Writes the buffered rows as a Parquet row group.
+        """
+        if not self._batch:
+            return
+
+        arrays = list()
+        for position, field in enumerate(self._schema):
+            parser = self._parsers[position]
+            if parser is not None:
+                texts = pd.Series([row[position] for row in self._batch], dtype="string")
+                arrays.append(self._pa.array(parser(texts), type=field.type, from_pandas=True))
+                continue
+            values = [_to_parquet_value(row[position], field.type, self._pa) for row in self._batch]
+            arrays.append(self._pa.array(values, type=field.type))
+        self._parquet_writer.write_table(
+            self._pa.Table.from_arrays(arrays, schema=self._schema)
+        )
+        self._batch = list()
+
+    def close(self) -> None:
+        """
+        Flushes the remaining rows and atomically replaces the target files.
+        """
+        self._csv_file.close()
+        os.replace(f"{self.csv_path}.tmp", self.csv_path)
+
+        if self._parquet_writer is not None:
+            self._flush_parquet()
+            self._parquet_writer.close()
+            os.replace(f"{self.parquet_path}.tmp", self.parquet_path)
+
+    def abort(self) -> None:
+        """
+        Discards the rows written so far, leaving the target files untouched.
+        """
+        self._csv_file.close()
+        os.remove(f"{self.csv_path}.tmp")
+
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            os.remove(f"{self.parquet_path}.tmp")
+
+
+def _to_parquet_value(value, arrow_type, pa):
+    """
+    Converts a CSV value to the Python type expected by a Parquet column.
+    Empty values become nulls.
+    """
+    if value is None or value == "":
+        return None
+    if arrow_type == pa.string():
+        return str(value)
+    if arrow_type == pa.date32():
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value))
+    if arrow_type == pa.int64():
+        return int(value)
+    return float(value)
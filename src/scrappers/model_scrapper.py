@@ -1,31 +1,225 @@
 import os
-import csv
+import time
+import random
 import requests
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from requests.exceptions import (
+    ConnectionError,
+    ChunkedEncodingError,
+    RequestException,
+    Timeout,
+)
+from urllib3.util.request import ACCEPT_ENCODING
+from src.monitoring.metrics import METRICS
+from src.scrappers.dataset_sink import DatasetSink
+from src.scrappers.response_cache import ResponseCache
+
+# HTTP statuses that signal a temporary condition and are worth retrying
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
 
 class ModelScraper:
     """
-    A class for scraping data and saving it in CSV format.
+    A class for scraping data and saving it in CSV format (optionally also in Parquet).
 
     Attributes:
         headers (dict): HTTP headers for web requests.
         now (datetime.date): The current date.
         url (str): Base URL for scraping.
         save_folder (str): Path to the folder where CSV files are saved.
+        max_retries (int): Default number of attempts made for each request.
+        backoff_factor (float): Base delay, in seconds, of the exponential backoff between retries.
+        backoff_max (float): Maximum delay, in seconds, between two retries.
+        rate_limiter (RateLimiter or None): Optional limiter acquired before every request attempt.
+        session (requests.Session): Pooled keep-alive session shared by every request.
+        cache (ResponseCache or None): On-disk cache of the fetched pages, kept in `cache_folder`.
+        offline (bool): If True, pages are replayed from the cache without touching the network.
+        parquet (bool): If True, every saved dataset is also written as a typed Parquet file.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+        backoff_max: float = 60.0,
+        use_cache: bool = True,
+        cache_ttl: float = 3600,
+        cache_max_bytes: int = 256 * 1024**2,
+        offline: bool = False,
+        parquet: bool = False,
+        save_folder: str = None,
+        cache_folder: str = None,
+    ) -> None:
         """
         Initializes the ModelScraper with default headers, the current date,
-        a base URL, and the folder path for saving datasets.
+        a base URL, the folder path for saving datasets, a pooled HTTP session
+        and the response cache.
+
+        Args:
+            pool_size (int): Maximum number of keep-alive connections kept per host. Default is 10.
+            max_retries (int): Default number of attempts made for each request. Default is 5.
+            backoff_factor (float): Base delay of the exponential backoff, in seconds. Default is 1.0.
+            backoff_max (float): Maximum delay between two retries, in seconds. Default is 60.0.
+            use_cache (bool): Whether fetched pages are cached on disk. Default is True.
+            cache_ttl (float): Seconds a cached page is served without revalidation. Default is 3600.
+            cache_max_bytes (int): Maximum size of the cache before LRU eviction. Default is 256 MiB.
+            offline (bool): Replay pages from the cache only, never touching the network. Default is False.
+            parquet (bool): Also write every saved dataset as a Parquet file (requires pyarrow). Default is False.
+            save_folder (str): Folder where the datasets are saved. Default is
+                "Datasets/Ingest/Investidor10" of the repository.
+            cache_folder (str): Folder of the response cache. Default is "Cache/HTTP" in the
+                "Datasets" folder two levels above `save_folder`.
+
+        Raises:
+            ValueError: If `offline` is requested without the cache.
         """
-        self.headers = {"User-Agent": "Mozilla/5.0"}
+        if offline and not use_cache:
+            raise ValueError("offline mode requires the response cache")
+
+        self.headers = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": ACCEPT_ENCODING}
         self.now = datetime.now().date()
         self.url = "https://investidor10.com.br/"
-        self.save_folder = os.path.join(
+        self.save_folder = save_folder or os.path.join(
             os.path.dirname(__file__), "..", "..", "Datasets", "Ingest", "Investidor10"
         )
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.rate_limiter = None
+        self.session = self.create_session(pool_size)
+        self.offline = offline
+        self.parquet = parquet
+        self.cache = None
+        if use_cache:
+            self.cache = ResponseCache(
+                cache_folder
+                or os.path.join(self.save_folder, "..", "..", "Cache", "HTTP"),
+                ttl=cache_ttl,
+                max_bytes=cache_max_bytes,
+            )
+
+    def create_session(self, pool_size: int) -> requests.Session:
+        """
+        Creates a keep-alive session whose connection pool is shared by every request,
+        so each page reuses an open TCP/TLS connection instead of opening a new one.
+
+        Args:
+            pool_size (int): Maximum number of connections kept per host.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def get_retry_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        Computes how long to wait before the next attempt.
+
+        The `Retry-After` header of the response is honored when present; otherwise an
+        exponential backoff with jitter is used, so concurrent workers do not retry in lockstep.
+
+        Args:
+            attempt (int): The zero-based number of the attempt that just failed.
+            response (requests.Response): The failed response, if the server answered.
+
+        Returns:
+            float: The delay in seconds, capped by `backoff_max`.
+        """
+        if response is not None and response.headers.get("Retry-After"):
+            retry_after = response.headers["Retry-After"]
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = retry_at.timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), self.backoff_max)
+
+        delay = min(self.backoff_max, self.backoff_factor * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def request(
+        self, url: str, retries: int = None, timeout: tuple = (5, 10)
+    ) -> requests.Response:
+        """
+        Makes a GET request through the pooled session, retrying temporary failures
+        (connection errors, timeouts, 429 and 5xx responses) with exponential backoff.
+
+        When the cache is enabled, fresh cached pages are returned without a request and
+        stale ones are revalidated with a conditional request; in offline mode, only the
+        cache is used.
+
+        Responses by status, bytes downloaded, retries, errors, cache hits and the latency
+        of each attempt are recorded in `METRICS`.
+
+        Args:
+            url (str): The URL of the webpage to fetch.
+            retries (int): The number of attempts. Default is `max_retries`.
+            timeout (tuple): The (connect, read) timeout for the request in seconds.
+
+        Returns:
+            requests.Response: The successful response.
+
+        Raises:
+            RequestException: If the response is a client error, all retry attempts fail
+                or, in offline mode, the page is not in the cache.
+            ValueError: If `retries` is lower than 1.
+        """
+        if retries is None:
+            retries = self.max_retries
+        if retries < 1:
+            raise ValueError("retries must be at least 1")
+
+        entry = self.cache.lookup(url) if self.cache is not None else None
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):
+            METRICS.increment("http_cache_hits_total", result="fresh")
+            return self.cache.to_response(url, entry)
+        if self.offline:
+            raise RequestException(f"Offline mode: {url} is not in the cache")
+        headers = self.cache.conditional_headers(entry) if entry is not None else None
+
+        for attempt in range(retries):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            response = None
+            try:
+                with METRICS.timer("http_request_seconds"):
+                    response = self.session.get(url, headers=headers, timeout=timeout)
+                METRICS.increment("http_responses_total", status=response.status_code)
+                METRICS.increment("http_bytes_downloaded_total", len(response.content))
+                if response.status_code == 304 and entry is not None:
+                    METRICS.increment("http_cache_hits_total", result="revalidated")
+                    self.cache.revalidate(entry)
+                    return self.cache.to_response(url, entry)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    if self.cache is not None:
+                        self.cache.store(url, response)
+                    return response
+                error = requests.HTTPError(
+                    f"{response.status_code} Error for url: {url}", response=response
+                )
+            except (ConnectionError, ChunkedEncodingError, Timeout) as e:
+                METRICS.increment("http_errors_total", error=type(e).__name__)
+                error = e
+
+            print(f"Error on attempt {attempt + 1} for {url}: {error}")
+            if attempt == retries - 1:
+                raise error
+            METRICS.increment("http_retries_total")
+            time.sleep(self.get_retry_delay(attempt, response))
 
     def get_page_content(self, url: str) -> bytes:
         """
@@ -37,11 +231,30 @@ class ModelScraper:
         Returns:
             bytes: The raw content of the webpage.
         """
-        response = requests.get(url, headers=self.headers, timeout=(5, 10))
-        response.raise_for_status()
-        return response.content
+        return self.request(url).content
+
+    def open_sink(self, columns: list, file_name: str, dtypes: dict = None) -> DatasetSink:
+        """
+        Opens a streaming sink that writes rows to the save folder as they are produced.
+
+        The sink writes a CSV file and, when `parquet` is enabled, a typed Parquet file;
+        both replace the previous files atomically when the sink is closed.
+
+        Args:
+            columns (list): A list of column headers.
+            file_name (str): The name of the file (without extension).
+            dtypes (dict): Parquet type of each column, one of `PARQUET_TYPES` in `dataset_sink`.
+
+        Returns:
+            DatasetSink: The open sink, usable as a context manager.
+        """
+        return DatasetSink(
+            self.save_folder, file_name, columns, parquet=self.parquet, dtypes=dtypes
+        )
 
-    def save_to_csv(self, columns: list, values: list, file_name: str) -> None:
+    def save_to_csv(
+        self, columns: list, values: list, file_name: str, dtypes: dict = None
+    ) -> None:
         """
         Saves data to a CSV file.
 
@@ -49,15 +262,10 @@ class ModelScraper:
             columns (list): A list of column headers.
             values (list): A list of rows to save in the CSV file.
             file_name (str): The name of the file (without extension).
+            dtypes (dict): Parquet type of each column, used when `parquet` is enabled.
 
         Returns:
             None
         """
-        os.makedirs(self.save_folder, exist_ok=True)
-
-        file_path = os.path.join(self.save_folder, f"{file_name}.csv")
-
-        with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(columns)
-            writer.writerows(values)
+        with self.open_sink(columns, file_name, dtypes) as sink:
+            sink.extend(values)
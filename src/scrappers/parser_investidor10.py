@@ -0,0 +1,329 @@
+import re
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Optional
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+from bs4 import BeautifulSoup
+
+# Page number of the links of the listing pagination
+PAGE_LINK = re.compile(r"[?&]page=(\d+)")
+
+# Indicator cards: card class -> fields filled by the 1st, 2nd, ... card with that class
+CARD_FIELDS = {
+    "_card cotacao": ["quote"],
+    "_card dy": ["dividend_yield", "appreciation_12months"],
+    "_card vp": ["price_book_ratio"],
+    "_card val": ["liquidity"],
+}
+
+# Cards read by quote refreshes: card class -> field filled by the first card with that class
+QUOTE_CARDS = {
+    "_card cotacao": "quote",
+    "_card dy": "dividend_yield",
+    "_card vp": "price_book_ratio",
+}
+
+# "desc" blocks: label found in the block text -> field filled with the block value
+DESC_FIELDS = {
+    "VACÂNCIA": "vacancy",
+    "NUMERO DE COTISTAS": "number_unit_holders",
+    "COTAS EMITIDAS": "issued_units",
+    "VAL. PATRIMONIAL P/ COTA": "net_asset_value_per_unit",
+    "VALOR PATRIMONIAL": "net_asset_value",
+    "ÚLTIMO RENDIMENTO": "last_dividend_payment",
+    "Razão Social": "corporate_name",
+    "CNPJ": "cnpj",
+    "PÚBLICO-ALVO": "target_audience",
+    "MANDATO": "invest_objective",
+    "SEGMENTO": "market_sector",
+    "TIPO DE FUNDO": "fund_type",
+    "PRAZO DE DURAÇÃO": "fund_term",
+    "TIPO DE GESTÃO": "management_type",
+    "TAXA DE ADMINISTRAÇÃO": "management_fee",
+}
+
+
+@dataclass
+class FiiDetails:
+    """
+    The details of a FII as shown on its Investidor10 page. Values are kept as the raw
+    strings displayed on the website; fields not found on the page are None.
+    """
+
+    fii_name: str
+    quote: Optional[str] = None
+    dividend_yield: Optional[str] = None
+    price_book_ratio: Optional[str] = None
+    liquidity: Optional[str] = None
+    appreciation_12months: Optional[str] = None
+    vacancy: Optional[str] = None
+    number_unit_holders: Optional[str] = None
+    issued_units: Optional[str] = None
+    net_asset_value_per_unit: Optional[str] = None
+    net_asset_value: Optional[str] = None
+    last_dividend_payment: Optional[str] = None
+    corporate_name: Optional[str] = None
+    cnpj: Optional[str] = None
+    target_audience: Optional[str] = None
+    invest_objective: Optional[str] = None
+    market_sector: Optional[str] = None
+    fund_type: Optional[str] = None
+    fund_term: Optional[str] = None
+    management_type: Optional[str] = None
+    management_fee: Optional[str] = None
+    date_process: Optional[date] = None
+
+    def to_row(self) -> list:
+        """
+        Returns:
+            list: The values of the record, in the column order of the details CSV.
+        """
+        return [getattr(self, field.name) for field in fields(self)]
+
+
+@dataclass
+class FiiProperty:
+    """
+    A property (real estate) owned by a FII.
+    """
+
+    fii_name: str
+    property_name: str
+    state: str
+    area: str
+    date_process: Optional[date] = None
+
+    def to_row(self) -> list:
+        """
+        Returns:
+            list: The values of the record, in the column order of the properties CSV.
+        """
+        return [getattr(self, field.name) for field in fields(self)]
+
+
+class _LxmlBackend:
+    """
+    Tree operations over an lxml document.
+    """
+
+    _xpaths = dict()
+
+    @staticmethod
+    def parse(content):
+        return lxml.html.fromstring(content)
+
+    @staticmethod
+    def divs(document):
+        return document.iter("div")
+
+    @staticmethod
+    def attribute(node, name):
+        return node.get(name) or ""
+
+    @staticmethod
+    def text(node):
+        return node.text_content().strip()
+
+    @classmethod
+    def find_all(cls, node, tag, class_name=None):
+        if class_name is None:
+            return node.findall(f".//{tag}")
+        if (tag, class_name) not in cls._xpaths:
+            cls._xpaths[(tag, class_name)] = lxml.etree.XPath(
+                f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+            )
+        return cls._xpaths[(tag, class_name)](node)
+
+
+class _SoupBackend:
+    """
+    Tree operations over a BeautifulSoup document, used when lxml is not installed.
+    """
+
+    @staticmethod
+    def parse(content):
+        return BeautifulSoup(content, "html.parser")
+
+    @staticmethod
+    def divs(document):
+        return document.find_all("div")
+
+    @staticmethod
+    def attribute(node, name):
+        value = node.get(name) or ""
+        return " ".join(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def text(node):
+        return node.text.strip()
+
+    @staticmethod
+    def find_all(node, tag, class_name=None):
+        if class_name is None:
+            return node.find_all(tag)
+        return node.find_all(tag, class_=class_name)
+
+
+BACKEND = _LxmlBackend if lxml is not None else _SoupBackend
+
+
+def _first(nodes):
+    return nodes[0] if nodes else None
+
+
+def parse_fii_page(
+    fii_name: str, content, date_process: date = None, backend=None
+) -> tuple:
+    """
+    Parses the page of a FII on the Investidor10 website in a single walk over its divs.
+
+    Each div is dispatched by its class: indicator cards fill the fields in `CARD_FIELDS`,
+    "desc" blocks are matched against the labels in `DESC_FIELDS` (computing the block text
+    only once), and the properties container yields the properties of the FII.
+
+    Args:
+        fii_name (str): The name (ticker) of the FII.
+        content (str or bytes): The HTML of the page.
+        date_process (datetime.date): The extraction date stored in the records.
+        backend: The tree backend. Default is lxml, falling back to html.parser.
+
+    Returns:
+        tuple: A tuple containing:
+            - fii_details (FiiDetails): The details of the FII.
+            - list_fii_properties (list): A list of FiiProperty.
+    """
+    backend = backend or BACKEND
+    document = backend.parse(content)
+
+    fii_details = FiiDetails(fii_name, date_process=date_process)
+    list_fii_properties = list()
+    card_counts = dict()
+
+    for div in backend.divs(document):
+        classes = backend.attribute(div, "class")
+
+        if classes in CARD_FIELDS:
+            position = card_counts.get(classes, 0)
+            card_counts[classes] = position + 1
+            if position < len(CARD_FIELDS[classes]):
+                card_body = _first(backend.find_all(div, "div", "_card-body"))
+                span = None
+                if card_body is not None:
+                    span = _first(backend.find_all(card_body, "span"))
+                if span is not None:
+                    setattr(fii_details, CARD_FIELDS[classes][position], backend.text(span))
+
+        elif "desc" in classes.split():
+            text = backend.text(div)
+            value = None
+            for label, field_name in DESC_FIELDS.items():
+                if label in text:
+                    if value is None:
+                        value = _first(backend.find_all(div, "div", "value"))
+                    if value is not None:
+                        setattr(fii_details, field_name, backend.text(value))
+
+        elif backend.attribute(div, "id") == "container-properties":
+            for card in backend.find_all(div, "div", "card-propertie"):
+                details = backend.find_all(card, "small")
+                list_fii_properties.append(
+                    FiiProperty(
+                        fii_name,
+                        backend.text(_first(backend.find_all(card, "h3"))),
+                        backend.text(details[0]),
+                        backend.text(details[1]),
+                        date_process,
+                    )
+                )
+
+    return fii_details, list_fii_properties
+
+
+def _card_value(backend, card):
+    card_body = _first(backend.find_all(card, "div", "_card-body"))
+    span = _first(backend.find_all(card_body, "span")) if card_body is not None else None
+    return backend.text(span) if span is not None else None
+
+
+def parse_fii_quotes(
+    fii_name: str, content, date_process: date = None, backend=None, chunk_size: int = 8192
+) -> FiiDetails:
+    """
+    Parses only the market fields of a FII page (`QUOTE_CARDS`), for quote refreshes.
+
+    With lxml, the page is fed to an incremental parser in chunks of `chunk_size` and the
+    parse stops as soon as the quote cards were read. They are at the top of the page, so
+    most of the document is never parsed. The html.parser backend parses the whole page
+    but only looks at the quote cards.
+
+    Args:
+        fii_name (str): The name (ticker) of the FII.
+        content (str or bytes): The HTML of the page.
+        date_process (datetime.date): The extraction date stored in the record.
+        backend: The tree backend. Default is lxml, falling back to html.parser.
+        chunk_size (int): Characters fed to the incremental parser at a time. Default is 8192.
+
+    Returns:
+        FiiDetails: The details of the FII with only the fields of `QUOTE_CARDS` filled.
+    """
+    backend = backend or BACKEND
+    fii_details = FiiDetails(fii_name, date_process=date_process)
+    pending = dict(QUOTE_CARDS)
+
+    if backend is _LxmlBackend:
+        parser = lxml.etree.HTMLPullParser(events=("end",), tag="div")
+        parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+        for start in range(0, len(content), chunk_size):
+            parser.feed(content[start : start + chunk_size])
+            for _, div in parser.read_events():
+                field_name = pending.pop(backend.attribute(div, "class"), None)
+                if field_name is not None:
+                    setattr(fii_details, field_name, _card_value(backend, div))
+            if not pending:
+                break
+        return fii_details
+
+    for div in backend.divs(backend.parse(content)):
+        field_name = pending.pop(backend.attribute(div, "class"), None)
+        if field_name is not None:
+            setattr(fii_details, field_name, _card_value(backend, div))
+            if not pending:
+                break
+    return fii_details
+
+
+def parse_listing_page(content, backend=None) -> tuple:
+    """
+    Parses a page of the FII listing of the Investidor10 website.
+
+    Args:
+        content (str or bytes): The HTML of the page.
+        backend: The tree backend. Default is lxml, falling back to html.parser.
+
+    Returns:
+        tuple: A tuple containing:
+            - fii_names (list): The names (tickers) of the FIIs on the page, in order.
+            - last_page (int or None): The highest page number linked by the pagination,
+              or None when the page has no pagination links.
+    """
+    backend = backend or BACKEND
+    document = backend.parse(content)
+
+    fii_names = list()
+    for card in backend.find_all(document, "div", "actions-card"):
+        ticker = _first(backend.find_all(card, "h2", "ticker-name"))
+        if ticker is not None:
+            fii_names.append(backend.text(ticker))
+
+    pages = [
+        int(match.group(1))
+        for link in backend.find_all(document, "a")
+        for match in [PAGE_LINK.search(backend.attribute(link, "href"))]
+        if match is not None
+    ]
+    return fii_names, max(pages, default=None)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token-bucket rate limiter used to keep concurrent scrapers polite.
+
+    Tokens are refilled continuously at `rate` tokens per second, up to `capacity`.
+    Each request consumes one token; when the bucket is empty, callers block until
+    a token becomes available.
+
+    Attributes:
+        rate (float): Number of tokens added to the bucket per second.
+        capacity (float): Maximum number of tokens the bucket can hold (burst size).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        """
+        Initializes the RateLimiter with a full bucket.
+
+        Args:
+            rate (float): Number of requests allowed per second. Must be greater than zero.
+            capacity (float): Maximum burst of requests allowed at once. Default is 1.
+
+        Raises:
+            ValueError: If `rate` or `capacity` is not greater than zero.
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be greater than zero")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """
+        Adds the tokens accumulated since the last update. Must be called with the lock held.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and consumes it.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with each cached body
+CACHED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+class ResponseCache:
+    """
+    An on-disk HTTP response cache with conditional revalidation and size-bounded LRU eviction.
+
+    Each URL is stored as two files named after the SHA-256 of the URL: the raw body and a
+    JSON file with its validators (ETag / Last-Modified), encoding and storage time. Entries
+    younger than `ttl` are served without touching the network; older ones are revalidated
+    with If-None-Match / If-Modified-Since. The modification time of the body file records
+    the last access, and the least recently used entries are evicted once the cache grows
+    beyond `max_bytes`.
+
+    Attributes:
+        folder (str): Path to the folder where the cached responses are stored.
+        ttl (float): Number of seconds an entry is served without revalidation.
+        max_bytes (int): Maximum total size of the cached bodies.
+    """
+
+    def __init__(self, folder: str, ttl: float = 3600, max_bytes: int = 256 * 1024**2) -> None:
+        """
+        Initializes the ResponseCache and indexes the entries already on disk.
+
+        Args:
+            folder (str): Path to the folder where the cached responses are stored.
+            ttl (float): Number of seconds an entry is served without revalidation. Default is 3600.
+            max_bytes (int): Maximum total size of the cached bodies. Default is 256 MiB.
+        """
+        self.folder = folder
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = dict()
+        os.makedirs(folder, exist_ok=True)
+
+        for file_name in os.listdir(folder):
+            if file_name.endswith(".body"):
+                key = file_name[: -len(".body")]
+                self._sizes[key] = os.path.getsize(os.path.join(folder, file_name))
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.folder, f"{key}.{extension}")
+
+    def _write_atomic(self, file_path: str, data: bytes) -> None:
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, file_path)
+
+    def lookup(self, url: str) -> dict:
+        """
+        Finds the cached entry of a URL.
+
+        Args:
+            url (str): The URL of the webpage.
+
+        Returns:
+            dict or None: The metadata of the entry, or None when the URL is not cached.
+        """
+        key = self._key(url)
+        try:
+            with open(self._path(key, "json"), "r", encoding="utf-8") as meta_file:
+                entry = json.load(meta_file)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if not os.path.exists(self._path(key, "body")):
+            return None
+        entry["key"] = key
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        Checks whether an entry can be served without revalidation.
+
+        Args:
+            entry (dict): The metadata returned by `lookup`.
+
+        Returns:
+            bool: True if the entry is younger than the TTL.
+        """
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def conditional_headers(self, entry: dict) -> dict:
+        """
+        Builds the conditional request headers of an entry.
+
+        Args:
+            entry (dict): The metadata returned by `lookup`.
+
+        Returns:
+            dict: The If-None-Match / If-Modified-Since headers available for the entry.
+        """
+        headers = dict()
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def to_response(self, url: str, entry: dict) -> requests.Response:
+        """
+        Rebuilds a response from a cached entry and marks it as recently used.
+
+        Args:
+            url (str): The URL of the webpage.
+            entry (dict): The metadata returned by `lookup`.
+
+        Returns:
+            requests.Response: A 200 response with the cached body.
+        """
+        body_path = self._path(entry["key"], "body")
+        with open(body_path, "rb") as body_file:
+            content = body_file.read()
+        os.utime(body_path)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = content
+        return response
+
+    def revalidate(self, entry: dict) -> None:
+        """
+        Restarts the TTL of an entry after the server answered 304 Not Modified.
+
+        Args:
+            entry (dict): The metadata returned by `lookup`.
+        """
+        entry = {key: value for key, value in entry.items() if key != "key"}
+        entry["stored_at"] = time.time()
+        self._write_atomic(
+            self._path(self._key(entry["url"]), "json"),
+            json.dumps(entry).encode("utf-8"),
+        )
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """
+        Stores a successful response and evicts old entries if the cache is too large.
+
+        Args:
+            url (str): The URL of the webpage.
+            response (requests.Response): The response to cache.
+        """
+        key = self._key(url)
+        entry = {
+            "url": url,
+            "stored_at": time.time(),
+            "encoding": response.encoding,
+            "headers": {
+                header: response.headers[header]
+                for header in CACHED_HEADERS
+                if header in response.headers
+            },
+        }
+        self._write_atomic(self._path(key, "body"), response.content)
+        self._write_atomic(self._path(key, "json"), json.dumps(entry).encode("utf-8"))
+
+        with self._lock:
+            self._sizes[key] = len(response.content)
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits in `max_bytes`.
+        Must be called with the lock held.
+        """
+        total_bytes = sum(self._sizes.values())
+        if total_bytes <= self.max_bytes:
+            return
+
+        def last_access(key):
+            try:
+                return os.path.getmtime(self._path(key, "body"))
+            except OSError:
+                return 0
+
+        for key in sorted(self._sizes, key=last_access):
+            if total_bytes <= self.max_bytes:
+                break
+            for extension in ("body", "json"):
+                try:
+                    os.remove(self._path(key, extension))
+                except OSError:
+                    pass
+            total_bytes -= self._sizes.pop(key)
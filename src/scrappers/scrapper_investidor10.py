@@ -1,9 +1,122 @@
-from bs4 import BeautifulSoup
+import os
+import csv
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
-from requests.exceptions import ChunkedEncodingError, RequestException
+from src.monitoring.metrics import METRICS
+from src.scrappers.checkpoint_journal import CheckpointJournal
 from src.scrappers.model_scrapper import ModelScraper
-import requests
+from src.scrappers.parser_investidor10 import (
+    QUOTE_CARDS,
+    FiiDetails,
+    parse_fii_page,
+    parse_fii_quotes,
+    parse_listing_page,
+)
+from src.scrappers.rate_limiter import RateLimiter
+from src.scrappers.snapshot_store import SnapshotStore
+from src.scrappers.universe import UNIVERSE_COLUMNS, diff_universe, load_universe
+
+
+DETAILS_COLUMNS = [
+    "fii_name",
+    "quote",
+    "dividend_yield",
+    "price_book_ratio",
+    "liquidity",
+    "appreciation_12months",
+    "vacancy",
+    "number_unit_holders",
+    "issued_units",
+    "net_asset_value_per_unit",
+    "net_asset_value",
+    "last_dividend_payment",
+    "corporate_name",
+    "cnpj",
+    "target_audience",
+    "invest_objective",
+    "market_sector",
+    "fund_type",
+    "fund_term",
+    "management_type",
+    "management_fee",
+    "date_process",
+]
+PROPERTIES_COLUMNS = ["fii_name", "property_name", "state", "area", "date_process"]
+DTYPES = {
+    "quote": "number",
+    "dividend_yield": "number",
+    "price_book_ratio": "number",
+    "liquidity": "magnitude",
+    "appreciation_12months": "number",
+    "vacancy": "number",
+    "number_unit_holders": "count",
+    "issued_units": "count",
+    "net_asset_value_per_unit": "number",
+    "net_asset_value": "magnitude",
+    "last_dividend_payment": "number",
+    "area": "number",
+    "date_process": "date",
+}
+
+
+def parse_fii_rows(fii_name: str, content: str, date_process) -> tuple:
+    """
+    Parses the page of a FII into CSV rows. Defined at module level so it can run in
+    a process pool.
+
+    Args:
+        fii_name (str): The name (ticker) of the FII.
+        content (str or None): The HTML of the page, or None if it could not be fetched.
+        date_process (datetime.date): The extraction date stored in the rows.
+
+    Returns:
+        tuple: A tuple containing:
+            - fii_details (list): The details row of the FII (only the name and date when
+              `content` is None).
+            - list_fii_properties (list): The properties rows of the FII.
+    """
+    if content is None:
+        return FiiDetails(fii_name, date_process=date_process).to_row(), list()
+
+    fii_details, list_fii_properties = parse_fii_page(fii_name, content, date_process)
+    return fii_details.to_row(), [
+        fii_property.to_row() for fii_property in list_fii_properties
+    ]
+
+
+def parse_fii_rows_timed(fii_name: str, content: str, date_process) -> tuple:
+    """
+    Parses the page of a FII into CSV rows, measuring the parse time. The time is returned
+    instead of recorded so it is not lost when the parse runs in a process pool.
+
+    Args:
+        fii_name (str): The name (ticker) of the FII.
+        content (str or None): The HTML of the page, or None if it could not be fetched.
+        date_process (datetime.date): The extraction date stored in the rows.
+
+    Returns:
+        tuple: The rows returned by `parse_fii_rows` and the parse time in seconds.
+    """
+    start = time.perf_counter()
+    rows = parse_fii_rows(fii_name, content, date_process)
+    return rows, time.perf_counter() - start
+
+
+def record_fii_latency(stage: str, fii_name: str, seconds: float) -> None:
+    """
+    Records the fetch or parse time of a FII page in `METRICS`: in the histogram
+    "scraper_<stage>_seconds" and, per ticker, in the gauge "scraper_fii_<stage>_seconds"
+    (so a single slow page can be found).
+
+    Args:
+        stage (str): "fetch" or "parse".
+        fii_name (str): The name (ticker) of the FII.
+        seconds (float): The measured time.
+    """
+    METRICS.observe(f"scraper_{stage}_seconds", seconds)
+    METRICS.set(f"scraper_fii_{stage}_seconds", seconds, ticker=fii_name)
 
 
 class ScraperInvestidor10(ModelScraper):
@@ -15,25 +128,64 @@ class ScraperInvestidor10(ModelScraper):
     Attributes:
         url (str): The base URL for FIIs data on the Investidor10 website.
         list_fiis (list): A list to store data related to FIIs.
+        max_workers (int): Maximum number of detail pages fetched concurrently.
+        rate_limiter (RateLimiter): Token bucket shared by every request made to the website.
+        journal (CheckpointJournal or None): Journal of the FIIs already scraped on the current date.
+        snapshot_path (str or None): Path to the snapshot store. Default is
+            `investidor10_snapshots.sqlite` in the save folder.
+        snapshot_store (SnapshotStore or None): Store keeping the details and properties of every
+            daily run, opened by `get_snapshot_store` the first time a snapshot is saved.
+        universe_diff (UniverseDiff or None): New, delisted and unchanged FIIs of the last listing crawl.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self, max_workers: int = 4, requests_per_second: float = 2.0, **kwargs
+    ) -> None:
         """
         Initializes the ScraperInvestidor10 with the specific URL for FIIs data
         and an empty list for storing FIIs information.
+
+        Args:
+            max_workers (int): Maximum number of detail pages fetched concurrently. Default is 4.
+            requests_per_second (float): Maximum request rate sent to the website. Default is 2.0.
+            **kwargs: Session, retry and cache options forwarded to `ModelScraper`.
         """
-        super().__init__()
+        kwargs.setdefault("pool_size", max(10, max_workers))
+        super().__init__(**kwargs)
         self.url = f"{self.url}fiis/"
         self.list_fiis = list()
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.journal = None
+        self.snapshot_path = None
+        self.snapshot_store = None
+        self.universe_diff = None
+
+    def get_snapshot_store(self) -> SnapshotStore:
+        """
+        Returns the daily snapshot store, opening it on first use so that creating a scraper
+        does not create the SQLite file in the save folder.
 
-    def get_page_content(self, url: str, retries: int = 5, timeout: int = 10) -> str:
+        Returns:
+            SnapshotStore: The store kept in `snapshot_path`.
+        """
+        if self.snapshot_store is None:
+            self.snapshot_store = SnapshotStore(
+                self.snapshot_path
+                or os.path.join(self.save_folder, "investidor10_snapshots.sqlite")
+            )
+        return self.snapshot_store
+
+    def get_page_content(
+        self, url: str, retries: int = None, timeout: tuple = (5, 10)
+    ) -> str:
         """
         Makes a request to a webpage and returns its content, with support for retries in case of failures.
 
         Args:
             url (str): The URL of the webpage to fetch.
-            retries (int): The number of retry attempts in case of failure. Default is 5.
-            timeout (int): The timeout duration for the request in seconds. Default is 10.
+            retries (int): The number of attempts. Default is `max_retries`.
+            timeout (tuple): The (connect, read) timeout for the request in seconds.
 
         Returns:
             str: The content of the webpage as a string.
@@ -41,50 +193,86 @@ class ScraperInvestidor10(ModelScraper):
         Raises:
             RequestException: If all retry attempts fail.
         """
-        for attempt in range(retries):
-            try:
-                response = requests.get(url, headers=self.headers, timeout=timeout)
-                response.raise_for_status()
-                return response.text
-            except (ChunkedEncodingError, RequestException) as e:
-                print(f"Error on attempt {attempt + 1} for {url}: {e}")
-                if attempt < retries - 1:
-                    import time
-
-                    time.sleep(2)
-                else:
-                    raise e
+        return self.request(url, retries=retries, timeout=timeout).text
+
+    def extract_listing_page(self, page: int) -> tuple:
+        """
+        Extracts the FII names of a single page of the Investidor10 listing.
+
+        Args:
+            page (int): One-based number of the listing page.
+
+        Returns:
+            tuple: The FII names on the page and the last page linked by its pagination
+            (None without pagination), as returned by `parse_listing_page`.
+        """
+        return parse_listing_page(self.get_page_content(f"{self.url}?page={page}"))
 
     def extract_main_values(self) -> list:
         """
         Extracts FII names and types from multiple pages on the Investidor10 website.
 
+        The first page gives the page count through its pagination links, and the other
+        pages are fetched concurrently by up to `max_workers` threads. When the page count
+        is unknown (or outdated), the next pages are probed `max_workers` at a time until
+        an empty page is found. Tickers repeated across pages (shifted while crawling) are
+        kept once.
+
+        The names are compared with the previous universe (the names CSV in the save
+        folder), and the new, delisted and unchanged FIIs are kept in `universe_diff`.
+
         Returns:
             list: A list of extracted FIIs data, each entry containing:
                 - FII name (str)
                 - FII type (str, default "Fii")
                 - Extraction date (datetime.date)
         """
-        page = 1
-
-        while True:
-            url = f"{self.url}?page={page}"
-            content = self.get_page_content(url)
-            soup = BeautifulSoup(content, "html.parser")
-
-            # Extract FII values
-            fiis = soup.find_all("div", class_="actions-card")
-            if not fiis:
-                break
-
-            for fii in tqdm(fiis, desc=f"Extracting FIIs Page {page}"):
-                fii_name = fii.find("h2", class_="ticker-name").text.strip()
-                fii_type = "Fii"
-                self.list_fiis.append([fii_name, fii_type, self.now])
-            page += 1
-            time.sleep(2)
+        fii_names, last_page = self.extract_listing_page(1)
+        pages = {1: fii_names}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, tqdm(
+            desc="Extracting FIIs Pages", initial=1
+        ) as progress:
+            page = 2
+            while pages[page - 1]:
+                batch = list(
+                    range(page, max((last_page or 0) + 1, page + self.max_workers - 1) + 1)
+                )
+                for number, (fii_names, linked_page) in zip(
+                    batch, executor.map(self.extract_listing_page, batch)
+                ):
+                    pages[number] = fii_names
+                    last_page = max(last_page or 0, linked_page or 0) or None
+                progress.update(len(batch))
+                page = next((number for number in batch if not pages[number]), batch[-1]) + 1
+
+        listed = list()
+        for number in range(1, page):
+            listed.extend(pages[number])
+        listed = list(dict.fromkeys(listed))
+
+        self.universe_diff = diff_universe(
+            load_universe(os.path.join(self.save_folder, "investidor10_fiis_names.csv")),
+            listed,
+        )
+        for status, fii_names in vars(self.universe_diff).items():
+            METRICS.set("scraper_universe_fiis", len(fii_names), status=status)
+        print(f"FIIs universe: {self.universe_diff.summary()}")
+
+        self.list_fiis.extend([fii_name, "Fii", self.now] for fii_name in listed)
         return self.list_fiis
 
+    def save_universe_diff(self) -> None:
+        """
+        Saves the new, delisted and unchanged FIIs of the last listing crawl to a CSV file.
+        """
+        self.save_to_csv(
+            UNIVERSE_COLUMNS,
+            self.universe_diff.to_rows(self.now),
+            "investidor10_fiis_universe_diff",
+            DTYPES,
+        )
+
     def save_fiis_main(self, list_fiis: list) -> None:
         """
         Saves the list of FIIs data to a CSV file.
@@ -96,7 +284,7 @@ class ScraperInvestidor10(ModelScraper):
                 - Extraction date (datetime.date)
         """
         columns = ["fii_name", "fii_type", "date_process"]
-        self.save_to_csv(columns, list_fiis, "investidor10_fiis_names")
+        self.save_to_csv(columns, list_fiis, "investidor10_fiis_names", DTYPES)
 
     def extract_fiis_details_properties(self, list_fiis) -> list:
         """
@@ -113,6 +301,11 @@ class ScraperInvestidor10(ModelScraper):
         - Property details, including property name, state, and area, for each FII listed on the
         Investidor10 platform.
 
+        Pages are fetched concurrently by up to `max_workers` threads, throttled by the shared
+        rate limiter, and the results are kept in the same order as `list_fiis`. When a journal
+        is set, FIIs already recorded in it are taken from the journal instead of being fetched.
+        New listings of `universe_diff` are fetched first.
+
         The extracted data is then compiled into two separate lists:
         1. `list_fiis_details`: Contains detailed information about each FII.
         2. `list_fiis_properties`: Contains details of the properties associated with each FII.
@@ -155,176 +348,243 @@ class ScraperInvestidor10(ModelScraper):
         list_fiis_details = list()
         list_fiis_properties = list()
 
-        for fii in tqdm(list_fiis, desc="Extracting FIIs Details"):
-            fii_name = fii[0]
-            quote = None
-            dividend_yield = None
-            price_book_ratio = None
-            liquidity = None
-            appreciation_12months = None
-            vacancy = None
-            number_unit_holders = None
-            issued_units = None
-            net_asset_value_per_unit = None
-            net_asset_value = None
-            last_dividend_payment = None
-            corporate_name = None
-            cnpj = None
-            target_audience = None
-            invest_objective = None
-            market_sector = None
-            fund_type = None
-            fund_term = None
-            management_type = None
-            management_fee = None
-
-            try:
-                content = self.get_page_content(f"{self.url + fii_name}")
-                soup = BeautifulSoup(content, "html.parser")
-            except Exception as e:
-                print(f"\n\tError on {fii_name}: {str(e)}")
-            else:
-                quote = (
-                    soup.find("div", class_="_card cotacao")
-                    .find("div", class_="_card-body")
-                    .find("span")
+        fii_names = [fii[0] for fii in list_fiis]
+        completed = self.journal.load() if self.journal is not None else dict()
+        pending = [fii_name for fii_name in fii_names if fii_name not in completed]
+        if self.universe_diff is not None:
+            new_listings = set(self.universe_diff.new)
+            pending.sort(key=lambda fii_name: fii_name not in new_listings)
+        if completed:
+            print(f"Resuming: {len(fii_names) - len(pending)} FIIs already in the journal")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.extract_fii_details_properties, pending)
+            completed.update(
+                zip(
+                    pending,
+                    tqdm(results, total=len(pending), desc="Extracting FIIs Details"),
                 )
-                if quote:
-                    quote = quote.text.strip()
+            )
 
-                find_dividend_yield = (
-                    soup.find_all("div", class_="_card dy")[0]
-                    .find("div", class_="_card-body")
-                    .find("span")
-                )
-                if find_dividend_yield:
-                    dividend_yield = find_dividend_yield.text.strip()
+        for fii_name in fii_names:
+            fii_details, list_fii_properties = completed[fii_name]
+            list_fiis_details.append(fii_details)
+            list_fiis_properties.extend(list_fii_properties)
+        return list_fiis_details, list_fiis_properties
 
-                find_price_book_ratio = (
-                    soup.find("div", class_="_card vp")
-                    .find("div", class_="_card-body")
-                    .find("span")
-                )
-                if find_price_book_ratio:
-                    price_book_ratio = find_price_book_ratio.text.strip()
+    def extract_fii_details_properties(self, fii_name: str) -> tuple:
+        """
+        Extracts the details and the properties of a single FII from its page on the Investidor10 website.
 
-                find_liquidity = (
-                    soup.find("div", class_="_card val")
-                    .find("div", class_="_card-body")
-                    .find("span")
-                )
-                if find_liquidity:
-                    liquidity = find_liquidity.text.strip()
+        Args:
+            fii_name (str): The name (ticker) of the FII.
 
-                find_appreciation_12months = (
-                    soup.find_all("div", class_="_card dy")[1]
-                    .find("div", class_="_card-body")
-                    .find("span")
+        Returns:
+            tuple: A tuple containing:
+                - fii_details (list): The detailed attributes of the FII, in the same order
+                  described in `extract_fiis_details_properties`.
+                - list_fii_properties (list): The properties associated with the FII.
+        """
+        content = self.fetch_fii_page(fii_name)
+        (fii_details, list_fii_properties), seconds = parse_fii_rows_timed(
+            fii_name, content, self.now
+        )
+        record_fii_latency("parse", fii_name, seconds)
+
+        if content is not None and self.journal is not None:
+            self.journal.append(fii_name, fii_details, list_fii_properties)
+        return fii_details, list_fii_properties
+
+    def fetch_fii_page(self, fii_name: str) -> str:
+        """
+        Fetches the page of a single FII on the Investidor10 website, recording the
+        fetch time and failures in `METRICS`.
+
+        Args:
+            fii_name (str): The name (ticker) of the FII.
+
+        Returns:
+            str or None: The HTML of the page, or None if it could not be fetched.
+        """
+        start = time.perf_counter()
+        try:
+            return self.get_page_content(f"{self.url + fii_name}")
+        except Exception as e:
+            METRICS.increment("scraper_fetch_errors_total")
+            print(f"\n\tError on {fii_name}: {str(e)}")
+            return None
+        finally:
+            record_fii_latency("fetch", fii_name, time.perf_counter() - start)
+
+    def extract_fiis_details_properties_pipelined(
+        self, list_fiis: list, queue_size: int = 32, parse_workers: int = None
+    ) -> None:
+        """
+        Extracts the details and properties of each FII in a fetch/parse/write pipeline and
+        streams them to the details and properties CSV files.
+
+        - Fetch stage: up to `max_workers` threads download the pages.
+        - Parse stage: each downloaded page is handed to a process pool, so parsing uses
+        every core while downloads continue.
+        - Write stage: rows are written to disk in the order of `list_fiis` as soon as they
+        are ready, added to the daily snapshot and recorded in the journal when one is set.
+
+        At most `queue_size` FIIs are in flight at any time, so memory stays bounded by the
+        queue size instead of growing with the number of FIIs. The files have the same
+        content as the ones written by `save_fiis_details` and `save_fiis_properties`, and
+        replace them atomically only once every FII was written.
+
+        Args:
+            list_fiis (list): A list of FIIs data, where each entry contains the name of an individual FII.
+            queue_size (int): Maximum number of FIIs fetched or parsed at once. Default is 32.
+            parse_workers (int): Number of parser processes. Default is the number of CPUs.
+        """
+        fii_names = [fii[0] for fii in list_fiis]
+        completed = self.journal.load() if self.journal is not None else dict()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as fetch_pool, ProcessPoolExecutor(
+            max_workers=parse_workers
+        ) as parse_pool, self.open_sink(
+            DETAILS_COLUMNS, "investidor10_fiis_details", DTYPES
+        ) as details_sink, self.open_sink(
+            PROPERTIES_COLUMNS, "investidor10_fiis_properties", DTYPES
+        ) as properties_sink, self.get_snapshot_store().snapshot(
+            self.now
+        ) as snapshot:
+
+            def fetch_and_parse(fii_name):
+                content = self.fetch_fii_page(fii_name)
+                return content is not None, parse_pool.submit(
+                    parse_fii_rows_timed, fii_name, content, self.now
                 )
-                if find_appreciation_12months:
-                    appreciation_12months = find_appreciation_12months.text.strip()
-
-                for div_desc in soup.find_all("div", class_="desc"):
-                    if "VACÂNCIA" in div_desc.text:
-                        vacancy = div_desc.find("div", class_="value").text.strip()
-                    if "NUMERO DE COTISTAS" in div_desc.text:
-                        number_unit_holders = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "COTAS EMITIDAS" in div_desc.text:
-                        issued_units = div_desc.find("div", class_="value").text.strip()
-                    if "VAL. PATRIMONIAL P/ COTA" in div_desc.text:
-                        net_asset_value_per_unit = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "VALOR PATRIMONIAL" in div_desc.text:
-                        net_asset_value = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "ÚLTIMO RENDIMENTO" in div_desc.text:
-                        last_dividend_payment = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "Razão Social" in div_desc.text:
-                        corporate_name = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "CNPJ" in div_desc.text:
-                        cnpj = div_desc.find("div", class_="value").text.strip()
-                    if "PÚBLICO-ALVO" in div_desc.text:
-                        target_audience = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "MANDATO" in div_desc.text:
-                        invest_objective = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "SEGMENTO" in div_desc.text:
-                        market_sector = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "TIPO DE FUNDO" in div_desc.text:
-                        fund_type = div_desc.find("div", class_="value").text.strip()
-                    if "PRAZO DE DURAÇÃO" in div_desc.text:
-                        fund_term = div_desc.find("div", class_="value").text.strip()
-                    if "TIPO DE GESTÃO" in div_desc.text:
-                        management_type = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-                    if "TAXA DE ADMINISTRAÇÃO" in div_desc.text:
-                        management_fee = div_desc.find(
-                            "div", class_="value"
-                        ).text.strip()
-
-            list_fiis_details.append(
-                [
-                    fii_name,
-                    quote,
-                    dividend_yield,
-                    price_book_ratio,
-                    liquidity,
-                    appreciation_12months,
-                    vacancy,
-                    number_unit_holders,
-                    issued_units,
-                    net_asset_value_per_unit,
-                    net_asset_value,
-                    last_dividend_payment,
-                    corporate_name,
-                    cnpj,
-                    target_audience,
-                    invest_objective,
-                    market_sector,
-                    fund_type,
-                    fund_term,
-                    management_type,
-                    management_fee,
-                    self.now,
-                ]
-            )
 
-            # Extract property information
-            properties = soup.find("div", id="container-properties")
+            def write_next():
+                fii_name, future = queue.popleft()
+                if future is None:
+                    fii_details, list_fii_properties = completed[fii_name]
+                else:
+                    fetched, parsed = future.result()
+                    (fii_details, list_fii_properties), seconds = parsed.result()
+                    record_fii_latency("parse", fii_name, seconds)
+                    if fetched and self.journal is not None:
+                        self.journal.append(fii_name, fii_details, list_fii_properties)
+                details_sink.append(fii_details)
+                properties_sink.extend(list_fii_properties)
+                snapshot.add(fii_details, list_fii_properties)
+                progress.update()
+
+            queue = deque()
+            with tqdm(total=len(fii_names), desc="Extracting FIIs Details") as progress:
+                for fii_name in fii_names:
+                    if len(queue) >= queue_size:
+                        write_next()
+                    if fii_name in completed:
+                        queue.append((fii_name, None))
+                    else:
+                        queue.append(
+                            (fii_name, fetch_pool.submit(fetch_and_parse, fii_name))
+                        )
+                while queue:
+                    write_next()
+
+    def extract_fii_quotes(self, fii_name: str) -> list:
+        """
+        Extracts only the market fields (`QUOTE_CARDS`) of a single FII from its page.
 
-            if properties is not None:
-                properties = properties.find_all("div", class_="card-propertie")
+        Args:
+            fii_name (str): The name (ticker) of the FII.
 
-                # Iterate over the properties and extract the information
-                for property in properties:
-                    # Extract property details
-                    property_name = property.find("h3").text.strip()
+        Returns:
+            list or None: The details row of the FII with only the name, the market fields
+            and the date filled, or None if the page could not be fetched.
+        """
+        content = self.fetch_fii_page(fii_name)
+        if content is None:
+            return None
 
-                    details = property.find_all("small")
-                    state = details[0].text.strip()
-                    area = details[1].text.strip()
+        start = time.perf_counter()
+        fii_details = parse_fii_quotes(fii_name, content, self.now)
+        record_fii_latency("parse", fii_name, time.perf_counter() - start)
+        return fii_details.to_row()
 
-                    # Append the extracted values to the "values" list
-                    list_fiis_properties.append(
-                        [fii_name, property_name, state, area, self.now]
-                    )
+    def update_fiis_quotes(self, list_fiis_quotes: list) -> None:
+        """
+        Updates the market fields and the date of the given FIIs in the details CSV,
+        keeping every other row and field as it is. FIIs not in the file are appended.
+        The file is rewritten through `open_sink`, so it is replaced atomically.
 
-            time.sleep(2)
-        return list_fiis_details, list_fiis_properties
+        The market fields are also saved in today's snapshot of the snapshot store, where
+        the positions stage reads the quotes history from.
+
+        Args:
+            list_fiis_quotes (list): Details rows returned by `extract_fii_quotes`.
+        """
+        if not list_fiis_quotes:
+            return
+
+        updated_columns = [
+            DETAILS_COLUMNS.index(column)
+            for column in [*QUOTE_CARDS.values(), "date_process"]
+        ]
+        quotes = {row[0]: row for row in list_fiis_quotes}
+
+        rows = list()
+        csv_path = os.path.join(self.save_folder, "investidor10_fiis_details.csv")
+        if os.path.exists(csv_path):
+            with open(csv_path, "r", newline="", encoding="utf-8") as details_file:
+                reader = csv.reader(details_file)
+                next(reader, None)
+                rows = list(reader)
+
+        for row in rows:
+            quote = quotes.pop(row[0], None)
+            if quote is not None:
+                for index in updated_columns:
+                    row[index] = quote[index]
+        rows.extend(quotes.values())
+
+        self.save_to_csv(DETAILS_COLUMNS, rows, "investidor10_fiis_details", DTYPES)
+        self.get_snapshot_store().update_details(
+            list_fiis_quotes, list(QUOTE_CARDS.values()), self.now
+        )
+
+    def refresh_quotes(self, fii_names: list) -> list:
+        """
+        Refreshes the quote, dividend yield and P/VP of the given FIIs (e.g. the ones in the
+        portfolio) in the details CSV, without the full crawl done by `run`.
+
+        Only the pages of `fii_names` are fetched, concurrently by up to `max_workers`
+        threads, and only their market cards are parsed. FIIs missing from the last listing
+        (delisted) are skipped, and FIIs whose page could not be fetched keep their
+        previous values.
+
+        Args:
+            fii_names (list): Names (tickers) of the FIIs to refresh.
+
+        Returns:
+            list: The details rows of the refreshed FIIs.
+        """
+        universe = set(
+            load_universe(os.path.join(self.save_folder, "investidor10_fiis_names.csv"))
+        )
+        if universe:
+            delisted = [fii_name for fii_name in fii_names if fii_name not in universe]
+            if delisted:
+                print(f"Skipping FIIs no longer listed: {delisted}")
+            fii_names = [fii_name for fii_name in fii_names if fii_name in universe]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.extract_fii_quotes, fii_names)
+            list_fiis_quotes = [
+                row
+                for row in tqdm(results, total=len(fii_names), desc="Refreshing FIIs Quotes")
+                if row is not None
+            ]
+
+        self.update_fiis_quotes(list_fiis_quotes)
+        return list_fiis_quotes
 
     def save_fiis_details(self, list_fiis_details: list) -> None:
         """
@@ -333,31 +593,9 @@ class ScraperInvestidor10(ModelScraper):
         Args:
             list_fiis_details (list): A list of detailed FII data.
         """
-        columns = [
-            "fii_name",
-            "quote",
-            "dividend_yield",
-            "price_book_ratio",
-            "liquidity",
-            "appreciation_12months",
-            "vacancy",
-            "number_unit_holders",
-            "issued_units",
-            "net_asset_value_per_unit",
-            "net_asset_value",
-            "last_dividend_payment",
-            "corporate_name",
-            "cnpj",
-            "target_audience",
-            "invest_objective",
-            "market_sector",
-            "fund_type",
-            "fund_term",
-            "management_type",
-            "management_fee",
-            "date_process",
-        ]
-        self.save_to_csv(columns, list_fiis_details, "investidor10_fiis_details")
+        self.save_to_csv(
+            DETAILS_COLUMNS, list_fiis_details, "investidor10_fiis_details", DTYPES
+        )
 
     def save_fiis_properties(self, list_fiis_properties: list) -> None:
         """
@@ -366,28 +604,51 @@ class ScraperInvestidor10(ModelScraper):
         Args:
             list_fiis_properties (list): A list of FII property data.
         """
-        columns = ["fii_name", "property_name", "state", "area", "date_process"]
-        self.save_to_csv(columns, list_fiis_properties, "investidor10_fiis_properties")
+        self.save_to_csv(
+            PROPERTIES_COLUMNS,
+            list_fiis_properties,
+            "investidor10_fiis_properties",
+            DTYPES,
+        )
 
-    def run(self):
+    def run(self, pipelined: bool = False):
         """
         Executes the full scraping and saving process for FIIs data.
 
         This method coordinates the entire process of collecting and saving FII data:
         - Extracts main FII information.
-        - Extracts detailed FII information and property data.
-        - Saves both sets of data to CSV files.
+        - Extracts detailed FII information and property data, recording each FII in a
+        checkpoint journal so an interrupted run resumes where it stopped on the same date.
+        - Saves both sets of data to CSV files and to the daily snapshot store.
+
+        Args:
+            pipelined (bool): If True, details are fetched, parsed in parallel processes and
+                streamed to disk by `extract_fiis_details_properties_pipelined`. Default is False.
         """
         print("Started collect all Fii details!")
         print("Wait to finish process!")
 
+        self.journal = CheckpointJournal(
+            os.path.join(
+                self.save_folder, "journal", f"investidor10_fiis_{self.now}.jsonl"
+            )
+        )
+        self.journal.remove_stale()
+
         list_fiis = self.extract_main_values()
         self.save_fiis_main(list_fiis)
-        (
-            list_fiis_details,
-            list_fiis_properties,
-        ) = self.extract_fiis_details_properties(list_fiis)
-        self.save_fiis_details(list_fiis_details)
-        self.save_fiis_properties(list_fiis_properties)
+        self.save_universe_diff()
+        if pipelined:
+            self.extract_fiis_details_properties_pipelined(list_fiis)
+        else:
+            (
+                list_fiis_details,
+                list_fiis_properties,
+            ) = self.extract_fiis_details_properties(list_fiis)
+            self.save_fiis_details(list_fiis_details)
+            self.save_fiis_properties(list_fiis_properties)
+            self.get_snapshot_store().save_snapshot(
+                list_fiis_details, list_fiis_properties, self.now
+            )
 
         print("\n\tProcess finished!")
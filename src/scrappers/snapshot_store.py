@@ -0,0 +1,287 @@
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from dataclasses import fields
+import pandas as pd
+from src.scrappers.parser_investidor10 import FiiDetails, FiiProperty
+
+DETAILS_FIELDS = [field.name for field in fields(FiiDetails)]
+PROPERTIES_FIELDS = [field.name for field in fields(FiiProperty)]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS fiis_details (
+    {", ".join(f"{name} TEXT" for name in DETAILS_FIELDS)},
+    PRIMARY KEY (fii_name, date_process)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fiis_details_date ON fiis_details (date_process);
+CREATE TABLE IF NOT EXISTS fiis_properties (
+    {", ".join(f"{name} TEXT" for name in PROPERTIES_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS fiis_properties_fii_date ON fiis_properties (fii_name, date_process);
+CREATE INDEX IF NOT EXISTS fiis_properties_date ON fiis_properties (date_process);
+"""
+
+TABLES = {"details": "fiis_details", "properties": "fiis_properties"}
+
+
+class SnapshotWriter:
+    """
+    Adds the rows of one daily snapshot inside an open transaction of a SnapshotStore.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, date_process: str) -> None:
+        self._connection = connection
+        self._date_process = date_process
+
+    def add_details(self, fii_details: list) -> None:
+        """
+        Adds the details row of a FII to the snapshot.
+
+        Args:
+            fii_details (list): The details row of the FII, in the order of `DETAILS_FIELDS`.
+        """
+        self._connection.execute(
+            f"INSERT OR REPLACE INTO fiis_details VALUES ({', '.join('?' * len(DETAILS_FIELDS))})",
+            _to_text(fii_details[:-1]) + [self._date_process],
+        )
+
+    def add_properties(self, list_fii_properties: list) -> None:
+        """
+        Adds properties rows to the snapshot.
+
+        Args:
+            list_fii_properties (list): Properties rows, in the order of `PROPERTIES_FIELDS`.
+        """
+        self._connection.executemany(
+            f"INSERT INTO fiis_properties VALUES ({', '.join('?' * len(PROPERTIES_FIELDS))})",
+            [_to_text(row[:-1]) + [self._date_process] for row in list_fii_properties],
+        )
+
+    def add(self, fii_details: list, list_fii_properties: list) -> None:
+        """
+        Adds a FII and its properties to the snapshot.
+
+        Args:
+            fii_details (list): The details row of the FII.
+            list_fii_properties (list): The properties rows of the FII.
+        """
+        self.add_details(fii_details)
+        self.add_properties(list_fii_properties)
+
+
+def _to_text(values: list) -> list:
+    return [None if value is None else str(value) for value in values]
+
+
+class SnapshotStore:
+    """
+    A SQLite store that keeps every daily snapshot of the scraped FII details and properties,
+    partitioned by `date_process`.
+
+    Details are keyed by `(fii_name, date_process)`, so the time series of a ticker is read
+    straight from the primary key index, and snapshots are located through an index on
+    `date_process`; both lookups stay fast as the history grows. Saving the snapshot of a
+    date again replaces it.
+
+    Attributes:
+        db_path (str): Path to the SQLite database file.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Initializes the SnapshotStore, creating the database and its tables if needed.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    @contextmanager
+    def snapshot(self, date_process):
+        """
+        Opens the snapshot of a date for writing. Rows previously stored for the date are
+        replaced, and the new rows become visible together when the block finishes.
+
+        Args:
+            date_process (datetime.date or str): The date of the snapshot.
+
+        Yields:
+            SnapshotWriter: The writer of the snapshot.
+        """
+        date_process = str(date_process)
+        with closing(self._connect()) as connection:
+            with connection:
+                for table in TABLES.values():
+                    connection.execute(
+                        f"DELETE FROM {table} WHERE date_process = ?", [date_process]
+                    )
+                yield SnapshotWriter(connection, date_process)
+
+    def save_snapshot(
+        self, list_fiis_details: list, list_fiis_properties: list, date_process
+    ) -> None:
+        """
+        Saves the complete snapshot of a date.
+
+        Args:
+            list_fiis_details (list): The details rows of every FII.
+            list_fiis_properties (list): The properties rows of every FII.
+            date_process (datetime.date or str): The date of the snapshot.
+        """
+        with self.snapshot(date_process) as writer:
+            for fii_details in list_fiis_details:
+                writer.add_details(fii_details)
+            writer.add_properties(list_fiis_properties)
+
+    def update_details(self, list_fiis_details: list, columns: list, date_process) -> None:
+        """
+        Updates some fields of the details of the given FIIs in the snapshot of a date,
+        e.g. the market fields refreshed between two full crawls.
+
+        A FII without a row on the date gets a copy of its most recent earlier row (or the
+        given row, if it has none), so the other fields keep their last known values.
+        Properties are not changed.
+
+        Args:
+            list_fiis_details (list): Details rows, in the order of `DETAILS_FIELDS`.
+            columns (list): The detail fields updated from the rows.
+            date_process (datetime.date or str): The date of the snapshot.
+        """
+        date_process = str(date_process)
+        positions = [DETAILS_FIELDS.index(column) for column in columns]
+        copied = ", ".join(DETAILS_FIELDS[:-1])
+        with closing(self._connect()) as connection:
+            with connection:
+                for fii_details in list_fiis_details:
+                    fii_name = fii_details[0]
+                    connection.execute(
+                        f"INSERT OR IGNORE INTO fiis_details SELECT {copied}, ? FROM fiis_details "
+                        "WHERE fii_name = ? AND date_process = (SELECT MAX(date_process) "
+                        "FROM fiis_details WHERE fii_name = ? AND date_process < ?)",
+                        [date_process, fii_name, fii_name, date_process],
+                    )
+                    connection.execute(
+                        "INSERT OR IGNORE INTO fiis_details "
+                        f"VALUES ({', '.join('?' * len(DETAILS_FIELDS))})",
+                        _to_text(fii_details[:-1]) + [date_process],
+                    )
+                    connection.execute(
+                        f"UPDATE fiis_details SET {', '.join(f'{column} = ?' for column in columns)} "
+                        "WHERE fii_name = ? AND date_process = ?",
+                        _to_text([fii_details[position] for position in positions])
+                        + [fii_name, date_process],
+                    )
+
+    def _query(self, sql: str, params: list = None) -> pd.DataFrame:
+        with closing(self._connect()) as connection:
+            df = pd.read_sql_query(sql, connection, params=params)
+        if "date_process" in df.columns:
+            df["date_process"] = pd.to_datetime(df["date_process"]).dt.date
+        return df
+
+    def dates(self) -> list:
+        """
+        Returns:
+            list: The dates of the stored snapshots, in ascending order.
+        """
+        df = self._query("SELECT DISTINCT date_process FROM fiis_details ORDER BY date_process")
+        return df["date_process"].tolist()
+
+    def latest_snapshot(self, table: str = "details") -> pd.DataFrame:
+        """
+        Loads the most recent snapshot.
+
+        Args:
+            table (str): "details" or "properties". Default is "details".
+
+        Returns:
+            pd.DataFrame: The rows of the latest snapshot.
+        """
+        return self._query(
+            f"SELECT * FROM {TABLES[table]} "
+            "WHERE date_process = (SELECT MAX(date_process) FROM fiis_details)"
+        )
+
+    def as_of(self, date_process, table: str = "details") -> pd.DataFrame:
+        """
+        Loads the state known at a date: for each FII, its most recent rows stored on or
+        before `date_process`.
+
+        Args:
+            date_process (datetime.date or str): The reference date.
+            table (str): "details" or "properties". Default is "details".
+
+        Returns:
+            pd.DataFrame: One snapshot row per FII (all of its rows, for properties).
+        """
+        return self._query(
+            f"SELECT t.* FROM {TABLES[table]} AS t "
+            "JOIN (SELECT fii_name, MAX(date_process) AS date_process FROM fiis_details "
+            "WHERE date_process <= ? GROUP BY fii_name) AS latest "
+            "ON t.fii_name = latest.fii_name AND t.date_process = latest.date_process",
+            [str(date_process)],
+        )
+
+    def ticker_time_series(
+        self, fii_name: str, columns: list = None, start=None, end=None
+    ) -> pd.DataFrame:
+        """
+        Loads the history of the details of a FII.
+
+        Args:
+            fii_name (str): The name (ticker) of the FII.
+            columns (list): Detail columns to load. Default is every column.
+            start (datetime.date or str): First date included. Default is the first snapshot.
+            end (datetime.date or str): Last date included. Default is the latest snapshot.
+
+        Returns:
+            pd.DataFrame: One row per snapshot, ordered by `date_process`.
+        """
+        columns = [column for column in (columns or DETAILS_FIELDS) if column in DETAILS_FIELDS]
+        if "date_process" not in columns:
+            columns.append("date_process")
+
+        sql = f"SELECT {', '.join(columns)} FROM fiis_details WHERE fii_name = ?"
+        params = [fii_name]
+        if start is not None:
+            sql += " AND date_process >= ?"
+            params.append(str(start))
+        if end is not None:
+            sql += " AND date_process <= ?"
+            params.append(str(end))
+        return self._query(sql + " ORDER BY date_process", params)
+
+    def history(self, columns: list = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Loads the details of every FII over a range of snapshots, e.g. the quote history
+        used to value the portfolio on past dates.
+
+        Args:
+            columns (list): Detail columns to load. Default is every column. The FII name
+                and the date are always loaded.
+            start (datetime.date or str): First date included. Default is the first snapshot.
+            end (datetime.date or str): Last date included. Default is the latest snapshot.
+
+        Returns:
+            pd.DataFrame: One row per FII and snapshot, ordered by `date_process` and FII name.
+        """
+        columns = [column for column in (columns or DETAILS_FIELDS) if column in DETAILS_FIELDS]
+        for column in ["fii_name", "date_process"]:
+            if column not in columns:
+                columns.insert(0, column)
+
+        sql = f"SELECT {', '.join(columns)} FROM fiis_details WHERE 1 = 1"
+        params = list()
+        if start is not None:
+            sql += " AND date_process >= ?"
+            params.append(str(start))
+        if end is not None:
+            sql += " AND date_process <= ?"
+            params.append(str(end))
+        return self._query(sql + " ORDER BY date_process, fii_name", params)
@@ -0,0 +1,87 @@
+import os
+import csv
+from dataclasses import dataclass, field
+
+UNIVERSE_COLUMNS = ["fii_name", "status", "date_process"]
+
+
+@dataclass
+class UniverseDiff:
+    """
+    The changes of the listed FIIs between two listing crawls.
+
+    Attributes:
+        new (list): FIIs listed now that were not in the previous universe.
+        delisted (list): FIIs of the previous universe that are no longer listed.
+        unchanged (list): FIIs listed in both.
+    """
+
+    new: list = field(default_factory=list)
+    delisted: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+    def to_rows(self, date_process) -> list:
+        """
+        Args:
+            date_process (datetime.date): The date of the current crawl.
+
+        Returns:
+            list: One row per FII with its name, status ("new", "delisted" or
+            "unchanged") and the date, in the order of `UNIVERSE_COLUMNS`.
+        """
+        return [
+            [fii_name, status, date_process]
+            for status, fii_names in [
+                ("new", self.new),
+                ("delisted", self.delisted),
+                ("unchanged", self.unchanged),
+            ]
+            for fii_name in fii_names
+        ]
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: The number of FIIs of each status.
+        """
+        return (
+            f"{len(self.new)} new, {len(self.delisted)} delisted, "
+            f"{len(self.unchanged)} unchanged"
+        )
+
+
+def load_universe(csv_path: str) -> list:
+    """
+    Loads the FII names of a listing CSV (e.g. "investidor10_fiis_names.csv").
+
+    Args:
+        csv_path (str): Path to the CSV file, with a "fii_name" column.
+
+    Returns:
+        list: The FII names, in file order; empty if the file does not exist.
+    """
+    if not os.path.exists(csv_path):
+        return list()
+
+    with open(csv_path, "r", newline="", encoding="utf-8") as names_file:
+        return [row["fii_name"] for row in csv.DictReader(names_file)]
+
+
+def diff_universe(previous: list, current: list) -> UniverseDiff:
+    """
+    Compares two universes of listed FIIs.
+
+    Args:
+        previous (list): FII names of the previous crawl.
+        current (list): FII names of the current crawl.
+
+    Returns:
+        UniverseDiff: The new, delisted and unchanged FIIs, each in the order of the
+        universe they come from.
+    """
+    previous_names, current_names = set(previous), set(current)
+    return UniverseDiff(
+        new=[fii_name for fii_name in current if fii_name not in previous_names],
+        delisted=[fii_name for fii_name in previous if fii_name not in current_names],
+        unchanged=[fii_name for fii_name in current if fii_name in previous_names],
+    )
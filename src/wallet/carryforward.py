@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import pandas as pd
+from src.wallet.tax import LIMITE_ISENCAO, isencao_imposto_renda
+from src.monitoring.profiling import profile_stage
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Colunas que separam as compensações (prejuízo e imposto acumulados)
+GRUPOS = ["Tipo Ativo", "Tipo Estrategia"]
+
+
+def _varrer_compensacao(grupos, lucro_compensado, imposto_compensado, imposto_pago,
+                        prejuizo_inicial, imposto_inicial):
+    # Percorre os meses de todos os grupos uma única vez, mantendo o prejuízo e o
+    # imposto acumulados de cada grupo. Os estados iniciais são atualizados no lugar,
+    # permitindo continuar a varredura quando novos meses forem adicionados.
+    total = len(grupos)
+    prejuizo_acumulado = np.zeros(total)
+    imposto_acumulado = np.zeros(total)
+    imposto_pendente = np.zeros(total)
+
+    for i in range(total):
+        grupo = grupos[i]
+        if lucro_compensado[i] < 0:
+            prejuizo_inicial[grupo] += lucro_compensado[i]
+        else:
+            prejuizo_inicial[grupo] = 0
+        prejuizo_acumulado[i] = prejuizo_inicial[grupo]
+
+        imposto_inicial[grupo] += imposto_compensado[i]
+        imposto_acumulado[i] = imposto_inicial[grupo]
+
+        if imposto_pago[i] > 0:
+            pendente = imposto_inicial[grupo] - imposto_pago[i]
+            if pendente < 0:
+                pendente = 0
+                imposto_inicial[grupo] = 0
+        else:
+            pendente = imposto_inicial[grupo]
+        imposto_pendente[i] = pendente
+
+    return prejuizo_acumulado, imposto_acumulado, imposto_pendente
+
+
+def varrer_lucro_compensando_prejuizo(venda, lucro_prejuizo, lucro_bruto, prejuizo_bruto):
+    # Compensa os prejuízos acumulados nos lucros das vendas seguintes de um ativo,
+    # retornando o "Lucro Bruto Compensado" e o "Prejuizo Acumulado" de cada negociação
+    total = len(venda)
+    lucro_bruto_compensado = np.zeros(total)
+    prejuizo_acumulado_atual = np.zeros(total)
+    prejuizo_acumulado = 0.0
+
+    for i in range(total):
+        if venda[i]:
+            if lucro_prejuizo[i] <= 0:
+                prejuizo_acumulado += prejuizo_bruto[i]
+            else:
+                lucro_compensado = lucro_bruto[i] + prejuizo_acumulado
+                if lucro_compensado >= 0:
+                    prejuizo_acumulado = 0.0
+                    lucro_bruto_compensado[i] = lucro_compensado
+                else:
+                    prejuizo_acumulado = lucro_compensado
+            prejuizo_acumulado_atual[i] = prejuizo_acumulado
+
+    return lucro_bruto_compensado, prejuizo_acumulado_atual
+
+
+if numba is not None:
+    _varrer_compensacao = numba.njit(cache=True)(_varrer_compensacao)
+    varrer_lucro_compensando_prejuizo = numba.njit(cache=True)(
+        varrer_lucro_compensando_prejuizo
+    )
+
+
+@dataclass
+class EstadoCompensacao:
+    """
+    Prejuízo e imposto acumulados de um grupo após o último mês processado.
+    """
+
+    prejuizo_acumulado: float = 0.0
+    imposto_acumulado: float = 0.0
+    ultimo_mes: Optional[pd.Period] = None
+
+
+class CompensacaoImpostos:
+    """
+    Motor de compensação de prejuízos e impostos das vendas mensais.
+
+    Em uma única varredura ordenada de todos os grupos (`GRUPOS`) calcula o
+    "Lucro Bruto Compensado", o "Prejuizo Acumulado", o "IR Compensado", o
+    "IR Acumulado" e o "IR Pendente" após os DARFs pagos ("IR Pago"), além da
+    isenção mensal de ações ("Isento IR").
+
+    O estado de cada grupo é mantido entre chamadas de `processar`, então ao
+    adicionar um novo mês apenas esse mês é calculado.
+
+    Attributes:
+        estados (dict): Estado de cada grupo, por (Tipo Ativo, Tipo Estrategia).
+        darfs (pd.Series): "IR Pago" por (Tipo Ativo, Data Mensal).
+        limite_isencao (float): Limite de isenção, na mesma unidade dos valores
+            (reais, ou centavos no esquema de `src/wallet/schema.py`).
+    """
+
+    def __init__(self, df_darfs=None, limite_isencao=LIMITE_ISENCAO):
+        """
+        Args:
+            df_darfs (pd.DataFrame): DARFs emitidos, com "Tipo Ativo", "Data Mensal"
+                e "IR Pago". DARFs do mesmo mês e tipo de ativo são somados.
+            limite_isencao (float): Limite de isenção. Padrão é `LIMITE_ISENCAO` (em reais).
+        """
+        self.estados = dict()
+        self.limite_isencao = limite_isencao
+        self.darfs = pd.Series(dtype=float)
+        if df_darfs is not None:
+            self.adicionar_darfs(df_darfs)
+
+    def adicionar_darfs(self, df_darfs):
+        """
+        Adiciona DARFs emitidos. Valem para os meses processados a partir de então.
+
+        Args:
+            df_darfs (pd.DataFrame): DARFs com "Tipo Ativo", "Data Mensal" e "IR Pago".
+        """
+        darfs = df_darfs.groupby(["Tipo Ativo", "Data Mensal"])["IR Pago"].sum()
+        self.darfs = darfs.add(self.darfs, fill_value=0) if len(self.darfs) else darfs
+
+    @profile_stage("CompensacaoImpostos.processar")
+    def processar(self, df_venda_mensal):
+        """
+        Calcula as compensações de novos meses, continuando a partir dos meses já
+        processados.
+
+        Args:
+            df_venda_mensal (pd.DataFrame): Vendas mensais com `GRUPOS`, "Data Mensal",
+                "Valor", "Taxa IR", "Dedo Duro", "Lucro Bruto" e "Prejuizo".
+
+        Returns:
+            pd.DataFrame: As vendas mensais ordenadas por grupo e mês, com as novas colunas.
+
+        Raises:
+            ValueError: Se algum mês de um grupo já foi processado.
+        """
+        df = df_venda_mensal.sort_values(GRUPOS + ["Data Mensal"], kind="stable")
+        df = df.reset_index(drop=True)
+
+        grupos, chaves = pd.MultiIndex.from_frame(df[GRUPOS]).factorize()
+        estados = [self.estados.get(chave, EstadoCompensacao()) for chave in chaves]
+        primeiros_meses = df.groupby(grupos)["Data Mensal"].min()
+        for codigo, estado in enumerate(estados):
+            if estado.ultimo_mes is not None and primeiros_meses[codigo] <= estado.ultimo_mes:
+                raise ValueError(
+                    f"Mês {primeiros_meses[codigo]} de {chaves[codigo]} já foi processado "
+                    f"(último mês: {estado.ultimo_mes})"
+                )
+
+        # IR pago nos DARFs de cada mês
+        darfs = pd.MultiIndex.from_frame(df[["Tipo Ativo", "Data Mensal"]])
+        df["IR Pago"] = self.darfs.reindex(darfs).fillna(0).to_numpy()
+
+        # Compensação do mês (vetorizada)
+        lucro_compensado = (df["Lucro Bruto"] - df["Prejuizo"]).to_numpy(float)
+        dedo_duro = df["Dedo Duro"].to_numpy(float)
+        imposto_compensado = np.select(
+            [lucro_compensado > 0, lucro_compensado == 0],
+            [lucro_compensado * df["Taxa IR"].to_numpy(float) - dedo_duro, lucro_compensado - dedo_duro],
+            0.0,
+        )
+        df["Lucro Bruto Compensado"] = lucro_compensado
+        df["IR Compensado"] = imposto_compensado
+
+        # Acumulados entre meses (varredura)
+        prejuizo_inicial = np.array([estado.prejuizo_acumulado for estado in estados], dtype=float)
+        imposto_inicial = np.array([estado.imposto_acumulado for estado in estados], dtype=float)
+        prejuizo_acumulado, imposto_acumulado, imposto_pendente = _varrer_compensacao(
+            grupos.astype(np.int64),
+            lucro_compensado,
+            imposto_compensado,
+            df["IR Pago"].to_numpy(float),
+            prejuizo_inicial,
+            imposto_inicial,
+        )
+        df["Prejuizo Acumulado"] = prejuizo_acumulado
+        df["IR Acumulado"] = imposto_acumulado
+        df["IR Pendente"] = imposto_pendente
+
+        df = isencao_imposto_renda(df, self.limite_isencao)
+
+        ultimos_meses = df.groupby(grupos)["Data Mensal"].max()
+        for codigo, chave in enumerate(chaves):
+            self.estados[chave] = EstadoCompensacao(
+                float(prejuizo_inicial[codigo]),
+                float(imposto_inicial[codigo]),
+                ultimos_meses[codigo],
+            )
+        return df
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+
+# Tipos de evento corporativo e se multiplicam (desdobramento) ou dividem (grupamento) as quantidades
+TIPOS_EVENTO = {"Desdobramento": True, "Grupamento": False}
+
+
+def carregar_eventos_corporativos(caminho):
+    """
+    Carrega a tabela de eventos corporativos (desdobramentos e grupamentos).
+
+    A tabela tem as colunas "Ativo", "Data Com" (último dia com as cotas antigas, no
+    formato dd/mm/aaaa), "Tipo" ("Desdobramento" ou "Grupamento") e "Proporcao"
+    (ex: 10 para um desdobramento de 1:10 ou um grupamento de 10:1).
+
+    Args:
+        caminho (str): Caminho do .csv de eventos corporativos.
+
+    Returns:
+        pd.DataFrame: Os eventos, com "Data Com" convertida para data.
+
+    Raises:
+        ValueError: Se algum evento tiver tipo desconhecido ou proporção não positiva.
+    """
+    eventos = pd.read_csv(caminho, sep=",")
+    eventos["Data Com"] = pd.to_datetime(eventos["Data Com"], format="%d/%m/%Y")
+
+    invalidos = eventos[~eventos["Tipo"].isin(list(TIPOS_EVENTO)) | ~(eventos["Proporcao"] > 0)]
+    if len(invalidos) > 0:
+        raise ValueError(f"Eventos corporativos inválidos:\n{invalidos}")
+    return eventos
+
+
+def calcular_fatores_acumulados(eventos):
+    """
+    Calcula, para cada evento, o ajuste acumulado das negociações feitas até a sua
+    "Data Com": o produto do evento com todos os eventos posteriores do mesmo ativo.
+
+    O ajuste é mantido como fração ("Multiplicador" / "Divisor" da quantidade) para
+    que um único desdobramento gere os mesmos valores que multiplicar a quantidade
+    e dividir o preço pela proporção.
+
+    Args:
+        eventos (pd.DataFrame): Eventos retornados por `carregar_eventos_corporativos`.
+
+    Returns:
+        pd.DataFrame: "Ativo", "Data Com", "Multiplicador" e "Divisor", ordenados por "Data Com".
+    """
+    desdobramento = eventos["Tipo"].map(TIPOS_EVENTO).astype(bool)
+    proporcao = eventos["Proporcao"].astype(float)
+    fatores = pd.DataFrame(
+        {
+            "Ativo": eventos["Ativo"],
+            "Data Com": eventos["Data Com"].astype("datetime64[ns]"),
+            "Multiplicador": proporcao.where(desdobramento, 1.0),
+            "Divisor": proporcao.where(~desdobramento, 1.0),
+        }
+    )
+
+    # Eventos do mesmo ativo na mesma data viram um único evento
+    fatores = fatores.groupby(["Ativo", "Data Com"], as_index=False)[["Multiplicador", "Divisor"]].prod()
+
+    # Produto acumulado do evento mais recente para o mais antigo de cada ativo
+    reverso = fatores.iloc[::-1]
+    fatores["Multiplicador"] = reverso.groupby("Ativo")["Multiplicador"].cumprod()
+    fatores["Divisor"] = reverso.groupby("Ativo")["Divisor"].cumprod()
+    return fatores.sort_values("Data Com", kind="stable").reset_index(drop=True)
+
+
+@profile_stage()
+def aplicar_eventos_corporativos(df, eventos):
+    """
+    Ajusta "Quantidade" e "Preco" das negociações feitas até a "Data Com" de cada
+    desdobramento ou grupamento do ativo, em uma única junção ordenada por data
+    (`pd.merge_asof`), independente do número de eventos. O "Valor" não muda.
+
+    Funciona com os valores em reais ou em centavos (`src/wallet/schema.py`); o
+    "Preco" ajustado pode ter frações de centavo.
+
+    Args:
+        df (pd.DataFrame): Negociações com "Ativo", "Data Negociacao", "Quantidade" e "Preco".
+        eventos (pd.DataFrame): Eventos retornados por `carregar_eventos_corporativos`.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as quantidades e preços ajustados.
+    """
+    fatores = calcular_fatores_acumulados(eventos)
+    fatores["Ativo"] = fatores["Ativo"].astype(df["Ativo"].dtype)
+    # Eventos de ativos que não estão nas negociações (fora das categorias)
+    fatores = fatores.dropna(subset=["Ativo"])
+
+    negociacoes = pd.DataFrame(
+        {
+            "Ativo": df["Ativo"].to_numpy(),
+            "Data Negociacao": df["Data Negociacao"].to_numpy("datetime64[ns]"),
+            "Posicao": np.arange(len(df)),
+        }
+    ).astype({"Ativo": df["Ativo"].dtype})
+    negociacoes = negociacoes.sort_values("Data Negociacao", kind="stable")
+
+    # Primeiro evento do ativo com "Data Com" igual ou posterior à negociação
+    ajustes = pd.merge_asof(
+        negociacoes,
+        fatores,
+        left_on="Data Negociacao",
+        right_on="Data Com",
+        by="Ativo",
+        direction="forward",
+    )
+    posicoes = ajustes["Posicao"].to_numpy()
+    multiplicador = np.ones(len(df))
+    divisor = np.ones(len(df))
+    multiplicador[posicoes] = ajustes["Multiplicador"].fillna(1.0).to_numpy(float)
+    divisor[posicoes] = ajustes["Divisor"].fillna(1.0).to_numpy(float)
+
+    df = df.copy()
+    quantidade = df["Quantidade"].to_numpy(float) * multiplicador / divisor
+    # Quantidades inteiras (esquema da carteira) continuam inteiras, exceto se um
+    # grupamento deixar frações
+    if pd.api.types.is_integer_dtype(df["Quantidade"]) and np.array_equal(quantidade, np.round(quantidade)):
+        quantidade = quantidade.astype(df["Quantidade"].dtype)
+    df["Quantidade"] = quantidade
+    df["Preco"] = df["Preco"].to_numpy(float) * divisor / multiplicador
+    return df
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+
+# Negociações do mesmo ativo no mesmo dia que se compensam como Day Trade
+CHAVES_DAY_TRADE = ["Ativo", "Data Negociacao"]
+
+
+def calcular_quantidades_day_trade(df):
+    """
+    Calcula a quantidade Day Trade de cada negociação.
+
+    A quantidade Day Trade de um ativo em um dia é a menor entre as quantidades
+    compradas e vendidas no dia. Ela é distribuída entre as compras (e entre as
+    vendas) na ordem das negociações; o restante de cada negociação é Long Trade.
+
+    Args:
+        df (pd.DataFrame): Negociações com `CHAVES_DAY_TRADE`, "Tipo de Movimentacao"
+            e "Quantidade", em ordem cronológica.
+
+    Returns:
+        np.ndarray: A quantidade Day Trade de cada negociação (0 para as demais movimentações).
+    """
+    compra = df["Tipo de Movimentacao"].eq("Compra").fillna(False).to_numpy(bool)
+    venda = df["Tipo de Movimentacao"].eq("Venda").fillna(False).to_numpy(bool)
+    quantidade = df["Quantidade"].to_numpy(float)
+
+    grupos = df.groupby(CHAVES_DAY_TRADE, sort=False, dropna=False).ngroup().to_numpy()
+    total_compra = np.bincount(grupos, np.where(compra, quantidade, 0.0))
+    total_venda = np.bincount(grupos, np.where(venda, quantidade, 0.0))
+    day_trade_grupo = np.minimum(total_compra, total_venda)[grupos]
+
+    # Quantidade das compras (ou vendas) anteriores do mesmo ativo no mesmo dia
+    lado = np.select([compra, venda], [1, -1], 0)
+    anterior = pd.Series(quantidade).groupby([grupos, lado]).cumsum().to_numpy() - quantidade
+
+    day_trade = np.clip(day_trade_grupo - anterior, 0.0, quantidade)
+    return np.where(lado != 0, day_trade, 0.0)
+
+
+@profile_stage()
+def separar_day_trade(df):
+    """
+    Separa as negociações em Day Trade e Long Trade ("Tipo Estrategia").
+
+    Negociações com parte Day Trade e parte Long Trade são divididas em duas linhas,
+    a primeira com a quantidade Day Trade e a segunda com o restante. O "Valor" é
+    dividido proporcionalmente às quantidades (a parte Day Trade arredondada em
+    centavos e a Long Trade com a diferença, preservando o total), em reais ou em
+    centavos inteiros (`src/wallet/schema.py`), mantendo os tipos das colunas.
+
+    Args:
+        df (pd.DataFrame): Negociações com `CHAVES_DAY_TRADE`, "Tipo de Movimentacao",
+            "Quantidade" e "Valor", em ordem cronológica.
+
+    Returns:
+        pd.DataFrame: As negociações com "Tipo Estrategia", na mesma ordem e com novo índice.
+    """
+    quantidade = df["Quantidade"].to_numpy(float)
+    day_trade = calcular_quantidades_day_trade(df)
+    long_trade = quantidade - day_trade
+
+    # Cada negociação gera uma linha Day Trade e/ou uma linha Long Trade
+    tem_day_trade = day_trade > 0
+    tem_long_trade = (long_trade > 0) | ~tem_day_trade
+    partes = tem_day_trade.astype(int) + tem_long_trade.astype(int)
+    posicoes = np.repeat(np.arange(len(df)), partes)
+    linha_day_trade = np.zeros(len(posicoes), dtype=bool)
+    linha_day_trade[(np.cumsum(partes) - partes)[tem_day_trade]] = True
+
+    df = df.iloc[posicoes].reset_index(drop=True)
+    dividida = partes[posicoes] == 2
+    if dividida.any():
+        # Valores em centavos inteiros (esquema da carteira) são divididos em centavos
+        centavos = pd.api.types.is_integer_dtype(df["Valor"])
+        valor = df["Valor"].to_numpy(float)
+        valor_day_trade = np.round(
+            valor * day_trade[posicoes] / quantidade[posicoes], 0 if centavos else 2
+        )
+        df["Valor"] = np.where(
+            dividida,
+            np.where(linha_day_trade, valor_day_trade, valor - valor_day_trade),
+            valor,
+        ).astype(df["Valor"].dtype)
+        df["Quantidade"] = np.where(
+            dividida,
+            np.where(linha_day_trade, day_trade[posicoes], long_trade[posicoes]),
+            df["Quantidade"].to_numpy(float),
+        ).astype(df["Quantidade"].dtype)
+
+    df["Tipo Estrategia"] = np.where(linha_day_trade, "Day Trade", "Long Trade")
+    return df
@@ -1,60 +1,57 @@
-import pandas as pd
+import numpy as np
 import os
-
-def join_dataframes_from_directory(directory):
-    dfs = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".csv"):
-                filepath = os.path.join(root, file)
-                df = pd.read_csv(
-                    filepath,
-                    sep=";",
-                    encoding="ISO-8859-1",
-                    skiprows=[0],
-                    decimal=",",
-                    dtype=str,
-                )
-                dfs.append(df)
-    if len(dfs) > 0:
-        df_result = pd.concat(dfs, ignore_index=True)
-        return df_result
-    else:
-        return None
-
-
-def definir_compra_venda(row):
-    if (row["Quantidade Compra"] > 0) & (row["Quantidade Venda"] == 0):
-        row["Tipo Negociacao"] = "Compra"
-        row["Preco Compra Atual"] = row["Preco"]
-        row["Preco Venda Atual"] = 0
-    elif (row["Quantidade Venda"] > 0) & (row["Quantidade Compra"] == 0):
-        row["Tipo Negociacao"] = "Venda"
-        row["Preco Venda Atual"] = row["Preco"]
-        row["Preco Compra Atual"] = 0
-    else:
-        row["Tipo Negociacao"] = None
-        row["Preco Compra Atual"] = None
-        row["Preco Venda Atual"] = None
-    return row
-
-
-def validador_estrategia_trade(group):
-    # Função para auxiliar na separação de Estrategias Day Trade e Long Trade
-    # Necessita de ajuste manual após validação, 
-    # deve separar as quantidades que pertencem determinada estrategia
-    # Ex: quantidade venda maior que quantidade compra,
-    #     copiar linha e dividir o valor pelas quantidades de cada estrategia.
-    #     linha 1 priorizar a venda das quantidades Day Trade.
-    #     linha 2 separar quantidades restantes como Long Trade.
-    group['Tipo Estrategia'] = "Long Trade"
-    tem_venda = (group['Quantidade Venda'] != '0').any()
-    tem_compra = (group['Quantidade Compra'] != '0').any()
-    if tem_venda and tem_compra:
-        group['Verificar Day Trade'] = True        
-    else:
-        group['Verificar Day Trade'] = False
-    return group
+from src.wallet.carryforward import varrer_lucro_compensando_prejuizo
+from src.wallet.daytrade import separar_day_trade
+from src.wallet.ingestion import LayoutRelatorio, carregar_relatorios_b3
+from src.wallet.ledger import COMPRA, VENDA, varrer_preco_medio
+from src.wallet.tax import LIMITE_ISENCAO, buscar_taxas
+
+# Layout antigo dos relatórios .csv de negociações ("Quantidade Compra", "Quantidade Venda",
+# "Valor Compra", ...) usado pelas funções deste módulo, lido com os tipos inferidos
+LAYOUT_LEGADO = LayoutRelatorio(nome="legado", extensoes=(".csv",))
+
+
+def join_dataframes_from_directory(
+    directory, pasta_cache=os.path.join("Datasets", "Cache", "B3ReportsLegado")
+):
+    # Junta os relatórios .csv do layout antigo pelo cache incremental da ingestão
+    # (src/wallet/ingestion.py), lendo apenas os relatórios novos ou alterados
+    return carregar_relatorios_b3(directory, pasta_cache, layout=LAYOUT_LEGADO)
+
+
+def definir_compra_venda(df):
+    # Define o tipo de negociação e os preços de compra e venda de todas as linhas
+    compra = (df["Quantidade Compra"] > 0) & (df["Quantidade Venda"] == 0)
+    venda = (df["Quantidade Venda"] > 0) & (df["Quantidade Compra"] == 0)
+    df = df.copy()
+    df["Tipo Negociacao"] = np.select([compra, venda], ["Compra", "Venda"], None)
+    df["Preco Compra Atual"] = np.select([compra, venda], [df["Preco"], 0], np.nan)
+    df["Preco Venda Atual"] = np.select([compra, venda], [0, df["Preco"]], np.nan)
+    return df
+
+
+def validador_estrategia_trade(df):
+    # Separa as estratégias Day Trade e Long Trade de todas as negociações de uma vez,
+    # sem ajuste manual: uma negociação com as duas estratégias é dividida em duas
+    # linhas (1ª Day Trade, 2ª Long Trade), com o valor dividido pelas quantidades.
+    # Usa `separar_day_trade` (src/wallet/daytrade.py), que agrupa por `CHAVES_DAY_TRADE`.
+    compra = df["Quantidade Compra"] > 0
+    venda = ~compra & (df["Quantidade Venda"] > 0)
+    df = df.assign(**{
+        "Tipo de Movimentacao": np.select([compra, venda], ["Compra", "Venda"], None),
+        "Quantidade": np.where(compra, df["Quantidade Compra"], df["Quantidade Venda"]),
+        "Valor": np.where(compra, df["Valor Compra"], df["Valor Venda"]),
+    })
+    df = separar_day_trade(df)
+
+    # Volta as quantidades e valores separados para as colunas de compra e venda
+    compra = df["Tipo de Movimentacao"].eq("Compra").fillna(False)
+    venda = df["Tipo de Movimentacao"].eq("Venda").fillna(False)
+    df["Quantidade Compra"] = df["Quantidade Compra"].mask(compra, df["Quantidade"])
+    df["Quantidade Venda"] = df["Quantidade Venda"].mask(venda, df["Quantidade"])
+    df["Valor Compra"] = df["Valor Compra"].mask(compra, df["Valor"])
+    df["Valor Venda"] = df["Valor Venda"].mask(venda, df["Valor"])
+    return df.drop(columns=["Tipo de Movimentacao", "Quantidade", "Valor"])
 
 
 def calcular_ordem_negociacoes_por_ativo(group):
@@ -66,141 +63,97 @@ def calcular_ordem_negociacoes_por_ativo(group):
 
 
 def calcular_investimento_preco_medio_atual(group):
-    # Função para calcular o preço médio acumulado em cada grupo
-    investimento_acumulado = 0
-    preco_medio = 0
-    
-    for index, row in group.iterrows():
-        if row['Quantidade Compra'] > 0:
-            investimento_acumulado += row['Valor Compra']
-            preco_medio = investimento_acumulado / row["Quantidade Total Atual"]
-
-            group.at[index, 'Investimento Atual'] = investimento_acumulado
-            group.at[index, 'Preco Medio Atual'] = preco_medio
-            
-        elif row['Quantidade Venda'] > 0:
-            valor_investido = preco_medio * row['Quantidade Venda']
-            investimento_acumulado -= valor_investido
-            
-            if row["Quantidade Total Atual"] > 0:
-                preco_medio = investimento_acumulado / row["Quantidade Total Atual"]
-                
-            group.at[index, 'Investimento Atual'] = investimento_acumulado
-            group.at[index, 'Preco Medio Atual'] = preco_medio
-        else:
-            group.at[index, 'Investimento Atual'] = 0
-            group.at[index, 'Preco Medio Atual'] = 0
+    # Calcula o investimento e o preço médio acumulados do grupo (um ativo) com a
+    # mesma varredura de `calcular_valores_negociados`. A quantidade é acumulada das
+    # compras e vendas, o que equivale à "Quantidade Total Atual" do grupo.
+    compra = group['Quantidade Compra'] > 0
+    venda = ~compra & (group['Quantidade Venda'] > 0)
+    tipos = np.select([compra, venda], [COMPRA, VENDA], 0)
+    quantidades = np.where(compra, group['Quantidade Compra'], group['Quantidade Venda'])
+    investimento, quantidade, preco_medio, _ = varrer_preco_medio(
+        np.zeros(len(group), dtype=np.int64), tipos, quantidades, group['Valor Compra']
+    )
+
+    # Uma venda que zera a posição mantém o preço médio anterior
+    preco_anterior = np.concatenate(([0.0], preco_medio[:-1]))
+    preco_medio = np.where(venda & (quantidade == 0), preco_anterior, preco_medio)
+
+    # Linhas que não são compra nem venda ficam zeradas
+    negociada = compra | venda
+    group['Investimento Atual'] = np.where(negociada, investimento, 0)
+    group['Preco Medio Atual'] = np.where(negociada, preco_medio, 0)
     return group
 
 
-def calcular_lucro_prejuizo(row):
+def calcular_lucro_prejuizo(df):
     # Calcula o Lucro em determinados momentos (Parcial ou inteiro de venda)
-    if row["Quantidade Venda"] > 0:
-        row["Lucro/Prejuizo"] = -(row["Preco Medio Anterior"] * row["Quantidade Venda"]) + row["Valor Venda"]
-    elif row["Quantidade Venda"] == 0:
-        row["Lucro/Prejuizo"] = 0
-
-    if row["Lucro/Prejuizo"] > 0:
-        row["Lucro Bruto"] = row["Lucro/Prejuizo"]
-        row["Prejuizo Bruto"] = 0
-    elif row["Lucro/Prejuizo"] < 0:
-        row["Prejuizo Bruto"] = row["Lucro/Prejuizo"]
-        row["Lucro Bruto"] = 0
-    else:
-        row["Lucro Bruto"] = 0
-        row["Prejuizo Bruto"] = 0
-
-    return row
+    lucro_prejuizo = np.select(
+        [df["Quantidade Venda"] > 0, df["Quantidade Venda"] == 0],
+        [-(df["Preco Medio Anterior"] * df["Quantidade Venda"]) + df["Valor Venda"], 0],
+        np.nan,
+    )
+    df = df.copy()
+    df["Lucro/Prejuizo"] = lucro_prejuizo
+    df["Lucro Bruto"] = np.where(lucro_prejuizo > 0, lucro_prejuizo, 0)
+    df["Prejuizo Bruto"] = np.where(lucro_prejuizo < 0, lucro_prejuizo, 0)
+    return df
 
 def calcular_lucro_compensando_prejuizo(group):
     # Função para calcular o lucro liquido bruto que sera necessario para dedução dos impostos
     # apenas as negociacoes com valor positivo no liquido deverao ter imposto.
-    prejuizo_acumulado = 0
-    for index, row in group.iterrows():
-        if row['Tipo Negociacao'] == "Venda":
-            if row["Lucro/Prejuizo"] <= 0:
-                prejuizo_acumulado += row["Prejuizo Bruto"]
-                group.at[index, "Lucro Bruto Compensado"] = 0
-                group.at[index, "Prejuizo Acumulado"] = prejuizo_acumulado
-            else:
-                lucro_compensado = row["Lucro Bruto"] + prejuizo_acumulado
-                if lucro_compensado >= 0:
-                    prejuizo_acumulado = 0
-                    group.at[index, "Lucro Bruto Compensado"] = lucro_compensado
-                    group.at[index, "Prejuizo Acumulado"] = prejuizo_acumulado
-                else:
-                    prejuizo_acumulado = lucro_compensado
-                    group.at[index, "Lucro Bruto Compensado"] = 0 
-                    group.at[index, "Prejuizo Acumulado"] = prejuizo_acumulado
-        else:
-            group.at[index, "Lucro Bruto Compensado"] = 0
-            group.at[index, "Prejuizo Acumulado"] = 0
+    lucro_bruto_compensado, prejuizo_acumulado = varrer_lucro_compensando_prejuizo(
+        group["Tipo Negociacao"].eq("Venda").to_numpy(bool),
+        group["Lucro/Prejuizo"].to_numpy(float),
+        group["Lucro Bruto"].to_numpy(float),
+        group["Prejuizo Bruto"].to_numpy(float),
+    )
+    group["Lucro Bruto Compensado"] = lucro_bruto_compensado
+    group["Prejuizo Acumulado"] = prejuizo_acumulado
     return group
 
 
-def definir_taxa_imposto_renda_dedo_duro_por_ativo(row):
-    # Calcula a taxa de IR (Imposto de Renda) considerando 15% para ações e 20% para FIIs.
-    # Ações IR: Day Trade 20%, Swing Trade 15% e Long Trade 15%. 
-    # Calcular Dedo Duro da mesma forma, 
-    # Dedo Duro: Day Trade 1%, Swing Trade 0.005% e Long Trade 0.005%
-    if row["Tipo Negociacao"] == "Venda":
-        if row["Tipo Estrategia"] == "Day Trade":
-            row["Dedo Duro"] = row["Lucro Bruto"] * 0.01
-            row["Taxa IR"] = 0.20
-        elif row["Tipo Estrategia"] == "Long Trade":
-            if row["Tipo Ativo"] == "Fii":
-                row["Dedo Duro"] = row["Lucro Bruto"] * 0.00005
-                row["Taxa IR"] = 0.20
-            elif row["Tipo Ativo"] == "Acao":
-                row["Dedo Duro"] = row["Lucro Bruto"] * 0.00005
-                row["Taxa IR"] = 0.15
-            else: 
-                row["Dedo Duro"] = "Outras Categorias"
-                row["Taxa IR"] = "Outras Categorias"
-        else:
-            row["Dedo Duro"] = "Outras Estrategias"
-            row["Taxa IR"] = "Outras Estrategias"
-    else:
-        row["Dedo Duro"] = 0
-        row["Taxa IR"] = 0
-    return row
-
-
-def calcular_imposto_de_renda(row):
+def definir_taxa_imposto_renda_dedo_duro_por_ativo(df):
+    # Calcula a taxa de IR e o Dedo Duro (sobre o Lucro Bruto) das vendas,
+    # com as alíquotas da tabela TAXAS_IMPOSTO (src/wallet/tax.py).
+    # Vendas de outras estratégias ou categorias ficam com NaN e "Sem Taxa IR".
+    venda = df["Tipo Negociacao"].eq("Venda").to_numpy(bool)
+    taxa_ir, taxa_dedo_duro = buscar_taxas(df["Tipo Estrategia"], df["Tipo Ativo"])
+    df = df.copy()
+    df["Dedo Duro"] = np.where(venda, df["Lucro Bruto"] * taxa_dedo_duro, 0)
+    df["Taxa IR"] = np.where(venda, taxa_ir, 0)
+    df["Sem Taxa IR"] = venda & np.isnan(taxa_ir)
+    return df
+
+
+def calcular_imposto_de_renda(df):
     # Calcula o valor do IR para cada transação
     # e desconta o "dedo duro" já pago nas transaçoes
-    if row["Lucro Bruto"] > 0:
-        row["Imposto Renda Normal"] = row["Lucro Bruto"] * row["Taxa IR"]
-        row["Imposto Renda Normal Final"] = row["Imposto Renda Normal"] - row["Dedo Duro"]
-    else:
-        row["Imposto Renda Normal"] = 0
-        row["Imposto Renda Normal Final"] = -(row["Dedo Duro"])
-        
-    if row["Lucro Bruto Compensado"] > 0:
-        row["Imposto Renda Compensado"] = row["Lucro Bruto Compensado"] * row["Taxa IR"]
-        row["Imposto Renda Compensado Final"] = row["Imposto Renda Compensado"] - row["Dedo Duro"]
-    else:
-        row["Imposto Renda Compensado"] = 0
-        row["Imposto Renda Compensado Final"] = -(row["Dedo Duro"])
-    return row
-
-
-def calcular_lucro_real(row):
+    df = df.copy()
+    for lucro, imposto in [("Lucro Bruto", "Imposto Renda Normal"),
+                           ("Lucro Bruto Compensado", "Imposto Renda Compensado")]:
+        tem_lucro = df[lucro] > 0
+        df[imposto] = np.where(tem_lucro, df[lucro] * df["Taxa IR"], 0)
+        df[f"{imposto} Final"] = np.where(tem_lucro, df[imposto] - df["Dedo Duro"], -df["Dedo Duro"])
+    return df
+
+
+def calcular_lucro_real(df):
     # Calcula o valor Real de Lucro descontando os prezuizos e impostos
-    if row["Lucro/Prejuizo"] > 0:
-        row["Lucro Real"] = row["Lucro Bruto"] - row["Imposto Renda Normal Final"]
-    else:
-        row["Lucro Real"] = 0
-    return row
+    df = df.copy()
+    df["Lucro Real"] = np.where(
+        df["Lucro/Prejuizo"] > 0, df["Lucro Bruto"] - df["Imposto Renda Normal Final"], 0
+    )
+    return df
 
 
-def isencao_imposto_renda(row):
+def isencao_imposto_renda(df):
     # Para vendas de ações com montante menor ou igual 
     # a 20.000,00 em um periodo de um 1 mes, será isento de declarar imposto sobre essas ações, 
     # sendo excessões, qualquer tipo de Day Trade ou qualquer outra categoria.
-    isencao_imposto_renda = False
-    if row["Tipo Estrategia"] == "Long Trade":
-        if (row['Tipo Ativo'] == "Acao") & (row["Valor Venda"] <= 20000):
-            isencao_imposto_renda = True
-    row["Isencao Imposto Renda"] = isencao_imposto_renda
-    return row
\ No newline at end of file
+    df = df.copy()
+    df["Isencao Imposto Renda"] = (
+        (df["Tipo Estrategia"] == "Long Trade")
+        & (df["Tipo Ativo"] == "Acao")
+        & (df["Valor Venda"] <= LIMITE_ISENCAO)
+    )
+    return df
@@ -0,0 +1,386 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Optional
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# Versão do formato do cache; caches de outras versões são reconstruídos
+VERSAO_CACHE = 3
+
+# Engine de leitura das planilhas: calamine (Rust) quando instalado, bem mais rápido que openpyxl
+ENGINE_EXCEL = "calamine" if python_calamine is not None else "openpyxl"
+
+# Colunas que identificam uma negociação nos relatórios da B3
+CHAVES_NEGOCIACAO = [
+    "Código de Negociação",
+    "Data do Negócio",
+    "Tipo de Movimentação",
+    "Quantidade",
+    "Preço",
+    "Valor",
+]
+
+# Tipos das colunas lidas dos relatórios (apenas as usadas no tratamento). Os textos
+# são categorias, como no esquema da carteira (`src/wallet/schema.py`)
+TIPOS_COLUNAS = {
+    "Código de Negociação": "category",
+    "Data do Negócio": "datetime64[ns]",
+    "Tipo de Movimentação": "category",
+    "Quantidade": "float64",
+    "Preço": "float64",
+    "Valor": "float64",
+}
+
+EXTENSOES_RELATORIO = (".xlsx", ".csv")
+
+
+@dataclass(frozen=True)
+class LayoutRelatorio:
+    """
+    Colunas e tipos de um layout de relatório lido pela ingestão.
+
+    Attributes:
+        nome (str): Nome do layout, guardado no manifesto do cache.
+        tipos (dict or None): Tipo de cada coluna lida; None lê todas as colunas, com os
+            tipos inferidos.
+        chaves (list or None): Colunas que identificam uma negociação, usadas na
+            deduplicação; None usa todas as colunas lidas.
+        coluna_data (str or None): Coluna da data do negócio ("dd/mm/aaaa"), usada para
+            ordenar as negociações; None mantém a ordem dos relatórios.
+        ordem_inversa (bool): Se os relatórios listam as negociações da mais recente para
+            a mais antiga.
+        extensoes (tuple): Extensões dos relatórios lidos.
+    """
+
+    nome: str
+    tipos: Optional[dict] = None
+    chaves: Optional[list] = None
+    coluna_data: Optional[str] = None
+    ordem_inversa: bool = False
+    extensoes: tuple = EXTENSOES_RELATORIO
+
+
+# Relatório de negociações da B3
+LAYOUT_B3 = LayoutRelatorio(
+    nome="b3",
+    tipos=TIPOS_COLUNAS,
+    chaves=CHAVES_NEGOCIACAO,
+    coluna_data="Data do Negócio",
+    ordem_inversa=True,
+)
+
+
+def calcular_sha256(caminho):
+    """
+    Args:
+        caminho (str): Caminho do arquivo.
+
+    Returns:
+        str: O SHA-256 do conteúdo do arquivo.
+    """
+    with open(caminho, "rb") as arquivo:
+        return hashlib.file_digest(arquivo, "sha256").hexdigest()
+
+
+def ler_relatorio(caminho, layout=LAYOUT_B3):
+    """
+    Lê as colunas de `layout` de um relatório (.xlsx ou .csv) em ordem cronológica,
+    já tipadas.
+
+    Cada negociação recebe sua "Ocorrencia" entre negociações idênticas do mesmo
+    relatório, para que relatórios com períodos sobrepostos possam ser deduplicados
+    sem perder negociações repetidas legítimas.
+
+    Args:
+        caminho (str): Caminho do relatório.
+        layout (LayoutRelatorio): Layout do relatório. Padrão é `LAYOUT_B3`.
+
+    Returns:
+        pd.DataFrame: As negociações do relatório.
+    """
+    colunas = list(layout.tipos) if layout.tipos is not None else None
+    if caminho.endswith(".csv"):
+        df = pd.read_csv(
+            caminho,
+            sep=";",
+            encoding="ISO-8859-1",
+            skiprows=[0],
+            decimal=",",
+            thousands=".",
+            usecols=colunas,
+        )
+    else:
+        df = pd.read_excel(caminho, engine=ENGINE_EXCEL, usecols=colunas)
+
+    if layout.ordem_inversa:
+        df = df.iloc[::-1].reset_index(drop=True)
+
+    data = layout.coluna_data
+    if data is not None and not pd.api.types.is_datetime64_any_dtype(df[data]):
+        df[data] = pd.to_datetime(df[data], format="%d/%m/%Y")
+    if layout.tipos is not None:
+        for coluna, tipo in layout.tipos.items():
+            if tipo == "float64":
+                df[coluna] = pd.to_numeric(df[coluna], errors="coerce")
+        df = df[colunas].astype(layout.tipos)
+
+    chaves = layout.chaves or list(df.columns)
+    df["Ocorrencia"] = df.groupby(chaves, dropna=False, observed=True).cumcount()
+    return df
+
+
+def deduplicar_negociacoes(dfs, layout=LAYOUT_B3):
+    """
+    Junta negociações de vários relatórios em uma única concatenação, removendo as que aparecem em mais de um
+    relatório (períodos sobrepostos), e as ordena pela data do negócio.
+
+    Args:
+        dfs (list): DataFrames retornados por `ler_relatorio`, do mais antigo ao mais recente.
+        layout (LayoutRelatorio): Layout dos relatórios. Padrão é `LAYOUT_B3`.
+
+    Returns:
+        pd.DataFrame: As negociações únicas, em ordem cronológica.
+    """
+    df = pd.concat(dfs, ignore_index=True)
+    if layout.tipos is not None:
+        df = df.astype(layout.tipos)
+    chaves = layout.chaves or [coluna for coluna in df.columns if coluna != "Ocorrencia"]
+    df = df.drop_duplicates(subset=chaves + ["Ocorrencia"], keep="first")
+    if layout.coluna_data is not None:
+        df = df.sort_values(layout.coluna_data, kind="stable")
+    return df.reset_index(drop=True)
+
+
+class IngestaoB3:
+    """
+    Ingestão incremental dos relatórios de negociações da B3.
+
+    Cada relatório é identificado por tamanho, data de modificação e SHA-256 (o hash só
+    é recalculado quando tamanho ou data mudam) e convertido uma única vez para um cache
+    tipado em Parquet (ou pickle, sem pyarrow). As negociações já deduplicadas de todos
+    os relatórios ficam em um cache consolidado, então uma nova execução lê apenas o
+    consolidado e os relatórios novos. Se um relatório for alterado ou removido, o
+    consolidado é refeito a partir dos caches de cada relatório, sem reler as planilhas.
+
+    Os relatórios a converter são lidos em paralelo por um pool de processos.
+
+    Attributes:
+        diretorio (str): Pasta dos relatórios da B3.
+        pasta_cache (str): Pasta do cache.
+        max_workers (int or None): Número de processos que leem os relatórios.
+        layout (LayoutRelatorio): Colunas e tipos dos relatórios.
+    """
+
+    def __init__(
+        self,
+        diretorio,
+        pasta_cache=os.path.join("Datasets", "Cache", "B3Reports"),
+        max_workers=None,
+        layout=LAYOUT_B3,
+    ):
+        """
+        Args:
+            diretorio (str): Pasta dos relatórios da B3.
+            pasta_cache (str): Pasta do cache. Padrão é "Datasets/Cache/B3Reports".
+            max_workers (int): Número de processos que leem os relatórios. Padrão é o
+                número de CPUs; 1 lê os relatórios no próprio processo.
+            layout (LayoutRelatorio): Colunas e tipos dos relatórios. Padrão é `LAYOUT_B3`.
+        """
+        self.diretorio = diretorio
+        self.pasta_cache = pasta_cache
+        self.max_workers = max_workers
+        self.layout = layout
+        self._extensao = "parquet" if pyarrow is not None else "pkl"
+        os.makedirs(pasta_cache, exist_ok=True)
+
+    def _caminho_cache(self, nome):
+        return os.path.join(self.pasta_cache, f"{nome}.{self._extensao}")
+
+    def _salvar(self, df, nome):
+        caminho = self._caminho_cache(nome)
+        if self._extensao == "parquet":
+            df.to_parquet(f"{caminho}.tmp", index=False)
+        else:
+            df.to_pickle(f"{caminho}.tmp", compression=None)
+        os.replace(f"{caminho}.tmp", caminho)
+
+    def _ler(self, nome):
+        caminho = self._caminho_cache(nome)
+        if self._extensao == "parquet":
+            return pd.read_parquet(caminho)
+        return pd.read_pickle(caminho, compression=None)
+
+    def _carregar_manifesto(self):
+        caminho = os.path.join(self.pasta_cache, "manifesto.json")
+        try:
+            with open(caminho, "r", encoding="utf-8") as arquivo:
+                manifesto = json.load(arquivo)
+        except (OSError, json.JSONDecodeError):
+            manifesto = dict()
+
+        if (
+            manifesto.get("versao") != VERSAO_CACHE
+            or manifesto.get("extensao") != self._extensao
+            or manifesto.get("layout") != self.layout.nome
+        ):
+            manifesto = {
+                "versao": VERSAO_CACHE,
+                "extensao": self._extensao,
+                "layout": self.layout.nome,
+                "arquivos": dict(),
+            }
+        return manifesto
+
+    def _salvar_manifesto(self, manifesto):
+        caminho = os.path.join(self.pasta_cache, "manifesto.json")
+        with open(f"{caminho}.tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=1)
+        os.replace(f"{caminho}.tmp", caminho)
+
+    def ler_relatorios(self, caminhos):
+        """
+        Lê vários relatórios, em paralelo quando houver mais de um.
+
+        Args:
+            caminhos (list): Caminhos dos relatórios.
+
+        Returns:
+            list: Os DataFrames retornados por `ler_relatorio`, na ordem de `caminhos`.
+        """
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(caminhos))
+        if max_workers <= 1:
+            return [ler_relatorio(caminho, self.layout) for caminho in caminhos]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(ler_relatorio, caminhos, repeat(self.layout)))
+
+    def listar_relatorios(self):
+        """
+        Returns:
+            list: Caminhos relativos dos relatórios encontrados no diretório, ordenados.
+        """
+        relatorios = list()
+        for root, _, files in os.walk(self.diretorio):
+            for file in files:
+                # "~$" são arquivos temporários do Excel
+                if file.endswith(self.layout.extensoes) and not file.startswith("~$"):
+                    relatorios.append(os.path.relpath(os.path.join(root, file), self.diretorio))
+        return sorted(relatorios)
+
+    def carregar(self):
+        """
+        Carrega as negociações de todos os relatórios, convertendo apenas os relatórios
+        novos ou alterados desde a última execução.
+
+        Returns:
+            pd.DataFrame or None: As negociações únicas em ordem cronológica, ou None
+            se não houver relatórios.
+        """
+        manifesto = self._carregar_manifesto()
+        anteriores = manifesto["arquivos"]
+        arquivos = dict()
+        pendentes = dict()
+        refazer_consolidado = not os.path.exists(self._caminho_cache("consolidado"))
+
+        for relatorio in self.listar_relatorios():
+            caminho = os.path.join(self.diretorio, relatorio)
+            status = os.stat(caminho)
+            entrada = anteriores.get(relatorio)
+
+            if (
+                entrada is not None
+                and entrada["tamanho"] == status.st_size
+                and entrada["modificado"] == status.st_mtime_ns
+                and os.path.exists(self._caminho_cache(entrada["sha256"]))
+            ):
+                arquivos[relatorio] = entrada
+                continue
+
+            sha256 = calcular_sha256(caminho)
+            if (
+                entrada is None
+                or entrada["sha256"] != sha256
+                or not os.path.exists(self._caminho_cache(sha256))
+            ):
+                pendentes[sha256] = caminho
+                # Um relatório alterado pode ter removido negociações do consolidado
+                refazer_consolidado |= entrada is not None
+
+            arquivos[relatorio] = {
+                "tamanho": status.st_size,
+                "modificado": status.st_mtime_ns,
+                "sha256": sha256,
+            }
+
+        removidos = set(anteriores).difference(arquivos)
+        refazer_consolidado |= len(removidos) > 0
+
+        if not arquivos:
+            return None
+
+        convertidos = dict(zip(pendentes, self.ler_relatorios(list(pendentes.values()))))
+        for sha256, df in convertidos.items():
+            self._salvar(df, sha256)
+
+        if refazer_consolidado:
+            hashes = dict.fromkeys(entrada["sha256"] for entrada in arquivos.values())
+            dfs = [convertidos.get(sha256) for sha256 in hashes]
+            dfs = [self._ler(sha256) if df is None else df for sha256, df in zip(hashes, dfs)]
+            if self.layout.coluna_data is not None:
+                dfs.sort(key=lambda df: df[self.layout.coluna_data].min())
+            df = deduplicar_negociacoes(dfs, self.layout)
+            self._salvar(df, "consolidado")
+        elif convertidos:
+            df = deduplicar_negociacoes(
+                [self._ler("consolidado")] + list(convertidos.values()), self.layout
+            )
+            self._salvar(df, "consolidado")
+        else:
+            df = self._ler("consolidado")
+
+        # Caches de relatórios que não estão mais no diretório
+        usados = {entrada["sha256"] for entrada in arquivos.values()}
+        for entrada in anteriores.values():
+            if entrada["sha256"] not in usados and os.path.exists(self._caminho_cache(entrada["sha256"])):
+                os.remove(self._caminho_cache(entrada["sha256"]))
+
+        manifesto["arquivos"] = arquivos
+        self._salvar_manifesto(manifesto)
+        return df.drop(columns="Ocorrencia")
+
+
+@profile_stage()
+def carregar_relatorios_b3(
+    diretorio,
+    pasta_cache=os.path.join("Datasets", "Cache", "B3Reports"),
+    max_workers=None,
+    layout=LAYOUT_B3,
+):
+    """
+    Carrega as negociações dos relatórios da B3 de um diretório, usando o cache incremental.
+
+    Args:
+        diretorio (str): Pasta dos relatórios da B3.
+        pasta_cache (str): Pasta do cache. Padrão é "Datasets/Cache/B3Reports".
+        max_workers (int): Número de processos que leem os relatórios. Padrão é o número de CPUs.
+        layout (LayoutRelatorio): Colunas e tipos dos relatórios. Padrão é `LAYOUT_B3`.
+
+    Returns:
+        pd.DataFrame or None: As negociações únicas em ordem cronológica, ou None se não
+        houver relatórios.
+    """
+    return IngestaoB3(diretorio, pasta_cache, max_workers, layout).carregar()
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Tipos de movimentação considerados no preço médio
+COMPRA = 1
+VENDA = -1
+
+
+def _varrer_preco_medio(ativos, tipos, quantidades, valores, quantidade_ativos):
+    # Percorre as negociações uma única vez, mantendo o estado (investimento,
+    # quantidade e preço médio) de cada ativo. Uma venda que zera a quantidade zera
+    # também o investimento e o preço médio: o cálculo linha a linha comparava o
+    # resíduo do investimento com 0, o que dependia do arredondamento (reais ou
+    # centavos) e mantinha o preço médio anterior quando o resíduo não era exato.
+    total = len(ativos)
+    investimento_atual = np.zeros(total)
+    quantidade_atual = np.zeros(total)
+    preco_medio_atual = np.zeros(total)
+    inconsistente = np.zeros(total, dtype=np.bool_)
+
+    investimento = np.zeros(quantidade_ativos)
+    quantidade = np.zeros(quantidade_ativos)
+    preco_medio = np.zeros(quantidade_ativos)
+
+    for i in range(total):
+        ativo = ativos[i]
+        if tipos[i] == COMPRA:
+            investimento[ativo] += valores[i]
+            quantidade[ativo] += quantidades[i]
+            preco_medio[ativo] = investimento[ativo] / quantidade[ativo]
+
+        elif tipos[i] == VENDA:
+            investimento[ativo] -= preco_medio[ativo] * quantidades[i]
+            quantidade[ativo] -= quantidades[i]
+            if quantidade[ativo] == 0:
+                investimento[ativo] = 0
+                preco_medio[ativo] = 0
+            elif (investimento[ativo] > 0) and (quantidade[ativo] > 0):
+                preco_medio[ativo] = investimento[ativo] / quantidade[ativo]
+            else:
+                inconsistente[i] = True
+
+        investimento_atual[i] = investimento[ativo]
+        quantidade_atual[i] = quantidade[ativo]
+        preco_medio_atual[i] = preco_medio[ativo]
+
+    return investimento_atual, quantidade_atual, preco_medio_atual, inconsistente
+
+
+if numba is not None:
+    _varrer_preco_medio_compilado = numba.njit(cache=True)(_varrer_preco_medio)
+
+
+def varrer_preco_medio(ativos, tipos, quantidades, valores):
+    """
+    Calcula o investimento, a quantidade e o preço médio acumulados após cada negociação.
+    Uma venda que zera a quantidade zera também o investimento e o preço médio, com os
+    valores em reais ou em centavos.
+
+    Usa a versão compilada com numba quando instalado; caso contrário percorre
+    listas Python, o que ainda evita o custo do iterrows.
+
+    Args:
+        ativos (np.ndarray): Código inteiro (0..n-1) do ativo de cada negociação.
+        tipos (np.ndarray): COMPRA, VENDA ou 0 (outras movimentações) de cada negociação.
+        quantidades (np.ndarray): Quantidade de cada negociação.
+        valores (np.ndarray): Valor de cada negociação.
+
+    Returns:
+        tuple: Arrays com o investimento, a quantidade e o preço médio atuais de cada
+        negociação, e se a negociação deixou o ativo inconsistente (venda maior que a
+        posição), caso em que o preço médio anterior é mantido.
+    """
+    ativos = np.asarray(ativos, dtype=np.int64)
+    tipos = np.asarray(tipos, dtype=np.int8)
+    quantidades = np.asarray(quantidades, dtype=np.float64)
+    valores = np.asarray(valores, dtype=np.float64)
+    quantidade_ativos = int(ativos.max()) + 1 if len(ativos) else 0
+
+    if numba is not None:
+        return _varrer_preco_medio_compilado(
+            ativos, tipos, quantidades, valores, quantidade_ativos
+        )
+    return _varrer_preco_medio(
+        ativos.tolist(), tipos.tolist(), quantidades.tolist(), valores.tolist(), quantidade_ativos
+    )
+
+
+@profile_stage()
+def calcular_valores_negociados(df):
+    """
+    Calcula o investimento, quantidade e preço médio acumulado de cada ativo
+    ("Investimento Atual", "Quantidade Atual" e "Preco Medio Atual"), de todos os
+    ativos de uma vez, seguindo a ordem das negociações no DataFrame.
+
+    Args:
+        df (pd.DataFrame): Negociações com "Ativo", "Tipo de Movimentacao",
+            "Quantidade" e "Valor".
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as novas colunas.
+    """
+    ativos, _ = pd.factorize(df["Ativo"], use_na_sentinel=False)
+    tipos = np.select(
+        [df["Tipo de Movimentacao"].eq("Compra"), df["Tipo de Movimentacao"].eq("Venda")],
+        [COMPRA, VENDA],
+        0,
+    )
+    investimento, quantidade, preco_medio, _ = varrer_preco_medio(
+        ativos, tipos, df["Quantidade"], df["Valor"]
+    )
+
+    df = df.copy()
+    df["Investimento Atual"] = investimento
+    df["Quantidade Atual"] = quantidade
+    df["Preco Medio Atual"] = preco_medio
+    return df
+
+
+def verificar_inconsistencias(df):
+    """
+    Retorna as vendas que deixaram o investimento ou a quantidade de um ativo
+    negativos (ou apenas um deles zerado). Precisam ser checadas manualmente.
+
+    Args:
+        df (pd.DataFrame): Resultado de `calcular_valores_negociados`.
+
+    Returns:
+        pd.DataFrame: As negociações inconsistentes.
+    """
+    investimento, quantidade = df["Investimento Atual"], df["Quantidade Atual"]
+    consistente = ((investimento == 0) & (quantidade == 0)) | (
+        (investimento > 0) & (quantidade > 0)
+    )
+    return df[df["Tipo de Movimentacao"].eq("Venda") & ~consistente]
+
+
+def listar_ativos_em_carteira(df, tipo_ativo=None):
+    """
+    Lista os ativos ainda em carteira: os que têm "Investimento Atual" maior que zero
+    na última negociação.
+
+    Args:
+        df (pd.DataFrame): Resultado de `calcular_valores_negociados` (ou o relatório
+            tratado da B3), com as negociações de cada ativo em ordem.
+        tipo_ativo (str): Se informado, lista apenas os ativos desse "Tipo Ativo".
+
+    Returns:
+        list: Os códigos dos ativos, em ordem alfabética.
+    """
+    df_posicao = df.drop_duplicates(subset="Ativo", keep="last")
+    em_carteira = df_posicao["Investimento Atual"] > 0
+    if tipo_ativo is not None:
+        em_carteira &= df_posicao["Tipo Ativo"] == tipo_ativo
+    return sorted(df_posicao.loc[em_carteira, "Ativo"])
@@ -0,0 +1,434 @@
+import os
+import json
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+from src.wallet.schema import CENTAVOS_POR_REAL
+
+# Versão do formato do cache; caches de outras versões são reconstruídos
+VERSAO_CACHE = 1
+
+# Matrizes (datas x ativos) calculadas por `MatrizPosicoes.calcular_valores`
+VALORES_POSICAO = [
+    "Quantidade",
+    "Custo",
+    "Cotacao",
+    "Valor Mercado",
+    "Lucro Nao Realizado",
+    "% Carteira",
+    "% Carteira Mercado",
+]
+
+# Valores em centavos, convertidos para reais nos relatórios
+VALORES_MONETARIOS = ["Custo", "Cotacao", "Valor Mercado", "Lucro Nao Realizado"]
+
+
+@dataclass
+class MatrizPosicoes:
+    """
+    Posição diária de cada ativo da carteira, em matrizes densas (datas x ativos).
+
+    Attributes:
+        datas (pd.DatetimeIndex): Dias consecutivos, da primeira negociação à última data.
+        ativos (np.ndarray): Código de cada coluna das matrizes.
+        tipos (np.ndarray): "Tipo Ativo" de cada ativo.
+        quantidade (np.ndarray): Quantidade em carteira ao fim de cada dia.
+        custo (np.ndarray): Custo (investimento pelo preço médio) em centavos, int64.
+        cotacao (np.ndarray): Última cotação conhecida em centavos, NaN antes da primeira.
+    """
+
+    datas: pd.DatetimeIndex
+    ativos: np.ndarray
+    tipos: np.ndarray
+    quantidade: np.ndarray
+    custo: np.ndarray
+    cotacao: np.ndarray
+
+    @classmethod
+    def vazia(cls):
+        """
+        Returns:
+            MatrizPosicoes: Uma matriz sem datas nem ativos.
+        """
+        return cls(
+            pd.DatetimeIndex([]),
+            np.array([], dtype=str),
+            np.array([], dtype=str),
+            np.zeros((0, 0)),
+            np.zeros((0, 0), dtype=np.int64),
+            np.zeros((0, 0)),
+        )
+
+    def calcular_valores(self):
+        """
+        Calcula o valor de mercado, o lucro não realizado e a participação na carteira
+        de todos os ativos em todas as datas, em uma única passada de operações NumPy.
+
+        Ativos sem cotação (ex: ações, já que as cotações vêm dos snapshots de FIIs)
+        são avaliados pelo custo. A "% Carteira" é a participação do custo do ativo no
+        custo do seu "Tipo Ativo", como em `4. my_wallet.ipynb`; a "% Carteira Mercado"
+        é a mesma participação pelo valor de mercado.
+
+        Returns:
+            dict: Uma matriz (datas x ativos) por nome em `VALORES_POSICAO`, com os
+            valores monetários em centavos.
+        """
+        cotado = ~np.isnan(self.cotacao)
+        valor_mercado = np.where(cotado, self.quantidade * self.cotacao, self.custo)
+
+        # Soma de cada "Tipo Ativo" por data, por multiplicação com a matriz ativos x tipos
+        codigos, tipos = pd.factorize(self.tipos)
+        por_tipo = np.zeros((len(self.ativos), len(tipos)))
+        por_tipo[np.arange(len(self.ativos)), codigos] = 1
+        custo_tipo = (self.custo @ por_tipo)[:, codigos]
+        mercado_tipo = (valor_mercado @ por_tipo)[:, codigos]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentual = np.where(custo_tipo > 0, self.custo * 100 / custo_tipo, 0.0)
+            percentual_mercado = np.where(mercado_tipo > 0, valor_mercado * 100 / mercado_tipo, 0.0)
+
+        return dict(
+            zip(
+                VALORES_POSICAO,
+                [
+                    self.quantidade,
+                    self.custo,
+                    self.cotacao,
+                    valor_mercado,
+                    valor_mercado - self.custo,
+                    np.round(percentual, 2),
+                    np.round(percentual_mercado, 2),
+                ],
+            )
+        )
+
+    def posicoes(self, data=None):
+        """
+        Lista as posições abertas (quantidade diferente de zero), em reais.
+
+        Args:
+            data (str or pd.Timestamp): Se informada, lista apenas as posições dessa data.
+
+        Returns:
+            pd.DataFrame: Uma linha por data e ativo, com "Data", "Ativo", "Tipo Ativo" e
+            os `VALORES_POSICAO`.
+        """
+        valores = self.calcular_valores()
+        linhas = slice(None)
+        if data is not None:
+            posicao = self.datas.get_loc(pd.Timestamp(data))
+            linhas = slice(posicao, posicao + 1)
+
+        aberta = self.quantidade[linhas] != 0
+        indices_datas, indices_ativos = np.nonzero(aberta)
+        df = pd.DataFrame(
+            {
+                "Data": self.datas[linhas][indices_datas],
+                "Ativo": self.ativos[indices_ativos],
+                "Tipo Ativo": self.tipos[indices_ativos],
+            }
+        )
+        for nome, matriz in valores.items():
+            df[nome] = matriz[linhas][aberta]
+        for nome in VALORES_MONETARIOS:
+            df[nome] = df[nome] / CENTAVOS_POR_REAL
+        return df
+
+    def resumo_diario(self):
+        """
+        Soma o custo, o valor de mercado e o lucro não realizado de cada "Tipo Ativo"
+        em cada data, em reais.
+
+        Returns:
+            pd.DataFrame: Uma linha por data e tipo de ativo com posição.
+        """
+        valores = self.calcular_valores()
+        codigos, tipos = pd.factorize(self.tipos)
+        por_tipo = np.zeros((len(self.ativos), len(tipos)))
+        por_tipo[np.arange(len(self.ativos)), codigos] = 1
+
+        df = pd.DataFrame(
+            {
+                "Data": np.repeat(self.datas, len(tipos)),
+                "Tipo Ativo": np.tile(np.asarray(tipos, dtype=object), len(self.datas)),
+            }
+        )
+        for nome in ["Custo", "Valor Mercado", "Lucro Nao Realizado"]:
+            df[nome] = (valores[nome] @ por_tipo).ravel() / CENTAVOS_POR_REAL
+        posicoes = ((self.quantidade != 0) @ por_tipo).ravel()
+        df["Ativos"] = posicoes.astype(int)
+        return df[posicoes > 0].reset_index(drop=True)
+
+
+def calcular_variacoes_diarias(df_negociacoes):
+    """
+    Soma as variações de quantidade e de custo de cada ativo em cada dia.
+
+    Args:
+        df_negociacoes (pd.DataFrame): Negociações tratadas (`treat_b3`), no esquema de
+            `src/wallet/schema.py`, com "Ativo", "Tipo Ativo", "Data Negociacao",
+            "Quantidade Atual", "Quantidade Anterior", "Investimento Atual" e
+            "Investimento Anterior".
+
+    Returns:
+        pd.DataFrame: "Data", "Ativo", "Tipo Ativo", "Quantidade" e "Custo" (centavos),
+        ordenados por data e ativo.
+    """
+    df = pd.DataFrame(
+        {
+            "Data": df_negociacoes["Data Negociacao"].dt.normalize().to_numpy("datetime64[ns]"),
+            "Ativo": np.asarray(df_negociacoes["Ativo"], dtype=object),
+            "Tipo Ativo": np.asarray(df_negociacoes["Tipo Ativo"], dtype=object),
+            "Quantidade": (
+                df_negociacoes["Quantidade Atual"].to_numpy(float)
+                - df_negociacoes["Quantidade Anterior"].to_numpy(float)
+            ),
+            "Custo": (
+                df_negociacoes["Investimento Atual"].to_numpy(np.int64)
+                - df_negociacoes["Investimento Anterior"].to_numpy(np.int64)
+            ),
+        }
+    )
+    return (
+        df.groupby(["Data", "Ativo", "Tipo Ativo"], sort=True)[["Quantidade", "Custo"]]
+        .sum()
+        .reset_index()
+    )
+
+
+def preparar_cotacoes(df_cotacoes):
+    """
+    Args:
+        df_cotacoes (pd.DataFrame): Cotações com "Data", "Ativo" e "Cotacao" (em reais).
+
+    Returns:
+        pd.DataFrame: As cotações válidas (não nulas nem zero) em centavos, com a última
+        cotação de cada ativo por dia, ordenadas por data.
+    """
+    df = pd.DataFrame(
+        {
+            "Data": pd.to_datetime(df_cotacoes["Data"]).dt.normalize().to_numpy("datetime64[ns]"),
+            "Ativo": np.asarray(df_cotacoes["Ativo"], dtype=object),
+            "Cotacao": df_cotacoes["Cotacao"].to_numpy(float) * CENTAVOS_POR_REAL,
+        }
+    )
+    df = df[df["Cotacao"] > 0]
+    return df.drop_duplicates(["Data", "Ativo"], keep="last").sort_values("Data", kind="stable")
+
+
+def _preencher_adiante(matriz, inicial):
+    # Repete o último valor conhecido (não NaN) de cada coluna nas linhas seguintes,
+    # partindo da linha `inicial`
+    matriz = np.vstack([inicial[None, :], matriz])
+    indices = np.where(~np.isnan(matriz), np.arange(len(matriz))[:, None], 0)
+    np.maximum.accumulate(indices, axis=0, out=indices)
+    return np.take_along_axis(matriz, indices, axis=0)[1:]
+
+
+def _hash_variacoes(variacoes):
+    return pd.util.hash_pandas_object(variacoes, index=False).sum().item()
+
+
+class MotorPosicoes:
+    """
+    Motor da matriz diária de posições da carteira, com cache incremental em disco.
+
+    As posições são montadas a partir das variações diárias do ledger com somas
+    acumuladas ao longo das datas (`np.cumsum`) e alinhadas às cotações dos snapshots
+    do Investidor10, repetidas até a cotação seguinte. A matriz fica em cache; uma nova
+    execução apenas acrescenta as datas, os ativos e as cotações novos, recalculando
+    as linhas a partir do primeiro dia alterado. Se negociações anteriores à última
+    data do cache mudarem, a matriz é refeita.
+
+    Attributes:
+        pasta_cache (str): Pasta do cache.
+    """
+
+    def __init__(self, pasta_cache=os.path.join("Datasets", "Cache", "Positions")):
+        """
+        Args:
+            pasta_cache (str): Pasta do cache. Padrão é "Datasets/Cache/Positions".
+        """
+        self.pasta_cache = pasta_cache
+        os.makedirs(pasta_cache, exist_ok=True)
+
+    def _caminho(self, nome):
+        return os.path.join(self.pasta_cache, nome)
+
+    def _carregar_manifesto(self):
+        try:
+            with open(self._caminho("manifesto.json"), "r", encoding="utf-8") as arquivo:
+                manifesto = json.load(arquivo)
+        except (OSError, json.JSONDecodeError):
+            manifesto = dict()
+
+        if manifesto.get("versao") != VERSAO_CACHE or not os.path.exists(self._caminho("matriz.npz")):
+            return None
+        return manifesto
+
+    def _carregar_matriz(self):
+        with np.load(self._caminho("matriz.npz")) as arquivo:
+            return MatrizPosicoes(
+                pd.DatetimeIndex(arquivo["datas"].astype("datetime64[ns]")),
+                arquivo["ativos"].astype(object),
+                arquivo["tipos"].astype(object),
+                arquivo["quantidade"],
+                arquivo["custo"],
+                arquivo["cotacao"],
+            )
+
+    def _salvar(self, matriz, manifesto):
+        caminho = self._caminho("matriz.npz")
+        with open(f"{caminho}.tmp", "wb") as arquivo:
+            np.savez(
+                arquivo,
+                datas=matriz.datas.to_numpy("datetime64[ns]").astype(np.int64),
+                ativos=matriz.ativos.astype(str),
+                tipos=matriz.tipos.astype(str),
+                quantidade=matriz.quantidade,
+                custo=matriz.custo,
+                cotacao=matriz.cotacao,
+            )
+        os.replace(f"{caminho}.tmp", caminho)
+
+        caminho = self._caminho("manifesto.json")
+        with open(f"{caminho}.tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=1)
+        os.replace(f"{caminho}.tmp", caminho)
+
+    @profile_stage("MotorPosicoes.atualizar")
+    def atualizar(self, df_negociacoes, df_cotacoes, ate=None):
+        """
+        Atualiza a matriz de posições com as negociações e cotações recebidas.
+
+        Args:
+            df_negociacoes (pd.DataFrame): Todas as negociações tratadas, no formato de
+                `calcular_variacoes_diarias`.
+            df_cotacoes (pd.DataFrame): Histórico de cotações com "Data", "Ativo" e
+                "Cotacao" (em reais). Dos ativos já em cache, apenas as cotações a partir
+                da última cotação em cache são usadas.
+            ate (str or pd.Timestamp): Última data da matriz. Padrão é a última data das
+                negociações e cotações.
+
+        Returns:
+            MatrizPosicoes: A matriz atualizada.
+        """
+        variacoes = calcular_variacoes_diarias(df_negociacoes)
+        cotacoes = preparar_cotacoes(df_cotacoes)
+        if len(variacoes) == 0:
+            return MatrizPosicoes.vazia()
+
+        if ate is None:
+            ate = pd.concat([variacoes["Data"], cotacoes["Data"]]).max()
+        fim = pd.Timestamp(ate)
+        variacoes = variacoes[variacoes["Data"] <= fim]
+        cotacoes = cotacoes[cotacoes["Data"] <= fim]
+
+        matriz = MatrizPosicoes.vazia()
+        ultima_cotacao = None
+        manifesto = self._carregar_manifesto()
+        if manifesto is not None:
+            matriz = self._carregar_matriz()
+            anteriores = variacoes[variacoes["Data"] <= matriz.datas[-1]]
+            if (
+                _hash_variacoes(anteriores) == manifesto["hash_variacoes"]
+                and variacoes["Data"].min() >= matriz.datas[0]
+                and fim >= matriz.datas[-1]
+            ):
+                ultima_cotacao = manifesto["ultima_cotacao"]
+            else:
+                matriz = MatrizPosicoes.vazia()
+
+        novas = variacoes[variacoes["Data"] > matriz.datas[-1]] if len(matriz.datas) else variacoes
+        matriz = estender_matriz(matriz, novas, cotacoes, ultima_cotacao, variacoes["Data"].min(), fim)
+
+        aplicadas = cotacoes.loc[cotacoes["Ativo"].isin(matriz.ativos), "Data"]
+        if len(aplicadas):
+            ultima_cotacao = str(aplicadas.max().date())
+        self._salvar(
+            matriz,
+            {
+                "versao": VERSAO_CACHE,
+                "hash_variacoes": _hash_variacoes(variacoes),
+                "ultima_cotacao": ultima_cotacao,
+            },
+        )
+        return matriz
+
+
+def estender_matriz(matriz, variacoes, cotacoes, ultima_cotacao, inicio, fim):
+    """
+    Estende a matriz de posições até `fim` com novas variações e cotações.
+
+    Apenas as linhas a partir do primeiro dia alterado são recalculadas: as posições
+    com a soma acumulada das variações a partir da posição do dia anterior, e as
+    cotações repetidas a partir da última cotação conhecida. Ativos novos viram
+    colunas novas, sem posição nas datas anteriores e com todo o seu histórico de
+    cotações.
+
+    Args:
+        matriz (MatrizPosicoes): A matriz atual (possivelmente vazia).
+        variacoes (pd.DataFrame): Variações de `calcular_variacoes_diarias` posteriores
+            à última data da matriz.
+        cotacoes (pd.DataFrame): Histórico de cotações de `preparar_cotacoes`.
+        ultima_cotacao (str): Data da última cotação já aplicada à matriz; cotações
+            anteriores dos ativos existentes são ignoradas. None para usar todas.
+        inicio (pd.Timestamp): Primeira data, usada quando a matriz está vazia.
+        fim (pd.Timestamp): Última data da matriz estendida.
+
+    Returns:
+        MatrizPosicoes: A matriz estendida.
+    """
+    datas = pd.date_range(matriz.datas[0] if len(matriz.datas) else inicio, fim, freq="D")
+    existentes = len(matriz.ativos)
+
+    # Ativos novos são acrescentados depois das colunas existentes
+    novos = variacoes.drop_duplicates("Ativo")
+    novos = novos[~novos["Ativo"].isin(matriz.ativos)]
+    ativos = np.concatenate([matriz.ativos, novos["Ativo"].to_numpy(object)])
+    tipos = np.concatenate([matriz.tipos, novos["Tipo Ativo"].to_numpy(object)])
+    formato = (len(datas), len(ativos))
+    colunas = pd.Index(ativos)
+
+    def ampliar(valores, preenchimento, dtype):
+        ampliada = np.full(formato, preenchimento, dtype=dtype)
+        ampliada[: valores.shape[0], : valores.shape[1]] = valores
+        return ampliada
+
+    quantidade = ampliar(matriz.quantidade, 0.0, np.float64)
+    custo = ampliar(matriz.custo, 0, np.int64)
+    cotacao = ampliar(matriz.cotacao, np.nan, np.float64)
+
+    # Posições: soma acumulada das variações a partir da última linha existente
+    linha = len(matriz.datas)
+    if linha < len(datas):
+        indices = (datas.get_indexer(variacoes["Data"]) - linha) * formato[1] + colunas.get_indexer(variacoes["Ativo"])
+        for valores, nome in [(quantidade, "Quantidade"), (custo, "Custo")]:
+            soma = np.bincount(
+                indices, weights=variacoes[nome].to_numpy(float), minlength=(formato[0] - linha) * formato[1]
+            ).reshape(formato[0] - linha, formato[1])
+            if linha > 0:
+                soma[0] += valores[linha - 1]
+            valores[linha:] = np.rint(np.cumsum(soma, axis=0)) if nome == "Custo" else np.cumsum(soma, axis=0)
+
+    # Cotações: dos ativos existentes, a partir da última cotação aplicada; dos novos, todas
+    cotacoes = cotacoes[cotacoes["Ativo"].isin(ativos) & (cotacoes["Data"] >= datas[0])]
+    colunas_cotacoes = colunas.get_indexer(cotacoes["Ativo"])
+    if ultima_cotacao is not None:
+        cotacoes = cotacoes[(colunas_cotacoes >= existentes) | (cotacoes["Data"] >= pd.Timestamp(ultima_cotacao))]
+        colunas_cotacoes = colunas.get_indexer(cotacoes["Ativo"])
+    linhas_cotacoes = datas.get_indexer(cotacoes["Data"])
+    for primeira, ultima in [(0, existentes), (existentes, formato[1])]:
+        selecionadas = (colunas_cotacoes >= primeira) & (colunas_cotacoes < ultima)
+        linha = linhas_cotacoes[selecionadas].min(initial=len(matriz.datas))
+        linha = min(linha, len(matriz.datas)) if primeira == 0 else 0
+        if linha < len(datas) and primeira < ultima:
+            novas = np.full((formato[0] - linha, ultima - primeira), np.nan)
+            novas[linhas_cotacoes[selecionadas] - linha, colunas_cotacoes[selecionadas] - primeira] = cotacoes[
+                "Cotacao"
+            ].to_numpy(float)[selecionadas]
+            inicial = cotacao[linha - 1, primeira:ultima] if linha > 0 else np.full(ultima - primeira, np.nan)
+            cotacao[linha:, primeira:ultima] = _preencher_adiante(novas, inicial)
+
+    return MatrizPosicoes(datas, ativos, tipos, quantidade, custo, cotacao)
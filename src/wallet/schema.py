@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# Campos de texto com poucos valores distintos, guardados como categorias
+COLUNAS_CATEGORICAS = ["Ativo", "Tipo de Movimentacao", "Tipo Estrategia", "Tipo Ativo"]
+
+# Quantidades de ativos, inteiras nos relatórios da B3
+COLUNAS_QUANTIDADE = ["Quantidade", "Quantidade Atual", "Quantidade Anterior"]
+TIPO_QUANTIDADE = "int64"
+
+# Valores monetários, guardados em centavos. "Preco" pode ter frações de centavo
+# após desdobramentos e grupamentos; os demais são inteiros (int64), ou inteiros
+# anuláveis (Int64) quando desconhecidos, como os impostos de vendas "Sem Taxa IR".
+COLUNAS_MONETARIAS = [
+    "Preco",
+    "Valor",
+    "Investimento Atual",
+    "Investimento Anterior",
+    "Preco Medio Atual",
+    "Preco Medio Anterior",
+    "Dedo Duro",
+    "Lucro Bruto",
+    "Prejuizo",
+    "IR Esperado",
+    "Lucro Real",
+    "Lucro Bruto Compensado",
+    "Prejuizo Acumulado",
+    "IR Compensado",
+    "IR Acumulado",
+    "IR Pago",
+    "IR Pendente",
+]
+CENTAVOS_POR_REAL = 100
+
+
+def _arredondar(valores):
+    # Arredonda para o inteiro mais próximo, com os empates para o par (ABNT NBR 5891),
+    # como o `.round(2)` dos valores em reais. Valores nulos viram NA (Int64) em vez
+    # de serem convertidos para o menor int64.
+    nulos = np.isnan(valores)
+    centavos = np.rint(np.where(nulos, 0.0, valores)).astype(np.int64)
+    if nulos.any():
+        return pd.arrays.IntegerArray(centavos, nulos)
+    return centavos
+
+
+def para_centavos(valores):
+    """
+    Converte valores em reais para centavos inteiros.
+
+    Args:
+        valores (pd.Series or np.ndarray): Valores em reais.
+
+    Returns:
+        np.ndarray: Os valores em centavos (int64), arredondados ao centavo mais próximo.
+
+    Raises:
+        ValueError: Se algum valor for nulo ou não numérico.
+    """
+    reais = np.asarray(valores, dtype=np.float64)
+    if np.isnan(reais).any():
+        raise ValueError(f"{int(np.isnan(reais).sum())} valores monetários nulos")
+    return _arredondar(reais * CENTAVOS_POR_REAL)
+
+
+def arredondar_centavos(df, colunas):
+    """
+    Arredonda colunas já em centavos (ex: resultado de multiplicações por taxas ou de
+    divisões do preço médio) para centavos inteiros. Valores nulos (ex: impostos de
+    vendas "Sem Taxa IR") são mantidos como NA.
+
+    Args:
+        df (pd.DataFrame): Negociações no esquema de `tipar_negociacoes`.
+        colunas (list): Colunas a arredondar.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as colunas em int64, ou Int64 se tiverem nulos.
+    """
+    df = df.copy()
+    for coluna in colunas:
+        df[coluna] = _arredondar(df[coluna].to_numpy(np.float64, na_value=np.nan))
+    return df
+
+
+def categorizar(df):
+    """
+    Converte as `COLUNAS_CATEGORICAS` presentes em `df` para categorias.
+
+    Args:
+        df (pd.DataFrame): Negociações.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as colunas categóricas.
+    """
+    colunas = [coluna for coluna in COLUNAS_CATEGORICAS if coluna in df.columns]
+    return df.astype({coluna: "category" for coluna in colunas})
+
+
+def tipar_negociacoes(df):
+    """
+    Converte as negociações lidas dos relatórios da B3 (já com as colunas renomeadas)
+    para o esquema da carteira: `COLUNAS_CATEGORICAS` como categorias, quantidades
+    inteiras e "Preco" e "Valor" em centavos inteiros.
+
+    As funções de cálculo da carteira são lineares nos valores monetários, então
+    funcionam tanto em reais quanto em centavos; em centavos, os resultados são
+    arredondados uma única vez com `arredondar_centavos` e as somas são exatas.
+
+    Args:
+        df (pd.DataFrame): Negociações com "Ativo", "Tipo de Movimentacao",
+            "Quantidade", "Preco" e "Valor" (em reais).
+
+    Returns:
+        pd.DataFrame: Cópia de `df` no esquema da carteira.
+
+    Raises:
+        ValueError: Se algum valor for nulo ou alguma quantidade não for inteira.
+    """
+    quantidade = df["Quantidade"].to_numpy(np.float64)
+    if not np.array_equal(quantidade, np.round(quantidade)):
+        raise ValueError("Quantidades não inteiras nas negociações")
+
+    df = categorizar(df)
+    df["Quantidade"] = quantidade.astype(TIPO_QUANTIDADE)
+    df["Preco"] = para_centavos(df["Preco"])
+    df["Valor"] = para_centavos(df["Valor"])
+    return df
+
+
+def exportar_negociacoes(df):
+    """
+    Converte as negociações do esquema da carteira para exportação (.csv e relatórios):
+    valores monetários de volta para reais e categorias para o tipo de seus valores.
+
+    Args:
+        df (pd.DataFrame): Negociações no esquema de `tipar_negociacoes`.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com os valores em reais.
+    """
+    df = df.copy()
+    for coluna in COLUNAS_MONETARIAS:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].to_numpy(np.float64, na_value=np.nan) / CENTAVOS_POR_REAL
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+                df[coluna] = df[coluna].astype(df[coluna].cat.categories.dtype)
+    return df
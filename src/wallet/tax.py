@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from src.monitoring.profiling import profile_stage
+
+# Alíquotas de IR e de IR retido na fonte ("dedo duro") por estratégia e tipo de ativo.
+# Tipo Ativo vazio (None) vale para qualquer tipo de ativo da estratégia.
+TAXAS_IMPOSTO = pd.DataFrame(
+    [
+        ("Day Trade", None, 0.20, 0.01),
+        ("Long Trade", "Fii", 0.20, 0.00005),
+        ("Long Trade", "Acao", 0.15, 0.00005),
+    ],
+    columns=["Tipo Estrategia", "Tipo Ativo", "Taxa IR", "Taxa Dedo Duro"],
+)
+
+# Vendas mensais de ações (Long Trade) abaixo deste valor são isentas de IR
+LIMITE_ISENCAO = 20000
+
+
+def buscar_taxas(tipo_estrategia, tipo_ativo, tabela=TAXAS_IMPOSTO):
+    """
+    Busca as alíquotas de cada negociação na tabela de taxas.
+
+    Args:
+        tipo_estrategia (pd.Series): "Tipo Estrategia" de cada negociação.
+        tipo_ativo (pd.Series): "Tipo Ativo" de cada negociação.
+        tabela (pd.DataFrame): Tabela de taxas. Padrão é `TAXAS_IMPOSTO`.
+
+    Returns:
+        tuple: Arrays com a "Taxa IR" e a "Taxa Dedo Duro" de cada negociação,
+        NaN quando a estratégia ou o tipo de ativo não estão na tabela.
+    """
+    condicoes = list()
+    for estrategia, ativo in zip(tabela["Tipo Estrategia"], tabela["Tipo Ativo"]):
+        condicao = tipo_estrategia.eq(estrategia)
+        if not pd.isna(ativo):
+            condicao &= tipo_ativo.eq(ativo)
+        condicoes.append(condicao.fillna(False).to_numpy(bool))
+
+    taxa_ir = np.select(condicoes, tabela["Taxa IR"].tolist(), np.nan)
+    taxa_dedo_duro = np.select(condicoes, tabela["Taxa Dedo Duro"].tolist(), np.nan)
+    return taxa_ir, taxa_dedo_duro
+
+
+@profile_stage()
+def definir_taxa_imposto_renda_dedo_duro(df, tabela=TAXAS_IMPOSTO):
+    """
+    Define a "Taxa IR" e o "Dedo Duro" (sobre o "Valor") de cada venda.
+    Demais movimentações ficam com 0.
+
+    Vendas sem taxa na tabela (outras estratégias ou categorias) ficam com NaN
+    e são marcadas na coluna "Sem Taxa IR".
+
+    Args:
+        df (pd.DataFrame): Negociações com "Tipo de Movimentacao", "Tipo Estrategia",
+            "Tipo Ativo" e "Valor".
+        tabela (pd.DataFrame): Tabela de taxas. Padrão é `TAXAS_IMPOSTO`.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as novas colunas.
+    """
+    venda = df["Tipo de Movimentacao"].eq("Venda").to_numpy(bool)
+    taxa_ir, taxa_dedo_duro = buscar_taxas(df["Tipo Estrategia"], df["Tipo Ativo"], tabela)
+
+    df = df.copy()
+    df["Dedo Duro"] = np.where(venda, df["Valor"].to_numpy(float) * taxa_dedo_duro, 0.0)
+    df["Taxa IR"] = np.where(venda, taxa_ir, 0.0)
+    df["Sem Taxa IR"] = venda & np.isnan(taxa_ir)
+    return df
+
+
+@profile_stage()
+def calcular_lucro_bruto_prejuizo(df):
+    """
+    Calcula o "Lucro Bruto" e o "Prejuizo" (positivo) de cada venda, em relação ao
+    "Preco Medio Anterior". Demais movimentações ficam com 0.
+
+    Args:
+        df (pd.DataFrame): Negociações com "Tipo de Movimentacao", "Preco Medio Anterior",
+            "Quantidade" e "Valor".
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com as novas colunas.
+    """
+    venda = df["Tipo de Movimentacao"].eq("Venda").to_numpy(bool)
+    lucro_prejuizo = (
+        -(df["Preco Medio Anterior"].to_numpy(float) * df["Quantidade"].to_numpy(float))
+        + df["Valor"].to_numpy(float)
+    )
+
+    df = df.copy()
+    df["Lucro Bruto"] = np.where(venda & (lucro_prejuizo > 0), lucro_prejuizo, 0.0)
+    df["Prejuizo"] = np.where(venda & (lucro_prejuizo < 0), np.abs(lucro_prejuizo), 0.0)
+    return df
+
+
+@profile_stage()
+def calcular_imposto_renda_esperado(df):
+    """
+    Calcula o "IR Esperado" de cada negociação com lucro, descontando o "Dedo Duro"
+    já retido.
+
+    Args:
+        df (pd.DataFrame): Negociações com "Lucro Bruto", "Taxa IR" e "Dedo Duro".
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com a nova coluna.
+    """
+    lucro_bruto = df["Lucro Bruto"].to_numpy(float)
+
+    df = df.copy()
+    df["IR Esperado"] = np.where(
+        lucro_bruto > 0,
+        lucro_bruto * df["Taxa IR"].to_numpy(float) - df["Dedo Duro"].to_numpy(float),
+        0.0,
+    )
+    return df
+
+
+@profile_stage()
+def calcular_lucro_real(df):
+    """
+    Calcula o "Lucro Real" de cada negociação com lucro, descontando o "IR Esperado".
+
+    Args:
+        df (pd.DataFrame): Negociações com "Lucro Bruto" e "IR Esperado".
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com a nova coluna.
+    """
+    lucro_bruto = df["Lucro Bruto"].to_numpy(float)
+
+    df = df.copy()
+    df["Lucro Real"] = np.where(
+        lucro_bruto > 0, lucro_bruto - df["IR Esperado"].to_numpy(float), 0.0
+    )
+    return df
+
+
+@profile_stage()
+def isencao_imposto_renda(df, limite=LIMITE_ISENCAO):
+    """
+    Marca em "Isento IR" as vendas mensais de ações (Long Trade) com montante menor
+    que o limite de isenção. Day Trade e demais categorias nunca são isentos.
+
+    Args:
+        df (pd.DataFrame): Vendas mensais com "Tipo Estrategia", "Tipo Ativo" e "Valor".
+        limite (float): Limite de isenção. Padrão é `LIMITE_ISENCAO`.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com a nova coluna.
+    """
+    df = df.copy()
+    df["Isento IR"] = (
+        df["Tipo Estrategia"].eq("Long Trade")
+        & df["Tipo Ativo"].eq("Acao")
+        & (df["Valor"] < limite)
+    ).fillna(False).astype(bool)
+    return df
@@ -0,0 +1,25 @@
+import os
+from src.pipeline.runner import Pipeline, Stage
+
+
+def test_saida_removida_invalida_o_cache(tmp_path):
+    report = tmp_path / "report.csv"
+
+    def write_report(paths):
+        with open(paths["path_report"], "w", encoding="utf-8") as report_file:
+            report_file.write("Ativo\nKNCR11\n")
+        return 1
+
+    pipeline = Pipeline(
+        [Stage("report", write_report, outputs=("path_report",))],
+        {"path_report": str(report)},
+        str(tmp_path / "Cache"),
+    )
+    pipeline.run()
+    pipeline.run()
+    assert [run.status for run in pipeline.runs] == ["cached"]
+
+    os.remove(report)
+    pipeline.run()
+    assert [run.status for run in pipeline.runs] == ["run"]
+    assert report.exists()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.pipeline.stages import treat_b3
+from src.wallet.schema import arredondar_centavos
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """
+    Config paths of a B3 report with one IVVB11 (ETF, with no IR rate) buy and sale,
+    and one KNCR11 (Fii) buy and sale, in separate months.
+    """
+    reports = tmp_path / "B3Reports"
+    reports.mkdir()
+    negociacoes = pd.DataFrame(
+        {
+            "Código de Negociação": ["KNCR11", "KNCR11", "IVVB11", "IVVB11"],
+            "Data do Negócio": ["10/02/2024", "05/01/2024", "10/01/2024", "05/01/2024"],
+            "Tipo de Movimentação": ["Venda", "Compra", "Venda", "Compra"],
+            "Quantidade": [10, 10, 10, 10],
+            "Preço": [110.0, 100.0, 300.0, 250.0],
+            "Valor": [1100.0, 1000.0, 3000.0, 2500.0],
+        }
+    )
+    with open(reports / "report.csv", "w", encoding="ISO-8859-1") as report:
+        report.write("Movimentacao\n")
+        negociacoes.to_csv(report, sep=";", decimal=",", index=False)
+
+    pd.DataFrame({"Ativo": ["KNCR11", "IVVB11"], "Tipo Ativo": ["Fii", "ETF"]}).to_csv(
+        tmp_path / "categories.csv", index=False
+    )
+    pd.DataFrame(columns=["Ativo", "Data Com", "Tipo", "Proporcao"]).to_csv(tmp_path / "events.csv", index=False)
+    pd.DataFrame(columns=["Tipo Ativo", "Data", "IR Pago"]).to_csv(tmp_path / "darfs.csv", index=False)
+    return {
+        "path_b3_reports": str(reports),
+        "path_b3_reports_cache": str(tmp_path / "Cache"),
+        "path_categorizer_investments": str(tmp_path / "categories.csv"),
+        "path_corporate_actions": str(tmp_path / "events.csv"),
+        "path_darfs_issued": str(tmp_path / "darfs.csv"),
+        "path_treated_b3_report": str(tmp_path / "treated.csv"),
+        "path_treated_b3_report_monthly": str(tmp_path / "monthly.csv"),
+    }
+
+
+def test_arredondar_centavos_mantem_nulos():
+    df = arredondar_centavos(pd.DataFrame({"Dedo Duro": [1.4, np.nan, 2.5]}), ["Dedo Duro"])
+
+    assert str(df["Dedo Duro"].dtype) == "Int64"
+    assert df["Dedo Duro"].isna().tolist() == [False, True, False]
+    assert df["Dedo Duro"].dropna().tolist() == [1, 2]
+
+
+def test_venda_sem_taxa_ir_fica_com_impostos_nulos(paths):
+    treat_b3(paths)
+
+    df = pd.read_csv(paths["path_treated_b3_report"])
+    venda = df[(df["Ativo"] == "IVVB11") & (df["Tipo de Movimentacao"] == "Venda")].iloc[0]
+    assert venda["Sem Taxa IR"]
+    assert venda["Lucro Bruto"] == 500.0
+    for coluna in ["Taxa IR", "Dedo Duro", "IR Esperado", "Lucro Real"]:
+        assert np.isnan(venda[coluna]), coluna
+
+    venda = df[(df["Ativo"] == "KNCR11") & (df["Tipo de Movimentacao"] == "Venda")].iloc[0]
+    assert venda["Dedo Duro"] == 0.06
+    assert venda["IR Esperado"] == 19.94
+    assert df.select_dtypes("number").min().min() > -1e6
+
+
+def test_venda_sem_taxa_ir_fica_no_relatorio_mensal(paths):
+    df_venda_mensal = treat_b3(paths)["vendas_mensais"]
+
+    assert sorted(df_venda_mensal["Tipo Ativo"].astype(str)) == ["ETF", "Fii"]
+    etf = df_venda_mensal[df_venda_mensal["Tipo Ativo"] == "ETF"].iloc[0]
+    assert etf["Sem Taxa IR"]
+    assert etf["Valor"] == 300000
+    assert etf["Lucro Bruto"] == 50000
+    for coluna in ["IR Esperado", "Dedo Duro", "Lucro Real", "IR Pendente"]:
+        assert pd.isna(etf[coluna]), coluna
+
+    fii = df_venda_mensal[df_venda_mensal["Tipo Ativo"] == "Fii"].iloc[0]
+    assert not fii["Sem Taxa IR"]
+    assert fii["IR Pendente"] == 1994
+
+    df = pd.read_csv(paths["path_treated_b3_report_monthly"])
+    assert df["Sem Taxa IR"].tolist().count(True) == 1